@@ -10,15 +10,19 @@ Audit Trail :
 3. Validation DAF (approved/rejected)
 4. Outcome réel (4 semaines après)
 
+Stockage : une table = un fichier JSON Lines en ajout seul (*.jsonl).
+Les anciens fichiers *.json (tableaux) sont relus et migrés au démarrage.
+
 0 donnée bancaire | Stockage local uniquement
 """
 
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import os
+import time
 
 
 @dataclass
@@ -38,6 +42,176 @@ class AuditEntry:
         }
 
 
+class AppendOnlyLog:
+    """
+    Table persistée en JSON Lines, en ajout seul.
+    
+    - append() écrit une ligne : coût O(taille de l'entrée), pas O(historique)
+    - update() ajoute une ligne de patch {"__patch__": id, "set": {...}},
+      appliquée au chargement
+    - fsync groupé : flush à chaque écriture (survit à un crash du process),
+      fsync toutes les FSYNC_BATCH écritures, ou à l'écriture suivante si
+      FSYNC_INTERVAL secondes se sont écoulées depuis le dernier fsync, et
+      sur sync()/close(). Pas de minuterie : après une rafale, les dernières
+      lignes attendent la prochaine écriture ou sync()/close() (appelé à
+      l'arrêt de l'application)
+    - compaction (fichier temporaire + os.replace) quand les patchs
+      dépassent la taille de la table, ou sur replace_all()
+    """
+    
+    FSYNC_BATCH = 32            # Écritures entre deux fsync
+    FSYNC_INTERVAL = 1.0        # Délai vérifié à l'écriture suivante
+    COMPACT_MIN_PATCHES = 100   # Patchs avant compaction (au minimum)
+    
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None):
+        """
+        Args:
+            path: Fichier .jsonl de la table
+            legacy_path: Ancien fichier .json (tableau), relu si path absent
+        """
+        self.path = path
+        self.records: List[Dict] = []
+        self._positions: Dict[Any, int] = {}
+        self._patches = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+        
+        if self.path.exists():
+            self._read_log()
+        elif legacy_path is not None and legacy_path.exists():
+            self._read_legacy(legacy_path)
+            self.compact()
+    
+    def _read_log(self):
+        """Rejoue le fichier : enregistrements puis patchs"""
+        try:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+            
+            # Dernière ligne incomplète (crash pendant l'écriture) : ignorée
+            end = content.rfind(b'\n') + 1
+            if end < len(content):
+                print(f"⚠️ {self.path.name}: dernière entrée incomplète ignorée")
+                with open(self.path, 'r+b') as f:
+                    f.truncate(end)
+            
+            for number, line in enumerate(content[:end].splitlines(), start=1):
+                if not line.strip():
+                    continue
+                # Ligne illisible : signalée et ignorée, la suite est rejouée
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError as e:
+                    print(f"⚠️ {self.path.name}: ligne {number} illisible ignorée ({e})")
+                    continue
+                if not isinstance(entry, dict):
+                    print(f"⚠️ {self.path.name}: ligne {number} illisible ignorée")
+                    continue
+                if "__patch__" in entry:
+                    record = self.find(entry["__patch__"])
+                    if record is not None:
+                        record.update(entry.get("set", {}))
+                    self._patches += 1
+                else:
+                    self._index(entry)
+        except Exception as e:
+            print(f"⚠️ Erreur chargement {self.path.name}: {e}")
+        
+        if self._patches >= max(self.COMPACT_MIN_PATCHES, len(self.records)):
+            self.compact()
+    
+    def _read_legacy(self, legacy_path: Path):
+        """Charge un ancien fichier JSON (tableau complet)"""
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                for record in json.load(f):
+                    self._index(record)
+        except Exception as e:
+            print(f"⚠️ Erreur chargement {legacy_path.name}: {e}")
+    
+    def _index(self, record: Dict):
+        """Ajoute en mémoire (première occurrence d'un id indexée)"""
+        self.records.append(record)
+        record_id = record.get("id") if isinstance(record, dict) else None
+        if record_id is not None:
+            self._positions.setdefault(record_id, len(self.records) - 1)
+    
+    def find(self, record_id: Any) -> Optional[Dict]:
+        """Enregistrement par id (O(1))"""
+        position = self._positions.get(record_id)
+        return self.records[position] if position is not None else None
+    
+    def append(self, record: Dict):
+        """Ajoute un enregistrement (une ligne)"""
+        self._index(record)
+        self._write(record)
+    
+    def update(self, record_id: Any, fields: Dict):
+        """Modifie un enregistrement existant (ligne de patch)"""
+        record = self.find(record_id)
+        if record is None:
+            return
+        record.update(fields)
+        self._write({"__patch__": record_id, "set": fields})
+        self._patches += 1
+        if self._patches >= max(self.COMPACT_MIN_PATCHES, len(self.records)):
+            self.compact()
+    
+    def replace_all(self, records: Iterable[Dict]):
+        """Remplace tout le contenu (réécriture compacte)"""
+        records = list(records)
+        self.records = []
+        self._positions = {}
+        for record in records:
+            self._index(record)
+        self.compact()
+    
+    def _write(self, entry: Dict):
+        """Écrit une ligne, fsync groupé"""
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= self.FSYNC_BATCH
+                    or time.monotonic() - self._last_sync >= self.FSYNC_INTERVAL):
+                self.sync()
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde {self.path.name}: {e}")
+    
+    def sync(self):
+        """Force l'écriture disque des lignes en attente"""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def compact(self):
+        """Réécrit la table sans patchs (temporaire + os.replace)"""
+        self.close()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in self.records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._patches = 0
+        except Exception as e:
+            print(f"❌ Erreur compaction {self.path.name}: {e}")
+    
+    def close(self):
+        """fsync puis fermeture du fichier"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
 class TresorisMemory:
     """
     Mémoire persistante de TRESORIS avec audit trail complet.
@@ -53,35 +227,36 @@ class TresorisMemory:
         self.storage_path = storage_path
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        # Fichiers JSON simples (pas de TinyDB pour simplifier)
-        self.analyses_file = self.storage_path / "analyses.json"
-        self.decisions_file = self.storage_path / "daf_decisions.json"
-        self.outcomes_file = self.storage_path / "outcomes.json"
-        self.audit_file = self.storage_path / "audit_trail.json"
+        # Fichiers JSON Lines en ajout seul (anciens .json relus si besoin)
+        self.analyses_file = self.storage_path / "analyses.jsonl"
+        self.decisions_file = self.storage_path / "daf_decisions.jsonl"
+        self.outcomes_file = self.storage_path / "outcomes.jsonl"
+        self.audit_file = self.storage_path / "audit_trail.jsonl"
         
         # Charger ou initialiser
-        self.analyses = self._load_json(self.analyses_file, [])
-        self.decisions = self._load_json(self.decisions_file, [])
-        self.outcomes = self._load_json(self.outcomes_file, [])
-        self.audit_trail = self._load_json(self.audit_file, [])
+        self._analyses_log = self._open_log(self.analyses_file)
+        self._decisions_log = self._open_log(self.decisions_file)
+        self._outcomes_log = self._open_log(self.outcomes_file)
+        self._audit_log = self._open_log(self.audit_file)
+        
+        self.analyses = self._analyses_log.records
+        self.decisions = self._decisions_log.records
+        self.outcomes = self._outcomes_log.records
+        self.audit_trail = self._audit_log.records
     
-    def _load_json(self, path: Path, default: Any) -> Any:
-        """Charge un fichier JSON ou retourne la valeur par défaut"""
-        try:
-            if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"⚠️ Erreur chargement {path.name}: {e}")
-        return default
+    def _open_log(self, path: Path) -> AppendOnlyLog:
+        """Table JSON Lines (migration depuis l'ancien .json si présent)"""
+        return AppendOnlyLog(path, legacy_path=path.with_suffix(".json"))
     
-    def _save_json(self, path: Path, data: Any):
-        """Sauvegarde en JSON"""
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-        except Exception as e:
-            print(f"❌ Erreur sauvegarde {path.name}: {e}")
+    def sync(self):
+        """Force l'écriture disque de toutes les tables"""
+        for log in (self._analyses_log, self._decisions_log, self._outcomes_log, self._audit_log):
+            log.sync()
+    
+    def close(self):
+        """fsync et fermeture des fichiers (arrêt de l'application)"""
+        for log in (self._analyses_log, self._decisions_log, self._outcomes_log, self._audit_log):
+            log.close()
     
     def _add_audit(self, event_type: str, data: Dict):
         """Ajoute une entrée à l'audit trail"""
@@ -91,8 +266,7 @@ class TresorisMemory:
             "event_type": event_type,
             "data": data
         }
-        self.audit_trail.append(entry)
-        self._save_json(self.audit_file, self.audit_trail)
+        self._audit_log.append(entry)
     
     # ═══════════════════════════════════════════════════════════════════════════
     # ANALYSES
@@ -117,8 +291,7 @@ class TresorisMemory:
         analysis["saved_at"] = datetime.now().isoformat()
         analysis["validation_status"] = "pending"  # pending | partial | complete
         
-        self.analyses.append(analysis)
-        self._save_json(self.analyses_file, self.analyses)
+        self._analyses_log.append(analysis)
         
         # Audit
         self._add_audit("analysis_saved", {
@@ -179,8 +352,7 @@ class TresorisMemory:
             "outcome_due_date": (datetime.now() + timedelta(weeks=4)).isoformat()
         }
         
-        self.decisions.append(record)
-        self._save_json(self.decisions_file, self.decisions)
+        self._decisions_log.append(record)
         
         # Audit
         self._add_audit("daf_decision", {
@@ -197,7 +369,7 @@ class TresorisMemory:
     def _update_analysis_validation_status(self, analysis_id: str):
         """Met à jour le statut de validation d'une analyse"""
         # Trouver l'analyse
-        analysis = next((a for a in self.analyses if a.get("id") == analysis_id), None)
+        analysis = self._analyses_log.find(analysis_id)
         if not analysis:
             return
         
@@ -206,13 +378,15 @@ class TresorisMemory:
         validated_decisions = [d for d in self.decisions if d.get("action_id") in action_ids]
         
         if len(validated_decisions) == 0:
-            analysis["validation_status"] = "pending"
+            validation_status = "pending"
         elif len(validated_decisions) < len(action_ids):
-            analysis["validation_status"] = "partial"
+            validation_status = "partial"
         else:
-            analysis["validation_status"] = "complete"
+            validation_status = "complete"
         
-        self._save_json(self.analyses_file, self.analyses)
+        # Ligne de patch uniquement si le statut change
+        if analysis.get("validation_status") != validation_status:
+            self._analyses_log.update(analysis_id, {"validation_status": validation_status})
     
     def get_decisions_for_analysis(self, analysis_id: str) -> List[Dict]:
         """Récupère toutes les décisions pour une analyse"""
@@ -279,8 +453,7 @@ class TresorisMemory:
             "days_after_decision": (datetime.now() - datetime.fromisoformat(decision.get("timestamp"))).days
         }
         
-        self.outcomes.append(record)
-        self._save_json(self.outcomes_file, self.outcomes)
+        self._outcomes_log.append(record)
         
         # Audit
         self._add_audit("outcome_recorded", {
@@ -475,16 +648,15 @@ Toutes les décisions nécessitent validation humaine.
         cutoff = datetime.now() - timedelta(days=keep_days)
         cutoff_str = cutoff.isoformat()
         
-        # Filtrer
-        self.analyses = [a for a in self.analyses if a.get("timestamp", "") > cutoff_str]
-        self.decisions = [d for d in self.decisions if d.get("timestamp", "") > cutoff_str]
-        self.outcomes = [o for o in self.outcomes if o.get("recorded_at", "") > cutoff_str]
+        # Filtrer et sauvegarder (réécriture compacte)
+        self._analyses_log.replace_all(a for a in self.analyses if a.get("timestamp", "") > cutoff_str)
+        self._decisions_log.replace_all(d for d in self.decisions if d.get("timestamp", "") > cutoff_str)
+        self._outcomes_log.replace_all(o for o in self.outcomes if o.get("recorded_at", "") > cutoff_str)
         
-        # Garder tout l'audit trail pour conformité
+        self.analyses = self._analyses_log.records
+        self.decisions = self._decisions_log.records
+        self.outcomes = self._outcomes_log.records
         
-        # Sauvegarder
-        self._save_json(self.analyses_file, self.analyses)
-        self._save_json(self.decisions_file, self.decisions)
-        self._save_json(self.outcomes_file, self.outcomes)
+        # Garder tout l'audit trail pour conformité
         
         print(f"🧹 Nettoyage effectué (gardé {keep_days} derniers jours)")
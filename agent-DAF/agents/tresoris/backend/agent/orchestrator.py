@@ -346,8 +346,8 @@ class TresorisOrchestrator:
                     results["variance"] = result.to_dict() if hasattr(result, 'to_dict') else result
                 
                 elif engine_name == "stress_tester":
-                    # Stress test nécessite données tréso
-                    result = self.agent.stress_tester.run_full_stress_test(
+                    # Stress test nécessite données tréso (hors boucle d'événements)
+                    result = await self.agent.stress_tester.run_full_stress_test_async(
                         current_cash=data.get("current_cash", 100000),
                         monthly_revenues=data.get("monthly_revenues", 50000),
                         monthly_costs=data.get("monthly_costs", 40000)
@@ -39,6 +39,7 @@ from engine.early_warning import EarlyWarningDetector, EarlyWarning
 from engine.client_scoring import ClientRiskScorer, ClientRiskScore
 from engine.action_optimizer import ActionPrioritizer, OptimizedAction
 from engine.seasonality import SeasonalityAdjuster
+from services.invoice_snapshot import InvoiceSnapshotStore
 
 # V3 - Powerhouse (modules avancés)
 from engine.margin_analyzer import MarginAnalyzer, ClientMarginProfile, MarginAnalysisResult
@@ -165,6 +166,18 @@ class RiskRequalificationAgent:
     5. STOP (attend validation DAF)
     """
     
+    # Règles de requalification V2 par ordre de priorité : (statut, probabilité)
+    RISK_RULES_V2 = [
+        (RiskStatus.CRITICAL, 0.95),   # 0. Warning(s) critique(s)
+        (RiskStatus.CRITICAL, 0.9),    # 1. Client rating D
+        (RiskStatus.CRITICAL, 0.85),   # 2. Retard > retard_critical
+        (RiskStatus.UNCERTAIN, 0.7),   # 3. Client C/D + warning(s) high
+        (RiskStatus.UNCERTAIN, 0.6),   # 4. Client C/D + warnings
+        (RiskStatus.UNCERTAIN, 0.55),  # 5. Retard > retard_uncertain
+        (RiskStatus.CERTAIN, 0.15),    # 6. Client A/B sans warnings
+        (RiskStatus.CERTAIN, 0.25),    # 7. Par défaut
+    ]
+    
     def __init__(self, data_path: Path, memory):
         self.data_path = data_path
         self.memory = memory
@@ -234,9 +247,10 @@ class RiskRequalificationAgent:
         # Check interval
         self.check_interval = 30  # secondes
         
-        # Cache données
-        self._invoices_cache: Optional[pd.DataFrame] = None
-        self._invoices_hash: Optional[str] = None
+        # Cache données : snapshot partagé du CSV factures (partagé avec
+        # les endpoints API) et version au dernier _has_data_changed
+        self.invoice_store = InvoiceSnapshotStore(self.data_path / "customer_invoices.csv")
+        self._checked_hash: Optional[str] = None
     
     # ═══════════════════════════════════════════════════════════════════════════
     # EVENT SYSTEM
@@ -346,21 +360,18 @@ class RiskRequalificationAgent:
         return False, "Situation stable, surveillance continue"
     
     def _load_invoices(self) -> Optional[pd.DataFrame]:
-        """Charge les factures clients"""
+        """
+        Charge les factures clients.
+        
+        Copie du snapshot partagé (dates parsées, days_overdue) : le CSV
+        n'est re-parsé que si son contenu a changé.
+        """
         try:
-            path = self.data_path / "customer_invoices.csv"
-            if not path.exists():
+            snapshot = self.invoice_store.get()
+            if snapshot is None:
                 return None
             
-            df = pd.read_csv(path)
-            
-            # Calculer days_overdue si pas présent
-            if 'days_overdue' not in df.columns and 'due_date' in df.columns:
-                df['due_date'] = pd.to_datetime(df['due_date'], errors='coerce')
-                df['days_overdue'] = (datetime.now() - df['due_date']).dt.days
-                df['days_overdue'] = df['days_overdue'].clip(lower=0)
-            
-            return df
+            return snapshot.invoices.copy()
         except Exception as e:
             print(f"❌ Erreur chargement factures: {e}")
             return None
@@ -368,19 +379,13 @@ class RiskRequalificationAgent:
     def _has_data_changed(self) -> bool:
         """Vérifie si les données ont changé depuis le dernier check"""
         try:
-            path = self.data_path / "customer_invoices.csv"
-            if not path.exists():
+            current_hash = self.invoice_store.version()
+            if current_hash is None:
                 return False
             
-            import hashlib
-            current_hash = hashlib.md5(path.read_bytes()).hexdigest()
-            
-            if self._invoices_hash is None:
-                self._invoices_hash = current_hash
-                return True  # Premier check = changement
-            
-            if current_hash != self._invoices_hash:
-                self._invoices_hash = current_hash
+            # Premier check = changement
+            if current_hash != self._checked_hash:
+                self._checked_hash = current_hash
                 return True
             
             return False
@@ -402,7 +407,7 @@ class RiskRequalificationAgent:
     # STEP 2: REQUALIFY RISKS (V2 avec Engines sophistiqués)
     # ═══════════════════════════════════════════════════════════════════════════
     
-    async def requalify_risks(self) -> List[Risk]:
+    async def requalify_risks(self, vectorized: bool = True) -> List[Risk]:
         """
         Requalifie chaque encours avec sophistication V2 :
         
@@ -412,6 +417,11 @@ class RiskRequalificationAgent:
         3. EarlyWarningDetector → Détecte signaux faibles (progressive_delay, concentration, etc.)
         4. SmartForecaster → Prévisions ajustées par trend + probabilités
         
+        Args:
+            vectorized: Statut, score, type et horizon évalués en colonnes
+                (np.select) sur toutes les factures >= amount_min. False =
+                règles appliquées facture par facture (même résultat)
+        
         Returns:
             Liste des risques requalifiés avec sophistication V2
         """
@@ -419,62 +429,42 @@ class RiskRequalificationAgent:
         if invoices is None or invoices.empty:
             return []
         
-        risks: List[Risk] = []
-        
         print("\n🔍 REQUALIFICATION V2 avec engines sophistiqués...")
         
+        client_col = 'client_name' if 'client_name' in invoices.columns else 'client'
+        # Les engines identifient les clients par client_id
+        if 'client_id' not in invoices.columns:
+            invoices['client_id'] = invoices[client_col]
+        if 'client_name' not in invoices.columns:
+            invoices['client_name'] = invoices[client_col]
+        self._init_engines(invoices)
+        
         # ─────────────────────────────────────────────────────────────────────
         # ÉTAPE 1: Analyser patterns de paiement par client
         # ─────────────────────────────────────────────────────────────────────
         
-        client_patterns = {}
-        client_col = 'client_name' if 'client_name' in invoices.columns else 'client'
-        
         print("📊 Analyse patterns clients...")
-        for client in invoices[client_col].unique():
-            try:
-                pattern = self.payment_analyzer.analyze_client(invoices, str(client))
-                client_patterns[str(client)] = pattern
-            except Exception as e:
-                print(f"⚠️  Erreur pattern {client}: {e}")
-                continue
-        
+        client_patterns = self.payment_analyzer.analyze_all()
         print(f"✅ {len(client_patterns)} patterns clients analysés")
         
         # ─────────────────────────────────────────────────────────────────────
-        # ÉTAPE 2: Scorer chaque client (0-100 + A/B/C/D)
+        # ÉTAPE 2: Encours par client (un seul groupby)
         # ─────────────────────────────────────────────────────────────────────
         
-        client_scores = {}
-        pending = invoices[invoices.get('status', '') != 'paid'].copy()
+        if 'status' in invoices.columns:
+            pending = invoices[invoices['status'] != 'paid']
+        else:
+            pending = invoices
         total_pending = pending['amount'].sum() if not pending.empty else 0
-        
-        print("🎯 Scoring risque clients...")
-        for client, pattern in client_patterns.items():
-            try:
-                client_pending = pending[pending[client_col] == client]['amount'].sum() if not pending.empty else 0
-                
-                score = self.risk_scorer.calculate_risk_score(
-                    pattern=pattern,
-                    pending_amount=float(client_pending),
-                    total_portfolio=float(total_pending) if total_pending > 0 else 1
-                )
-                client_scores[client] = score
-            except Exception as e:
-                print(f"⚠️  Erreur scoring {client}: {e}")
-                continue
-        
-        print(f"✅ {len(client_scores)} clients scorés")
+        client_pending = pending.groupby('client_id', sort=False)['amount'].sum()
+        total_portfolio = float(total_pending) if total_pending > 0 else 1
         
         # ─────────────────────────────────────────────────────────────────────
         # ÉTAPE 3: Détecter early warnings (signaux faibles)
         # ─────────────────────────────────────────────────────────────────────
         
         print("🚨 Détection early warnings...")
-        early_warnings = self.warning_detector.detect_all_warnings(
-            invoices_df=invoices,
-            client_patterns=client_patterns
-        )
+        early_warnings = self.warning_detector.detect_all_warnings(pending) if not pending.empty else []
         print(f"✅ {len(early_warnings)} warnings détectés")
         
         # Grouper warnings par client
@@ -485,24 +475,240 @@ class RiskRequalificationAgent:
             warnings_by_client[warning.client_id].append(warning)
         
         # ─────────────────────────────────────────────────────────────────────
-        # ÉTAPE 4: Créer risques avec toute la sophistication V2
+        # ÉTAPE 4: Scorer les clients et créer les risques (factures >= amount_min)
         # ─────────────────────────────────────────────────────────────────────
         
         print("📋 Création risques sophistiqués...")
         
-        for _, row in pending.iterrows():
-            days_overdue = int(row.get('days_overdue', 0))
+        candidates = pending[~(pending['amount'] < self.thresholds["amount_min"])]
+        build_risks = self._build_risks_vectorized if vectorized else self._build_risks_by_invoice
+        risks = build_risks(
+            candidates=candidates,
+            pending=pending,
+            client_col=client_col,
+            client_patterns=client_patterns,
+            client_pending=client_pending,
+            total_portfolio=total_portfolio,
+            warnings_by_client=warnings_by_client
+        )
+        
+        # Trier par score décroissant
+        risks.sort(key=lambda r: r.score, reverse=True)
+        
+        print(f"✅ {len(risks)} risques créés avec engines V2\n")
+        
+        return risks
+    
+    def _init_engines(self, invoices: pd.DataFrame):
+        """Initialise les engines V2 avec les factures chargées"""
+        self.payment_analyzer = ClientPaymentAnalyzer(invoices)
+        self.forecaster = SmartForecaster(self.payment_analyzer)
+        self.warning_detector = EarlyWarningDetector(self.payment_analyzer)
+        self.risk_scorer = ClientRiskScorer()
+    
+    def _build_risks_vectorized(
+        self,
+        candidates: pd.DataFrame,
+        pending: pd.DataFrame,
+        client_col: str,
+        client_patterns: Dict[str, ClientPaymentPattern],
+        client_pending: pd.Series,
+        total_portfolio: float,
+        warnings_by_client: Dict[str, List[EarlyWarning]]
+    ) -> List[Risk]:
+        """
+        Requalification en colonnes : scores clients via score_table, puis
+        règle V2 (np.select), score, type et horizon de chaque facture.
+        Les textes ne sont générés que pour les clients des risques créés.
+        """
+        if candidates.empty:
+            return []
+        
+        # Scores clients en colonnes (sans textes)
+        table = self.risk_scorer.score_table(
+            [
+                {"pattern": pattern, "pending_amount": float(client_pending.get(client_id, 0))}
+                for client_id, pattern in client_patterns.items()
+            ],
+            total_portfolio=total_portfolio
+        )
+        print(f"✅ {len(table)} clients scorés")
+        
+        # Caractéristiques client -> factures
+        client_ids = candidates['client_id'].to_numpy()
+        position = pd.Index(table['client_id']).get_indexer(client_ids)
+        has_score = position >= 0
+        # Valeur sentinelle en fin de tableau : position -1 = client sans score
+        rating = np.append(table['rating'].to_numpy(dtype=object), "")[position]
+        client_risk_score = np.array([round(value, 2) for value in table['risk_score'].tolist()] + [0.0])[position]
+        
+        warning_features = pd.DataFrame(
+            [
+                {
+                    'client_id': client_id,
+                    'n_warnings': len(warnings),
+                    'n_critical': sum(w.severity == "critical" for w in warnings),
+                    'n_high': sum(w.severity == "high" for w in warnings),
+                    **{
+                        warning_type: any(w.warning_type == warning_type for w in warnings)
+                        for warning_type in (
+                            "progressive_delay", "concentration_risk", "seasonal_risk", "partial_payments"
+                        )
+                    }
+                }
+                for client_id, warnings in warnings_by_client.items()
+            ],
+            columns=[
+                'client_id', 'n_warnings', 'n_critical', 'n_high', 'progressive_delay',
+                'concentration_risk', 'seasonal_risk', 'partial_payments'
+            ]
+        ).set_index('client_id').reindex(client_ids, fill_value=0).astype({
+            'n_warnings': int, 'n_critical': int, 'n_high': int, 'progressive_delay': bool,
+            'concentration_risk': bool, 'seasonal_risk': bool, 'partial_payments': bool
+        })
+        n_warnings = warning_features['n_warnings'].to_numpy()
+        
+        days_overdue = (
+            candidates['days_overdue'].fillna(0).astype(int).to_numpy()
+            if 'days_overdue' in candidates.columns else np.zeros(len(candidates), dtype=int)
+        )
+        amount = candidates['amount'].to_numpy(dtype=float)
+        
+        # ─── Règle V2 (ordre de _determine_risk_status_v2) ───
+        watched = np.isin(rating, ["C", "D"]) & (n_warnings > 0)
+        rule = np.select(
+            [
+                warning_features['n_critical'].to_numpy() > 0,
+                rating == "D",
+                days_overdue > self.thresholds["retard_critical"],
+                watched & (warning_features['n_high'].to_numpy() > 0),
+                watched,
+                days_overdue > self.thresholds["retard_uncertain"],
+                np.isin(rating, ["A", "B"]) & (n_warnings == 0)
+            ],
+            np.arange(7),
+            7
+        )
+        probability = np.array([p for _, p in self.RISK_RULES_V2])[rule]
+        critical = rule <= 2
+        uncertain = (rule >= 3) & (rule <= 5)
+        
+        # ─── Score (formule de _calculate_risk_score_v2) ───
+        score = np.trunc(
+            np.minimum(days_overdue / 120, 1) * 20
+            + np.minimum(amount / 500000, 1) * 20
+            + probability * 30
+            + np.where(has_score, client_risk_score * 0.3, 15)
+        )
+        score = np.where(critical, np.minimum(100, score + 15), score)
+        score = np.clip(score, 0, 100).astype(int)
+        
+        # ─── Type (logique de _determine_risk_type_v2) ───
+        total = pending['amount'].sum()
+        concentration = (
+            pending.groupby(client_col)['amount'].sum().reindex(candidates[client_col]).to_numpy() / total * 100
+            if total > 0 else np.zeros(len(candidates))
+        )
+        risk_type = np.select(
+            [
+                warning_features['progressive_delay'].to_numpy(dtype=bool),
+                warning_features['concentration_risk'].to_numpy(dtype=bool),
+                warning_features['seasonal_risk'].to_numpy(dtype=bool),
+                warning_features['partial_payments'].to_numpy(dtype=bool),
+                concentration > 30,
+                days_overdue > 45
+            ],
+            ["progressive_delay", "concentration", "seasonal_risk", "partial_payments", "concentration", "retard"],
+            "deviation_scenario"
+        )
+        
+        # ─── Horizon (logique de _estimate_horizon_v2) ───
+        horizon_weeks = np.select(
+            [
+                critical & (rating == "D"),
+                critical,
+                uncertain & (rating == "C"),
+                uncertain,
+                rating == "A",
+                rating == "B"
+            ],
+            [1, 2, 3, 4, 12, 8],
+            6
+        )
+        
+        data_quality = self._assess_data_quality_columns(candidates)
+        
+        # Textes : ClientRiskScore complets pour les seuls clients concernés
+        explained = {
+            client_score.client_id: client_score
+            for client_score in self.risk_scorer.explain_scores(table, np.unique(position[has_score]))
+        }
+        
+        invoice_ids = (
+            candidates['invoice_id'] if 'invoice_id' in candidates.columns
+            else candidates['id'] if 'id' in candidates.columns
+            else pd.Series('N/A', index=candidates.index)
+        ).astype(str).tolist()
+        clients = candidates[client_col].astype(str).tolist()
+        today = datetime.now().strftime('%Y%m%d')
+        
+        risks = []
+        for i in range(len(candidates)):
+            client_id = client_ids[i]
+            risks.append(Risk(
+                id=f"RISK_{invoice_ids[i]}_{today}",
+                type=str(risk_type[i]),
+                client=clients[i],
+                invoice_id=invoice_ids[i],
+                amount=float(amount[i]),
+                probability=float(probability[i]),
+                days_overdue=int(days_overdue[i]),
+                status=self.RISK_RULES_V2[rule[i]][0],
+                horizon_weeks=int(horizon_weeks[i]),
+                score=int(score[i]),
+                justification=self._risk_justification_v2(
+                    int(rule[i]), int(days_overdue[i]),
+                    explained.get(client_id), warnings_by_client.get(client_id, [])
+                ),
+                data_quality=str(data_quality[i])
+            ))
+        return risks
+    
+    def _build_risks_by_invoice(
+        self,
+        candidates: pd.DataFrame,
+        pending: pd.DataFrame,
+        client_col: str,
+        client_patterns: Dict[str, ClientPaymentPattern],
+        client_pending: pd.Series,
+        total_portfolio: float,
+        warnings_by_client: Dict[str, List[EarlyWarning]]
+    ) -> List[Risk]:
+        """Requalification facture par facture (règles V2 scalaires)"""
+        client_scores = {}
+        print("🎯 Scoring risque clients...")
+        for client_id, pattern in client_patterns.items():
+            try:
+                client_scores[client_id] = self.risk_scorer.calculate_risk_score(
+                    pattern=pattern,
+                    pending_amount=float(client_pending.get(client_id, 0)),
+                    total_portfolio=total_portfolio
+                )
+            except Exception as e:
+                print(f"⚠️  Erreur scoring {client_id}: {e}")
+                continue
+        print(f"✅ {len(client_scores)} clients scorés")
+        
+        risks = []
+        for _, row in candidates.iterrows():
+            days_overdue = int(0 if pd.isna(row.get('days_overdue', 0)) else row.get('days_overdue', 0))
             amount = float(row.get('amount', 0))
             client = str(row.get(client_col, 'Inconnu'))
             invoice_id = str(row.get('invoice_id', row.get('id', 'N/A')))
             
-            # Skip si montant trop faible
-            if amount < self.thresholds["amount_min"]:
-                continue
-            
             # Récupérer données V2
-            client_score = client_scores.get(client)
-            client_warnings = warnings_by_client.get(client, [])
+            client_score = client_scores.get(row['client_id'])
+            client_warnings = warnings_by_client.get(row['client_id'], [])
             
             # Déterminer statut avec sophistication V2
             status, justification, probability = self._determine_risk_status_v2(
@@ -511,7 +717,7 @@ class RiskRequalificationAgent:
                 client=client,
                 client_score=client_score,
                 warnings=client_warnings,
-                invoices=invoices
+                invoices=pending
             )
             
             # Calculer score final (intégration V2)
@@ -528,11 +734,11 @@ class RiskRequalificationAgent:
                 days_overdue=days_overdue,
                 client=client,
                 warnings=client_warnings,
-                invoices=invoices
+                invoices=pending
             )
             
             # Créer risque
-            risk = Risk(
+            risks.append(Risk(
                 id=f"RISK_{invoice_id}_{datetime.now().strftime('%Y%m%d')}",
                 type=risk_type,
                 client=client,
@@ -545,15 +751,7 @@ class RiskRequalificationAgent:
                 score=score,
                 justification=justification,
                 data_quality=self._assess_data_quality(row)
-            )
-            
-            risks.append(risk)
-        
-        # Trier par score décroissant
-        risks.sort(key=lambda r: r.score, reverse=True)
-        
-        print(f"✅ {len(risks)} risques créés avec engines V2\n")
-        
+            ))
         return risks
     
     def _determine_risk_status(
@@ -701,67 +899,73 @@ class RiskRequalificationAgent:
         Returns:
             (status, justification, probability)
         """
-        reasons = []
+        rating = client_score.rating if client_score else None
         
         # ─── CRITICAL si warnings critiques ───
-        critical_warnings = [w for w in warnings if w.severity == "critical"]
-        if critical_warnings:
-            reasons.append(f"{len(critical_warnings)} warning(s) critique(s)")
-            status = RiskStatus.CRITICAL
-            probability = 0.95
-        
+        if any(w.severity == "critical" for w in warnings):
+            rule = 0
         # ─── CRITICAL si client rating D ───
-        elif client_score and client_score.rating == "D":
-            reasons.append(f"Client rating D (score {client_score.risk_score:.0f})")
-            reasons.extend(client_score.risk_factors[:2])  # Top 2 facteurs
-            status = RiskStatus.CRITICAL
-            probability = 0.9
-        
+        elif rating == "D":
+            rule = 1
         # ─── CRITICAL si retard > 90j ───
         elif days_overdue > self.thresholds["retard_critical"]:
-            reasons.append(f"Retard > {self.thresholds['retard_critical']}j ({days_overdue}j)")
-            status = RiskStatus.CRITICAL
-            probability = 0.85
-        
-        # ─── UNCERTAIN si warnings high + client C ───
-        elif warnings and client_score and client_score.rating in ["C", "D"]:
-            high_warnings = [w for w in warnings if w.severity == "high"]
-            if high_warnings:
-                reasons.append(f"Client {client_score.rating} + {len(high_warnings)} warning(s)")
-                status = RiskStatus.UNCERTAIN
-                probability = 0.7
-            else:
-                reasons.append(f"Client {client_score.rating} + warnings détectés")
-                status = RiskStatus.UNCERTAIN
-                probability = 0.6
-        
+            rule = 2
+        # ─── UNCERTAIN si warnings + client C/D (high ou non) ───
+        elif warnings and rating in ["C", "D"]:
+            rule = 3 if any(w.severity == "high" for w in warnings) else 4
         # ─── UNCERTAIN si retard 45-90j ───
         elif days_overdue > self.thresholds["retard_uncertain"]:
+            rule = 5
+        # ─── CERTAIN si client A/B sans warnings ───
+        elif rating in ["A", "B"] and not warnings:
+            rule = 6
+        # ─── CERTAIN par défaut ───
+        else:
+            rule = 7
+        
+        status, probability = self.RISK_RULES_V2[rule]
+        justification = self._risk_justification_v2(rule, days_overdue, client_score, warnings)
+        
+        return status, justification, probability
+    
+    def _risk_justification_v2(
+        self,
+        rule: int,
+        days_overdue: int,
+        client_score: Optional[ClientRiskScore],
+        warnings: List[EarlyWarning]
+    ) -> str:
+        """Justification de la règle V2 appliquée (index dans RISK_RULES_V2)"""
+        reasons = []
+        
+        if rule == 0:
+            critical_warnings = [w for w in warnings if w.severity == "critical"]
+            reasons.append(f"{len(critical_warnings)} warning(s) critique(s)")
+        elif rule == 1:
+            reasons.append(f"Client rating D (score {client_score.risk_score:.0f})")
+            reasons.extend(client_score.risk_factors[:2])  # Top 2 facteurs
+        elif rule == 2:
+            reasons.append(f"Retard > {self.thresholds['retard_critical']}j ({days_overdue}j)")
+        elif rule == 3:
+            high_warnings = [w for w in warnings if w.severity == "high"]
+            reasons.append(f"Client {client_score.rating} + {len(high_warnings)} warning(s)")
+        elif rule == 4:
+            reasons.append(f"Client {client_score.rating} + warnings détectés")
+        elif rule == 5:
             reasons.append(f"Retard {self.thresholds['retard_uncertain']}-{self.thresholds['retard_critical']}j")
             if client_score:
                 reasons.append(f"Client rating {client_score.rating}")
-            status = RiskStatus.UNCERTAIN
-            probability = 0.55
-        
-        # ─── CERTAIN si client A/B sans warnings ───
-        elif client_score and client_score.rating in ["A", "B"] and not warnings:
+        elif rule == 6:
             reasons.append(f"Client fiable (rating {client_score.rating})")
             if client_score.positive_factors:
                 reasons.append(client_score.positive_factors[0])
-            status = RiskStatus.CERTAIN
-            probability = 0.15
-        
-        # ─── CERTAIN par défaut ───
         else:
-            status = RiskStatus.CERTAIN
-            probability = 0.25
             reasons.append("Dans les normes")
             if client_score:
                 reasons.append(f"Rating {client_score.rating}")
         
-        justification = f"V2: {status.value.upper()} - {' | '.join(reasons)}"
-        
-        return status, justification, probability
+        status = self.RISK_RULES_V2[rule][0]
+        return f"V2: {status.value.upper()} - {' | '.join(reasons)}"
     
     def _calculate_risk_score_v2(
         self,
@@ -910,6 +1114,16 @@ class RiskRequalificationAgent:
             return "orange"
         return "green"
     
+    def _assess_data_quality_columns(self, invoices: pd.DataFrame) -> np.ndarray:
+        """_assess_data_quality pour toutes les lignes"""
+        def missing(column: str) -> np.ndarray:
+            if column not in invoices.columns:
+                return np.ones(len(invoices), dtype=bool)
+            return invoices[column].isna().to_numpy()
+        
+        issues = missing('amount') * 2 + missing('due_date') * 2 + missing('client') * 1
+        return np.select([issues >= 3, issues >= 1], ["red", "orange"], "green")
+    
     # ═══════════════════════════════════════════════════════════════════════════
     # STEP 3: PROPOSE ACTIONS (V2 avec ActionPrioritizer)
     # ═══════════════════════════════════════════════════════════════════════════
@@ -1359,7 +1573,8 @@ Exposition totale identifiée: {(total_critical + total_uncertain)/1000:.0f}K€
             "mode": self.mode.value,
             "last_decision": self.last_decision,
             "current_analysis": self.current_analysis.to_dict() if self.current_analysis else None,
-            "thresholds": self.thresholds
+            "thresholds": self.thresholds,
+            "stress_cache": self.stress_tester.cache_stats()
         }
     
     # ═══════════════════════════════════════════════════════════════════════════
@@ -35,7 +35,8 @@ from engine import (
     SmartForecaster,
     MarginAnalyzer,
     CostDriftAnalyzer,
-    VarianceAnalyzer
+    VarianceAnalyzer,
+    StressTester
 )
 
 
@@ -159,6 +160,9 @@ class GSheetStorage:
 
 storage = GSheetStorage()
 
+# Instance partagée entre requêtes (cache de résultats du StressTester)
+stress_tester = StressTester(random_seed=42)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONVERSION HELPERS
@@ -633,9 +637,6 @@ async def run_analysis(df: pd.DataFrame, params: Dict) -> Dict[str, Any]:
     
     # 11. Stress Test (V3) - Monte Carlo simplifié
     try:
-        from engine.stress_tester import StressTester
-        stress_tester = StressTester(random_seed=42)
-        
         # Paramètres de base pour simulation
         current_cash = result.get("position", {}).get("total_receivable", 100000)
         monthly_burn = current_cash * 0.15  # Estimation 15% de consommation mensuelle
@@ -14,6 +14,7 @@ V2 - Sophistication:
   • client_scoring - Scoring clients
   • action_optimizer - Optimisation actions
   • seasonality - Ajustements saisonniers
+  • whatif_simulator - Impact d'une facture hypothétique
 
 V3 - Powerhouse:
   • margin_analyzer - Analyse marges client/produit
@@ -38,6 +39,7 @@ from .early_warning import EarlyWarningDetector, EarlyWarning
 from .client_scoring import ClientRiskScorer, ClientRiskScore
 from .action_optimizer import ActionPrioritizer, OptimizedAction
 from .seasonality import SeasonalityAdjuster
+from .whatif_simulator import WhatIfSimulator
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # V3 - POWERHOUSE
@@ -69,6 +71,7 @@ from .stress_tester import (
     StressTester,
     StressScenario,
     MonteCarloResult,
+    ScenarioGridResult,
     StressTestResult
 )
 from .decision_arbiter import (
@@ -104,6 +107,7 @@ __all__ = [
     "ActionPrioritizer",
     "OptimizedAction",
     "SeasonalityAdjuster",
+    "WhatIfSimulator",
     
     # ═══════════════════════════════════════════════════════════════════════════
     # V3 - POWERHOUSE
@@ -135,6 +139,7 @@ __all__ = [
     "StressTester",
     "StressScenario",
     "MonteCarloResult",
+    "ScenarioGridResult",
     "StressTestResult",
     
     # Decision Arbitration
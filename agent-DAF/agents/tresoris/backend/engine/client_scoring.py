@@ -4,8 +4,10 @@ Score 0-100 avec ratings A/B/C/D et explications détaillées.
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+from dataclasses import dataclass, fields
+import numpy as np
+import pandas as pd
 
 from .payment_patterns import ClientPaymentPattern
 
@@ -133,6 +135,14 @@ class ClientRiskScorer:
             confidence=confidence
         )
     
+    def amount_score(self, pending_amount: float, total_portfolio: float) -> float:
+        """Sous-score exposition (0-100) d'un encours, comme calculate_risk_score"""
+        return self._calculate_amount_score(pending_amount, total_portfolio)
+    
+    def rating_for(self, risk_score: float) -> str:
+        """Rating A/B/C/D d'un score de risque, comme calculate_risk_score"""
+        return self._determine_rating(risk_score)
+    
     def _calculate_payment_behavior_score(self, pattern: ClientPaymentPattern) -> float:
         """
         Score basé sur comportement de paiement.
@@ -333,16 +343,25 @@ class ClientRiskScorer:
         
         return factors
     
-    def score_portfolio(self, clients_data: List[Dict]) -> List[ClientRiskScore]:
+    def score_portfolio(
+        self,
+        clients_data: List[Dict],
+        vectorized: bool = True
+    ) -> List[ClientRiskScore]:
         """
         Score tout le portefeuille clients.
         
         Args:
             clients_data: Liste dicts avec pattern + pending_amount
+            vectorized: Scores via score_table (colonnes) puis textes via
+                explain_scores. False = calculate_risk_score client par client
             
         Returns:
             Liste ClientRiskScore triée par risk_score (desc)
         """
+        if vectorized:
+            return self.explain_scores(self.score_table(clients_data))
+        
         scores = []
         
         # Calculer total portefeuille
@@ -364,6 +383,189 @@ class ClientRiskScorer:
         scores.sort(key=lambda s: s.risk_score, reverse=True)
         
         return scores
+    
+    def portfolio_features(self, clients_data: List[Dict]) -> pd.DataFrame:
+        """
+        Table des caractéristiques clients (une ligne par client).
+        
+        Args:
+            clients_data: Liste dicts avec pattern + pending_amount
+            
+        Returns:
+            DataFrame : champs de ClientPaymentPattern + pending_amount,
+            et l'objet d'origine dans la colonne pattern
+        """
+        patterns = [client["pattern"] for client in clients_data]
+        features = pd.DataFrame(
+            [vars(pattern) for pattern in patterns],
+            columns=[f.name for f in fields(ClientPaymentPattern)]
+        )
+        features["pending_amount"] = [client.get("pending_amount", 0) for client in clients_data]
+        features["pattern"] = patterns
+        return features
+    
+    def score_table(
+        self,
+        clients_data: Union[List[Dict], pd.DataFrame],
+        total_portfolio: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Scores de tous les clients en colonnes, sans textes explicatifs.
+        
+        Mêmes règles que calculate_risk_score (sous-scores, moyenne pondérée,
+        rating, confiance) évaluées par np.select sur toute la table ;
+        concentration calculée sur le total des pending_amount.
+        
+        Args:
+            clients_data: Liste dicts avec pattern + pending_amount, ou table
+                issue de portfolio_features
+            total_portfolio: Total encours (défaut: somme des pending_amount)
+            
+        Returns:
+            Table triée par risk_score décroissant (scores non arrondis) avec
+            payment_behavior_score, trend_score, stability_score,
+            amount_score, risk_score, rating, confidence
+        """
+        table = (
+            clients_data.copy(deep=False) if isinstance(clients_data, pd.DataFrame)
+            else self.portfolio_features(clients_data)
+        )
+        if len(table) == 0:
+            for column in ("payment_behavior_score", "trend_score", "stability_score",
+                           "amount_score", "risk_score", "rating", "confidence"):
+                table[column] = []
+            return table
+        
+        def column(name: str) -> np.ndarray:
+            return table[name].to_numpy(dtype=float)
+        
+        late_rate = column("late_rate")
+        very_late_rate = column("very_late_rate")
+        trend = table["trend"].to_numpy()
+        
+        # Comportement : (100 - fiabilité) * 0.8 + pénalités
+        penalties = (
+            np.select([late_rate > 0.4, late_rate > 0.3], [8, 5], 0)
+            + np.select([very_late_rate > 0.2, very_late_rate > 0.1], [15, 8], 0)
+            + np.where(table["has_partial_payments"].to_numpy(dtype=bool), 10, 0)
+        )
+        payment_behavior_score = np.minimum((100 - column("reliability_score")) * 0.8 + penalties, 100)
+        
+        # Tendance : amélioration 20, stable 50, sinon 70 + pente * 5
+        trend_score = np.minimum(
+            np.select(
+                [trend == "improving", trend == "stable"],
+                [20.0, 50.0],
+                70 + column("trend_slope") * 5
+            ),
+            100
+        )
+        
+        # Stabilité : écart-type borné à 30 jours
+        stability_score = np.minimum(np.minimum(column("std_delay_days"), 30) / 30 * 100, 100)
+        
+        # Exposition : concentration * 200, > 50% = 100
+        pending_amount = column("pending_amount")
+        if total_portfolio is None:
+            total_portfolio = pending_amount.sum()
+        if total_portfolio > 0:
+            concentration = pending_amount / total_portfolio
+            amount_score = np.minimum(np.where(concentration > 0.5, 100, concentration * 200), 100)
+        else:
+            amount_score = np.zeros(len(table))
+        
+        risk_score = (
+            payment_behavior_score * self.weights["payment_behavior"] +
+            trend_score * self.weights["trend"] +
+            stability_score * self.weights["stability"] +
+            amount_score * self.weights["amount"]
+        )
+        
+        total_invoices = column("total_invoices")
+        analysis_period_months = column("analysis_period_months")
+        
+        table["payment_behavior_score"] = payment_behavior_score
+        table["trend_score"] = trend_score
+        table["stability_score"] = stability_score
+        table["amount_score"] = amount_score
+        table["risk_score"] = risk_score
+        table["rating"] = np.select(
+            [risk_score < 35, risk_score < 47, risk_score < 73], ["A", "B", "C"], "D"
+        )
+        table["confidence"] = np.select(
+            [
+                (total_invoices >= 12) & (analysis_period_months >= 6),
+                (total_invoices >= 5) & (analysis_period_months >= 3)
+            ],
+            ["high", "medium"],
+            "low"
+        )
+        
+        # Trier par risque décroissant (tri stable, comme score_portfolio)
+        table = table.take(np.argsort(-np.round(risk_score, 2), kind="stable"))
+        table.index = pd.RangeIndex(len(table))
+        return table
+    
+    def explain_scores(
+        self,
+        table: pd.DataFrame,
+        rows: Optional[Iterable[int]] = None
+    ) -> List[ClientRiskScore]:
+        """
+        Construit les ClientRiskScore (explication, facteurs) des lignes demandées.
+        
+        Args:
+            table: Résultat de score_table
+            rows: Positions des lignes à expliquer (défaut: toutes), par ex.
+                range(20) pour les 20 clients les plus risqués
+            
+        Returns:
+            Liste ClientRiskScore dans l'ordre des lignes
+        """
+        # Patterns d'origine si disponibles, sinon reconstruits depuis la table
+        pattern_fields = (
+            [] if "pattern" in table.columns
+            else [f.name for f in fields(ClientPaymentPattern) if f.name in table.columns]
+        )
+        calculated_at = datetime.now()
+        scores = []
+        selected = table if rows is None else table.iloc[list(rows)]
+        score_columns = [
+            "payment_behavior_score", "trend_score", "stability_score",
+            "amount_score", "risk_score", "rating", "confidence"
+        ]
+        # Colonnes en listes Python (plus rapide que ligne par ligne)
+        columns = {name: selected[name].tolist() for name in pattern_fields + score_columns}
+        patterns = selected["pattern"].tolist() if "pattern" in selected.columns else None
+        for position in range(len(selected)):
+            row = {name: values[position] for name, values in columns.items()}
+            pattern = (
+                patterns[position] if patterns is not None
+                else ClientPaymentPattern(**{name: row[name] for name in pattern_fields})
+            )
+            scores_dict = {
+                "payment_behavior": row["payment_behavior_score"],
+                "trend": row["trend_score"],
+                "stability": row["stability_score"],
+                "amount": row["amount_score"]
+            }
+            scores.append(ClientRiskScore(
+                client_id=pattern.client_id,
+                client_name=pattern.client_name,
+                risk_score=round(row["risk_score"], 2),
+                rating=row["rating"],
+                payment_behavior_score=round(row["payment_behavior_score"], 2),
+                trend_score=round(row["trend_score"], 2),
+                stability_score=round(row["stability_score"], 2),
+                amount_score=round(row["amount_score"], 2),
+                weights=self.weights,
+                explanation=self._generate_explanation(pattern, scores_dict, row["rating"]),
+                risk_factors=self._identify_risk_factors(pattern),
+                positive_factors=self._identify_positive_factors(pattern),
+                calculated_at=calculated_at,
+                confidence=row["confidence"]
+            ))
+        return scores
 
 
 # ============================================================================
@@ -5,6 +5,7 @@ Détecte signaux faibles AVANT que le risque devienne critique.
 
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
@@ -58,13 +59,17 @@ class EarlyWarningDetector:
     
     def detect_all_warnings(
         self,
-        pending_invoices: pd.DataFrame
+        pending_invoices: pd.DataFrame,
+        vectorized: bool = True
     ) -> List[EarlyWarning]:
         """
         Détecte tous les signaux faibles dans le portefeuille.
         
         Args:
             pending_invoices: DataFrame factures en attente
+            vectorized: Évalue les règles en colonnes sur tout le portefeuille
+                et ne construit les warnings que pour les clients concernés.
+                False = détecteurs appelés client par client (même résultat)
             
         Returns:
             Liste warnings triée par severity puis probability
@@ -80,36 +85,42 @@ class EarlyWarningDetector:
         # Mois actuel pour saisonnalité
         current_month = datetime.now().month
         
-        # Pour chaque client, détecter signaux faibles
-        for client_id in client_ids:
-            client_name = pending_invoices[pending_invoices['client_id'] == client_id]['client_name'].iloc[0] \
-                if 'client_name' in pending_invoices.columns else client_id
-            
-            # 1. Dégradation progressive
-            warning = self.detect_progressive_delay(client_id)
-            if warning:
-                warnings.append(warning)
-            
-            # 2. Paiements partiels
-            warning = self.detect_partial_payments(client_id)
-            if warning:
-                warnings.append(warning)
-            
-            # 3. Augmentation fréquence retards
-            warning = self.detect_payment_frequency_increase(client_id)
-            if warning:
-                warnings.append(warning)
-            
-            # 4. Risque de concentration
-            client_pending = pending_invoices[pending_invoices['client_id'] == client_id]
-            warning = self.detect_concentration_risk(client_id, pending_invoices, total_pending)
-            if warning:
-                warnings.append(warning)
-            
-            # 5. Risque saisonnier
-            warning = self.detect_seasonal_risk(client_id, current_month)
-            if warning:
-                warnings.append(warning)
+        if vectorized:
+            warnings = self._detect_all_vectorized(pending_invoices, total_pending, current_month)
+        else:
+            # Une analyse par client : les détecteurs lisent ensuite le cache
+            self.analyzer.analyze_all()
+            
+            # Pour chaque client, détecter signaux faibles
+            for client_id in client_ids:
+                client_name = pending_invoices[pending_invoices['client_id'] == client_id]['client_name'].iloc[0] \
+                    if 'client_name' in pending_invoices.columns else client_id
+                
+                # 1. Dégradation progressive
+                warning = self.detect_progressive_delay(client_id)
+                if warning:
+                    warnings.append(warning)
+                
+                # 2. Paiements partiels
+                warning = self.detect_partial_payments(client_id)
+                if warning:
+                    warnings.append(warning)
+                
+                # 3. Augmentation fréquence retards
+                warning = self.detect_payment_frequency_increase(client_id)
+                if warning:
+                    warnings.append(warning)
+                
+                # 4. Risque de concentration
+                client_pending = pending_invoices[pending_invoices['client_id'] == client_id]
+                warning = self.detect_concentration_risk(client_id, pending_invoices, total_pending)
+                if warning:
+                    warnings.append(warning)
+                
+                # 5. Risque saisonnier
+                warning = self.detect_seasonal_risk(client_id, current_month)
+                if warning:
+                    warnings.append(warning)
         
         # Trier par severity puis probability
         severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
@@ -117,6 +128,88 @@ class EarlyWarningDetector:
         
         return warnings
     
+    def warning_features(
+        self,
+        pending_invoices: pd.DataFrame,
+        total_pending: float
+    ) -> pd.DataFrame:
+        """
+        Table des indicateurs par client en attente de paiement.
+        
+        Returns:
+            DataFrame indexé par client_id (ordre d'apparition) : has_history,
+            trend, trend_slope, late_rate, partial_payment_count,
+            pending_amount, concentration
+        """
+        client_ids = pd.Index(pending_invoices['client_id'].unique(), name='client_id')
+        stats = self.analyzer.client_stats
+        
+        features = stats.reindex(
+            index=client_ids,
+            columns=['trend', 'trend_slope', 'late_rate', 'partial_payment_count']
+        )
+        features.insert(0, 'has_history', client_ids.isin(stats.index))
+        
+        if 'amount' in pending_invoices.columns:
+            features['pending_amount'] = pending_invoices.groupby(
+                'client_id', sort=False
+            )['amount'].sum().reindex(client_ids)
+        else:
+            features['pending_amount'] = 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features['concentration'] = (
+                features['pending_amount'] / total_pending if total_pending != 0 else np.nan
+            )
+        
+        return features
+    
+    def _detect_all_vectorized(
+        self,
+        pending_invoices: pd.DataFrame,
+        total_pending: float,
+        current_month: int
+    ) -> List[EarlyWarning]:
+        """
+        Règles des 5 détecteurs évaluées en masques booléens sur la table
+        des indicateurs ; le détecteur n'est appelé que là où sa règle se
+        déclenche, dans l'ordre (client, détecteur) de la boucle.
+        """
+        features = self.warning_features(pending_invoices, total_pending)
+        known = features['has_history'].to_numpy()
+        worsening = (features['trend'] == 'worsening').to_numpy()
+        slope = features['trend_slope'].to_numpy(dtype=float)
+        late_rate = features['late_rate'].to_numpy(dtype=float)
+        
+        rules = np.column_stack([
+            # 1. Dégradation progressive : ≥ 15 jours sur 6 mois
+            known & worsening & (slope * 6 >= 15),
+            # 2. Paiements partiels répétés
+            known & (features['partial_payment_count'].to_numpy(dtype=float) >= 2),
+            # 3. Fréquence des retards : ≥ 30% de retards et tendance dégradante
+            known & worsening & (late_rate >= 0.3),
+            # 4. Concentration : ≥ 30% de l'encours
+            features['concentration'].to_numpy(dtype=float) >= 0.30,
+            # 5. Saisonnalité : période à risque et ≥ 20% de retards
+            known & (late_rate >= 0.2) & (current_month in [7, 8, 12])
+        ])
+        
+        detectors = [
+            self.detect_progressive_delay,
+            self.detect_partial_payments,
+            self.detect_payment_frequency_increase,
+            lambda client_id: self.detect_concentration_risk(client_id, pending_invoices, total_pending),
+            lambda client_id: self.detect_seasonal_risk(client_id, current_month)
+        ]
+        
+        warnings = []
+        client_ids = features.index
+        for row, rule in np.argwhere(rules):
+            warning = detectors[rule](client_ids[row])
+            if warning:
+                warnings.append(warning)
+        
+        return warnings
+    
     def detect_progressive_delay(self, client_id: str) -> Optional[EarlyWarning]:
         """
         Détecte si délais paiement s'allongent progressivement.
@@ -50,6 +50,20 @@ class ClientPaymentAnalyzer:
     Détecte tendances et comportements à risque.
     """
     
+    # Statuts considérés comme payés
+    PAID_STATUSES = ['paid', 'payé', 'Paid', 'Payé']
+    
+    # Statistiques suffisantes par client (additives : mises à jour par delta)
+    SUM_COLUMNS = [
+        'total_invoices', 'delay_count', 'delay_sum', 'delay_sumsq',
+        'on_time_count', 'late_count', 'very_late_count', 'partial_payment_count'
+    ]
+    # Colonnes recalculées à partir des factures du client (à la demande)
+    LAZY_COLUMNS = [
+        'median_delay_days', 'first_payment_date', 'last_payment_date',
+        'analysis_period_months', 'trend', 'trend_slope'
+    ]
+    
     def __init__(self, invoices_df: pd.DataFrame):
         """
         Args:
@@ -60,30 +74,352 @@ class ClientPaymentAnalyzer:
         self.invoices = invoices_df
         self._prepare_data()
     
+    def reload(self, invoices_df: Optional[pd.DataFrame] = None):
+        """
+        Recharge les factures (nouveau DataFrame ou self.invoices modifié
+        sur place) et invalide les patterns en cache.
+        """
+        if invoices_df is not None:
+            self.invoices = invoices_df
+        self._prepare_data()
+    
     def _prepare_data(self):
         """Prépare les données pour l'analyse"""
+        # Patterns calculés sur l'ancien jeu de factures
+        self._patterns: Dict[str, ClientPaymentPattern] = {}
+        
+        self._prepare_dates(self.invoices)
+        
+        # Filtrer uniquement les factures payées pour l'analyse
+        self._paid_invoices = self.invoices[self._paid_mask(self.invoices)].copy()
+        
+        # Index incrémentaux construits au premier upsert
+        self._invoice_labels: Optional[Dict] = None
+        self._client_rows: Optional[Dict[str, set]] = None
+        self._monthly_buckets: Optional[Dict[str, Dict[int, List[float]]]] = None
+        self._stale_clients: set = set()
+        
+        self._build_client_stats()
+    
+    def _prepare_dates(self, invoices: pd.DataFrame):
+        """Convertit les dates et calcule delay_days (sur place)"""
         # Convertir dates en datetime si nécessaire
-        if 'due_date' in self.invoices.columns:
-            self.invoices['due_date'] = pd.to_datetime(self.invoices['due_date'])
-        if 'payment_date' in self.invoices.columns:
-            self.invoices['payment_date'] = pd.to_datetime(self.invoices['payment_date'])
+        if 'due_date' in invoices.columns:
+            invoices['due_date'] = pd.to_datetime(invoices['due_date'])
+        if 'payment_date' in invoices.columns:
+            invoices['payment_date'] = pd.to_datetime(invoices['payment_date'])
         
         # Calculer delay_days pour chaque facture payée
-        if 'payment_date' in self.invoices.columns and 'due_date' in self.invoices.columns:
-            self.invoices['delay_days'] = (
-                self.invoices['payment_date'] - self.invoices['due_date']
+        if 'payment_date' in invoices.columns and 'due_date' in invoices.columns:
+            invoices['delay_days'] = (
+                invoices['payment_date'] - invoices['due_date']
             ).dt.days
+    
+    def _paid_mask(self, invoices: pd.DataFrame) -> pd.Series:
+        """Factures payées : selon status, sinon selon payment_date"""
+        if 'status' in invoices.columns:
+            return invoices['status'].isin(self.PAID_STATUSES)
+        # Si pas de colonne status, considérer celles avec payment_date
+        return invoices['payment_date'].notna()
+    
+    @property
+    def paid_invoices(self) -> pd.DataFrame:
+        """Factures payées (re-filtrées après un upsert)"""
+        if self._paid_invoices is None:
+            self._paid_invoices = self.invoices[self._paid_mask(self.invoices)].copy()
+        return self._paid_invoices
+    
+    @property
+    def client_stats(self) -> pd.DataFrame:
+        """
+        Métriques par client, indexées par client_id (ordre d'apparition) :
+        client_name, total_invoices, avg/std/median_delay_days,
+        on_time/late/very_late_rate, partial_payment_count,
+        first/last_payment_date, analysis_period_months, trend, trend_slope.
+        """
+        self._refresh_stale_clients(self._stale_clients)
+        return self._client_stats
+    
+    def _row_contributions(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Contribution de chaque facture payée aux statistiques suffisantes"""
+        delays = rows['delay_days']
+        known = delays.fillna(0.0)
+        has_partial = 'amount' in rows.columns and 'amount_paid' in rows.columns
+        return pd.DataFrame({
+            'client_id': rows['client_id'],
+            'client_name': rows['client_name'] if 'client_name' in rows.columns else rows['client_id'],
+            'total_invoices': 1,
+            'delay_count': delays.notna().astype(int),
+            'delay_sum': known.astype(float),
+            'delay_sumsq': known.astype(float) ** 2,
+            'on_time_count': (delays <= 0).astype(int),
+            'late_count': ((delays > 0) & (delays <= 60)).astype(int),
+            'very_late_count': (delays > 60).astype(int),
+            'partial_payment_count': (
+                ((rows['amount_paid'] < rows['amount']) & (rows['amount_paid'] > 0)).astype(int)
+                if has_partial else 0
+            ),
+            'year_month': rows['payment_date'].dt.year * 12 + rows['payment_date'].dt.month
+        }, index=rows.index)
+    
+    def _stats_from_sums(self, sums: pd.DataFrame) -> pd.DataFrame:
+        """Moyenne, écart-type et taux à partir des statistiques suffisantes"""
+        n = sums['delay_count']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = sums['delay_sum'] / n
+            variance = (sums['delay_sumsq'] - sums['delay_sum'] * mean) / (n - 1)
+        stats = pd.DataFrame({
+            'client_name': sums['client_name'],
+            'total_invoices': sums['total_invoices'].astype(int),
+            'avg_delay_days': mean,
+            # Écart-type : 0 si moins de 2 délais connus
+            'std_delay_days': np.sqrt(variance.clip(lower=0)).where(n > 1, 0.0),
+            'partial_payment_count': sums['partial_payment_count'].astype(int)
+        }, index=sums.index)
+        for name in ('on_time', 'late', 'very_late'):
+            stats[f'{name}_rate'] = sums[f'{name}_count'] / sums['total_invoices']
+        return stats
+    
+    def _build_client_stats(self):
+        """
+        Calcule en une seule agrégation groupby les métriques de chaque client
+        (voir client_stats), à partir de statistiques suffisantes additives :
+        nombres, sommes et sommes des carrés des délais.
+        """
+        paid = self._paid_invoices
+        if 'client_id' not in paid.columns or 'delay_days' not in paid.columns:
+            self._client_sums = pd.DataFrame()
+            self._client_stats = pd.DataFrame()
+            self._client_stats_records = {}
+            return
+        
+        contributions = self._row_contributions(paid)
+        grouped = contributions.groupby('client_id', sort=False)
+        sums = grouped[self.SUM_COLUMNS].sum()
+        sums.insert(0, 'client_name', grouped['client_name'].first())
+        self._client_sums = sums
+        
+        stats = self._stats_from_sums(sums)
+        lazy = self._lazy_stats(
+            paid,
+            contributions.groupby(['client_id', 'year_month'])[['delay_sum', 'delay_count']].sum(),
+            sums['total_invoices']
+        )
+        self._client_stats = stats.join(lazy)
+        self._client_stats_records = self._client_stats.to_dict('index')
+    
+    def _lazy_stats(
+        self,
+        rows: pd.DataFrame,
+        monthly: pd.DataFrame,
+        invoice_counts: pd.Series
+    ) -> pd.DataFrame:
+        """
+        Médiane, dates et tendance des clients de invoice_counts.
         
-        # Filtrer uniquement les factures payées pour l'analyse
-        if 'status' in self.invoices.columns:
-            self.paid_invoices = self.invoices[
-                self.invoices['status'].isin(['paid', 'payé', 'Paid', 'Payé'])
-            ].copy()
-        else:
-            # Si pas de colonne status, considérer celles avec payment_date
-            self.paid_invoices = self.invoices[
-                self.invoices['payment_date'].notna()
-            ].copy()
+        Args:
+            rows: Factures payées de ces clients
+            monthly: Sommes mensuelles (delay_sum, delay_count) indexées
+                par (client_id, year_month)
+            invoice_counts: Nombre de factures payées par client
+        """
+        grouped = rows.groupby('client_id', sort=False)
+        lazy = pd.DataFrame({
+            'median_delay_days': grouped['delay_days'].median(),
+            'first_payment_date': grouped['payment_date'].min(),
+            'last_payment_date': grouped['payment_date'].max()
+        }).reindex(invoice_counts.index)
+        period_days = (lazy['last_payment_date'] - lazy['first_payment_date']).dt.days.fillna(0)
+        lazy['analysis_period_months'] = np.maximum(1, (period_days / 30).astype(int))
+        return lazy.join(self._calculate_all_trends(monthly, invoice_counts))
+    
+    # ═══════════════════════════════════════════════════════════════════════════
+    # MISE À JOUR INCRÉMENTALE
+    # ═══════════════════════════════════════════════════════════════════════════
+    
+    def _ensure_incremental_index(self):
+        """Index facture -> ligne, lignes payées et mois par client (une fois)"""
+        if self._invoice_labels is not None:
+            return
+        if not self.invoices.index.is_unique:
+            self.invoices = self.invoices.reset_index(drop=True)
+            self._paid_invoices = None
+        self._invoice_labels = dict(zip(self.invoices['invoice_id'].tolist(), self.invoices.index.tolist()))
+        
+        paid = self.paid_invoices
+        paid_labels = paid.index.to_numpy()
+        self._client_rows = {
+            client_id: set(paid_labels[positions].tolist())
+            for client_id, positions in paid.groupby('client_id', sort=False).indices.items()
+        }
+        monthly = self._row_contributions(paid).groupby(
+            ['client_id', 'year_month']
+        )[['delay_sum', 'delay_count', 'total_invoices']].sum()
+        # Seau mensuel : [somme des délais, délais connus, factures]
+        self._monthly_buckets = {}
+        for (client_id, year_month), bucket in zip(monthly.index, monthly.to_numpy().tolist()):
+            self._monthly_buckets.setdefault(client_id, {})[int(year_month)] = bucket
+    
+    def _apply_contributions(self, contributions: pd.DataFrame, sign: int):
+        """Ajoute (sign=1) ou retire (sign=-1) des factures payées des index incrémentaux"""
+        for label, client_id, year_month, delay_sum, delay_count in zip(
+            contributions.index,
+            contributions['client_id'],
+            contributions['year_month'],
+            contributions['delay_sum'],
+            contributions['delay_count']
+        ):
+            rows = self._client_rows.setdefault(client_id, set())
+            if sign > 0:
+                rows.add(label)
+            else:
+                rows.discard(label)
+            if pd.isna(year_month):
+                continue
+            months = self._monthly_buckets.setdefault(client_id, {})
+            bucket = months.setdefault(int(year_month), [0.0, 0, 0])
+            bucket[0] += sign * delay_sum
+            bucket[1] += sign * delay_count
+            bucket[2] += sign
+            if bucket[2] == 0:
+                del months[int(year_month)]
+    
+    def upsert_invoices(self, df_delta: pd.DataFrame):
+        """
+        Insère ou remplace (par invoice_id) des factures sans tout recalculer.
+        
+        Seules les lignes du delta sont préparées ; les statistiques
+        suffisantes des clients concernés sont mises à jour par différence
+        (ancienne version retirée, nouvelle ajoutée). Médiane, dates et
+        tendance de ces clients sont recalculées à la prochaine lecture.
+        
+        Args:
+            df_delta: Factures nouvelles ou modifiées (mêmes colonnes)
+        """
+        if df_delta is None or len(df_delta) == 0:
+            return
+        self._ensure_incremental_index()
+        
+        delta = df_delta.drop_duplicates('invoice_id', keep='last').copy()
+        self._prepare_dates(delta)
+        for column in delta.columns.difference(self.invoices.columns):
+            self.invoices[column] = np.nan
+        
+        labels = [self._invoice_labels.get(invoice_id) for invoice_id in delta['invoice_id']]
+        is_update = np.array([label is not None for label in labels], dtype=bool)
+        updated_labels = [label for label in labels if label is not None]
+        
+        # Retirer l'ancienne version des factures modifiées
+        old = self.invoices.loc[updated_labels]
+        removed = self._row_contributions(old[self._paid_mask(old)])
+        self._apply_contributions(removed, -1)
+        
+        # Écrire le delta : remplacement sur place, ajout en fin de table
+        if updated_labels:
+            self.invoices.loc[updated_labels, delta.columns] = delta[is_update].set_axis(updated_labels).to_numpy()
+        appended = delta[~is_update]
+        if len(appended):
+            start = int(self.invoices.index.max()) + 1 if len(self.invoices) else 0
+            appended = appended.set_axis(pd.RangeIndex(start, start + len(appended)))
+            self.invoices = pd.concat([self.invoices, appended])
+            self._invoice_labels.update(zip(appended['invoice_id'], appended.index))
+        
+        new = self.invoices.loc[updated_labels + list(appended.index)]
+        added = self._row_contributions(new[self._paid_mask(new)])
+        self._apply_contributions(added, 1)
+        
+        # Statistiques suffisantes : + nouvelles contributions - anciennes
+        change = added.groupby('client_id', sort=False)[self.SUM_COLUMNS].sum().sub(
+            removed.groupby('client_id', sort=False)[self.SUM_COLUMNS].sum(), fill_value=0
+        )
+        affected = list(change.index)
+        known = [client_id for client_id in affected if client_id in self._client_sums.index]
+        self._client_sums.loc[known, self.SUM_COLUMNS] += change.loc[known, self.SUM_COLUMNS]
+        new_clients = [client_id for client_id in affected if client_id not in self._client_sums.index]
+        if new_clients:
+            new_sums = change.loc[new_clients, self.SUM_COLUMNS]
+            new_sums.insert(0, 'client_name', added.groupby('client_id')['client_name'].first())
+            self._client_sums = pd.concat([self._client_sums, new_sums])
+        
+        # Clients sans plus aucune facture payée
+        emptied = [client_id for client_id in affected if self._client_sums.at[client_id, 'total_invoices'] <= 0]
+        if emptied:
+            self._client_sums = self._client_sums.drop(emptied)
+            self._client_stats = self._client_stats.drop(emptied, errors='ignore')
+        for client_id in affected:
+            self._patterns.pop(client_id, None)
+            self._client_stats_records.pop(client_id, None)
+            self._stale_clients.discard(client_id)
+        
+        # Moyenne, écart-type et taux tout de suite ; le reste à la demande
+        refreshed = [client_id for client_id in affected if client_id not in emptied]
+        eager = self._stats_from_sums(self._client_sums.loc[refreshed])
+        known = [client_id for client_id in refreshed if client_id in self._client_stats.index]
+        self._client_stats.loc[known, eager.columns] = eager.loc[known]
+        new_rows = eager.loc[[client_id for client_id in refreshed if client_id not in self._client_stats.index]]
+        if len(new_rows):
+            # Colonnes calculées à la demande hors du concat (aucune colonne tout-NA)
+            columns = self._client_stats.columns
+            self._client_stats = pd.concat([self._client_stats, new_rows])[columns]
+        self._stale_clients.update(refreshed)
+        self._paid_invoices = None
+    
+    def mark_paid(
+        self,
+        invoice_ids: List[str],
+        payment_dates,
+        amounts_paid: Optional[List[float]] = None
+    ):
+        """
+        Marque des factures existantes comme payées (voir upsert_invoices).
+        
+        Args:
+            invoice_ids: Factures concernées
+            payment_dates: Date de paiement (une pour toutes, ou une par facture)
+            amounts_paid: Montants réglés, si la colonne amount_paid est suivie
+        """
+        self._ensure_incremental_index()
+        missing = [invoice_id for invoice_id in invoice_ids if invoice_id not in self._invoice_labels]
+        if missing:
+            raise ValueError(f"Factures inconnues: {missing}")
+        
+        delta = self.invoices.loc[[self._invoice_labels[invoice_id] for invoice_id in invoice_ids]].copy()
+        delta['payment_date'] = pd.to_datetime(payment_dates) if np.ndim(payment_dates) else pd.Timestamp(payment_dates)
+        if 'status' in delta.columns:
+            delta['status'] = 'paid'
+        if amounts_paid is not None:
+            delta['amount_paid'] = amounts_paid
+        self.upsert_invoices(delta)
+    
+    def _refresh_stale_clients(self, client_ids):
+        """Recalcule médiane, dates et tendance des clients modifiés"""
+        client_ids = [client_id for client_id in client_ids if client_id in self._stale_clients]
+        if not client_ids:
+            return
+        
+        labels = sorted(set().union(*(self._client_rows[client_id] for client_id in client_ids)))
+        monthly = pd.DataFrame(
+            [
+                (client_id, year_month, bucket[0], bucket[1])
+                for client_id in client_ids
+                for year_month, bucket in self._monthly_buckets.get(client_id, {}).items()
+            ],
+            columns=['client_id', 'year_month', 'delay_sum', 'delay_count']
+        ).set_index(['client_id', 'year_month']).sort_index()
+        
+        lazy = self._lazy_stats(
+            self.invoices.loc[labels],
+            monthly,
+            self._client_sums.loc[client_ids, 'total_invoices']
+        )
+        for column in self.LAZY_COLUMNS:
+            self._client_stats.loc[client_ids, column] = lazy[column]
+        # Colonne passée en float par les lignes NaN des nouveaux clients
+        months = self._client_stats['analysis_period_months']
+        if months.dtype != np.int64 and not months.isna().any():
+            self._client_stats['analysis_period_months'] = months.astype(np.int64)
+        self._client_stats_records.update(self._client_stats.loc[client_ids].to_dict('index'))
+        self._stale_clients.difference_update(client_ids)
     
     def analyze_client(self, client_id: str) -> ClientPaymentPattern:
         """
@@ -94,47 +430,23 @@ class ClientPaymentAnalyzer:
             
         Returns:
             ClientPaymentPattern avec toutes les métriques
+            (mis en cache jusqu'au prochain rechargement des factures)
         """
-        # Filtrer factures du client
-        client_invoices = self.paid_invoices[
-            self.paid_invoices['client_id'] == client_id
-        ].copy()
+        pattern = self._patterns.get(client_id)
+        if pattern is not None:
+            return pattern
         
-        if len(client_invoices) == 0:
+        self._refresh_stale_clients([client_id])
+        stats = self._client_stats_records.get(client_id)
+        if stats is None:
             raise ValueError(f"Aucune facture payée trouvée pour client {client_id}")
         
-        # Récupérer nom client
-        client_name = client_invoices['client_name'].iloc[0] if 'client_name' in client_invoices.columns else client_id
-        
-        # Calculer statistiques de base
-        delays = client_invoices['delay_days'].dropna()
-        avg_delay = float(delays.mean())
-        std_delay = float(delays.std()) if len(delays) > 1 else 0.0
-        median_delay = float(delays.median())
-        
-        # Calculer taux de paiements
-        total_invoices = len(client_invoices)
-        on_time_count = len(client_invoices[client_invoices['delay_days'] <= 0])
-        late_count = len(client_invoices[(client_invoices['delay_days'] > 0) & (client_invoices['delay_days'] <= 60)])
-        very_late_count = len(client_invoices[client_invoices['delay_days'] > 60])
-        
-        on_time_rate = on_time_count / total_invoices if total_invoices > 0 else 0.0
-        late_rate = late_count / total_invoices if total_invoices > 0 else 0.0
-        very_late_rate = very_late_count / total_invoices if total_invoices > 0 else 0.0
-        
-        # Analyser tendance
-        trend, trend_slope = self._calculate_trend(client_invoices)
-        
-        # Détecter paiements partiels (si colonne amount_paid vs amount)
-        has_partial_payments = False
-        partial_payment_count = 0
-        if 'amount' in client_invoices.columns and 'amount_paid' in client_invoices.columns:
-            partial_payments = client_invoices[
-                (client_invoices['amount_paid'] < client_invoices['amount']) & 
-                (client_invoices['amount_paid'] > 0)
-            ]
-            has_partial_payments = len(partial_payments) > 0
-            partial_payment_count = len(partial_payments)
+        trend = stats['trend']
+        trend_slope = stats['trend_slope']
+        partial_payment_count = stats['partial_payment_count']
+        has_partial_payments = partial_payment_count > 0
+        on_time_rate = stats['on_time_rate']
+        std_delay = stats['std_delay_days']
         
         # Calculer reliability_score
         pattern_data = {
@@ -155,82 +467,86 @@ class ClientPaymentAnalyzer:
         else:
             risk_level = "critical"
         
-        # Période d'analyse
-        if len(client_invoices) > 0:
-            date_range = (client_invoices['payment_date'].max() - client_invoices['payment_date'].min())
-            analysis_period_months = max(1, int(date_range.days / 30))
-            last_payment_date = client_invoices['payment_date'].max()
-        else:
-            analysis_period_months = 0
-            last_payment_date = None
-        
-        # Construire et retourner ClientPaymentPattern
-        return ClientPaymentPattern(
+        # Construire, mettre en cache et retourner ClientPaymentPattern
+        pattern = ClientPaymentPattern(
             client_id=client_id,
-            client_name=client_name,
-            avg_delay_days=avg_delay,
+            client_name=stats['client_name'],
+            avg_delay_days=stats['avg_delay_days'],
             std_delay_days=std_delay,
-            median_delay_days=median_delay,
+            median_delay_days=stats['median_delay_days'],
             on_time_rate=on_time_rate,
-            late_rate=late_rate,
-            very_late_rate=very_late_rate,
+            late_rate=stats['late_rate'],
+            very_late_rate=stats['very_late_rate'],
             trend=trend,
             trend_slope=trend_slope,
             has_partial_payments=has_partial_payments,
             partial_payment_count=partial_payment_count,
             reliability_score=reliability_score,
             risk_level=risk_level,
-            total_invoices=total_invoices,
-            analysis_period_months=analysis_period_months,
-            last_payment_date=last_payment_date
+            total_invoices=stats['total_invoices'],
+            analysis_period_months=int(stats['analysis_period_months']),
+            last_payment_date=stats['last_payment_date']
         )
+        self._patterns[client_id] = pattern
+        return pattern
     
-    def _calculate_trend(self, client_invoices: pd.DataFrame) -> tuple[str, float]:
+    def analyze_all(self) -> Dict[str, ClientPaymentPattern]:
         """
-        Calcule la tendance des délais (amélioration/dégradation).
+        Analyse tous les clients ayant des factures payées.
         
-        Args:
-            client_invoices: Factures du client triées par date
-            
         Returns:
-            (trend, slope) où trend = "stable"|"improving"|"worsening"
-            slope = pente en jours/mois
+            Dict client_id -> ClientPaymentPattern (ordre d'apparition),
+            servi depuis le cache pour les clients déjà analysés
         """
-        if len(client_invoices) < 6:
-            # Pas assez de données pour calculer une tendance fiable
-            return "stable", 0.0
-        
-        # Trier par date de paiement
-        sorted_invoices = client_invoices.sort_values('payment_date').copy()
-        
-        # Grouper par mois et calculer délai moyen
-        sorted_invoices['year_month'] = sorted_invoices['payment_date'].dt.to_period('M')
-        monthly_delays = sorted_invoices.groupby('year_month')['delay_days'].mean()
-        
-        if len(monthly_delays) < 3:
-            # Pas assez de mois pour tendance
-            return "stable", 0.0
+        return {
+            client_id: self.analyze_client(client_id)
+            for client_id in self.client_stats.index
+        }
+    
+    def _calculate_all_trends(self, monthly: pd.DataFrame, invoice_counts: pd.Series) -> pd.DataFrame:
+        """
+        Tendance de tous les clients en une passe.
         
-        # Préparer données pour régression linéaire
-        x = np.arange(len(monthly_delays))
-        y = monthly_delays.values
+        Délais moyens mensuels à partir des sommes mensuelles, puis pente
+        des moindres carrés en forme fermée à partir des sommes groupées :
+        x = rang du mois (0..m-1), pente = Σ(x - x̄)y / Σ(x - x̄)².
         
-        # Régression linéaire
-        try:
-            coefficients = np.polyfit(x, y, 1)
-            slope = float(coefficients[0])  # Pente en jours/mois
-            
-            # Déterminer tendance
-            if slope > 3:
-                trend = "worsening"
-            elif slope < -3:
-                trend = "improving"
-            else:
-                trend = "stable"
+        Args:
+            monthly: delay_sum, delay_count indexés par (client_id, year_month) triés
+            invoice_counts: Nombre de factures par client (index client_id)
             
-            return trend, slope
-        except:
-            return "stable", 0.0
+        Returns:
+            DataFrame indexé comme invoice_counts : trend, trend_slope
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            monthly_delays = monthly['delay_sum'] / monthly['delay_count']
+        
+        x = monthly_delays.groupby(level='client_id').cumcount().to_numpy(dtype=float)
+        y = monthly_delays.to_numpy(dtype=float)
+        # Un mois sans délai connu (NaN) rend la pente NaN, comme np.polyfit
+        sums = pd.DataFrame({'y': y, 'xy': x * y, 'm': 1.0}, index=monthly_delays.index).groupby(
+            level='client_id'
+        ).sum(min_count=1)
+        sums.loc[monthly_delays.isna().groupby(level='client_id').any(), ['y', 'xy']] = np.nan
+        m = sums['m']
+        
+        # Σ(x - x̄)y = Σxy - x̄Σy et Σ(x - x̄)² = m(m² - 1)/12 pour x = 0..m-1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (sums['xy'] - (m - 1) / 2 * sums['y']) / (m * (m * m - 1) / 12)
+        
+        # Garde-fous : >= 6 factures et >= 3 mois, sinon "stable" / 0.0
+        eligible = (m >= 3).reindex(invoice_counts.index, fill_value=False)
+        eligible &= invoice_counts >= 6
+        slope = slope.reindex(invoice_counts.index).where(eligible, 0.0)
+        
+        # Pente entière à ±3 (délais entiers) : np.polyfit tranche au bruit
+        # d'arrondi près, on reprend son résultat pour classer à l'identique
+        for client_id in slope.index[eligible & (np.abs(np.abs(slope) - 3) < 1e-9)]:
+            y_client = monthly_delays.loc[client_id].to_numpy(dtype=float)
+            slope[client_id] = float(np.polyfit(np.arange(len(y_client)), y_client, 1)[0])
+        
+        trend = np.select([slope > 3, slope < -3], ["worsening", "improving"], default="stable")
+        return pd.DataFrame({'trend': trend, 'trend_slope': slope.astype(float)}, index=invoice_counts.index)
     
     def _calculate_reliability_score(self, pattern_data: Dict) -> float:
         """
@@ -287,32 +603,24 @@ class ClientPaymentAnalyzer:
         Returns:
             Liste de dicts triée par risk_level (critical first)
         """
-        # Récupérer liste unique des clients
-        client_ids = self.paid_invoices['client_id'].unique()
-        
         summaries = []
-        for client_id in client_ids:
-            try:
-                pattern = self.analyze_client(client_id)
-                # Convertir en dict
-                summary = {
-                    'client_id': pattern.client_id,
-                    'client_name': pattern.client_name,
-                    'avg_delay_days': pattern.avg_delay_days,
-                    'std_delay_days': pattern.std_delay_days,
-                    'on_time_rate': pattern.on_time_rate,
-                    'late_rate': pattern.late_rate,
-                    'trend': pattern.trend,
-                    'trend_slope': pattern.trend_slope,
-                    'reliability_score': pattern.reliability_score,
-                    'risk_level': pattern.risk_level,
-                    'total_invoices': pattern.total_invoices,
-                    'has_partial_payments': pattern.has_partial_payments
-                }
-                summaries.append(summary)
-            except Exception as e:
-                # Skip clients avec erreurs
-                continue
+        for pattern in self.analyze_all().values():
+            # Convertir en dict
+            summary = {
+                'client_id': pattern.client_id,
+                'client_name': pattern.client_name,
+                'avg_delay_days': pattern.avg_delay_days,
+                'std_delay_days': pattern.std_delay_days,
+                'on_time_rate': pattern.on_time_rate,
+                'late_rate': pattern.late_rate,
+                'trend': pattern.trend,
+                'trend_slope': pattern.trend_slope,
+                'reliability_score': pattern.reliability_score,
+                'risk_level': pattern.risk_level,
+                'total_invoices': pattern.total_invoices,
+                'has_partial_payments': pattern.has_partial_payments
+            }
+            summaries.append(summary)
         
         # Trier par risk_level (critical > high > medium > low)
         risk_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
@@ -396,6 +704,74 @@ class ClientPaymentAnalyzer:
             "historical_avg": historical_avg,
             "severity": severity
         }
+    
+    def detect_degradation_all(self, threshold_days: int = 10) -> List[Dict]:
+        """
+        detect_degradation pour tous les clients, en une passe groupée.
+        
+        Fenêtres relatives à la dernière date de paiement de chaque client :
+        3 derniers mois vs les 6 mois précédents.
+        
+        Args:
+            threshold_days: Seuil dégradation en jours (défaut 10)
+            
+        Returns:
+            Dicts de detect_degradation des clients dégradés (ordre d'apparition)
+        """
+        paid = self.paid_invoices
+        if len(paid) == 0 or 'delay_days' not in paid.columns:
+            return []
+        
+        client_ids = paid['client_id']
+        payment_date = paid['payment_date']
+        reference_date = payment_date.groupby(client_ids, sort=False).transform('max')
+        recent = payment_date >= reference_date - timedelta(days=90)
+        historical = (payment_date < reference_date - timedelta(days=90)) & (
+            payment_date >= reference_date - timedelta(days=270)
+        )
+        
+        delays = paid['delay_days']
+        windows = pd.DataFrame({
+            'invoices': 1,
+            'recent_count': recent.astype(int),
+            'recent_known': (recent & delays.notna()).astype(int),
+            'recent_sum': delays.where(recent, 0.0).fillna(0.0),
+            'historical_count': historical.astype(int),
+            'historical_known': (historical & delays.notna()).astype(int),
+            'historical_sum': delays.where(historical, 0.0).fillna(0.0)
+        }).groupby(client_ids, sort=False).sum()
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            recent_avg = windows['recent_sum'] / windows['recent_known']
+            historical_avg = windows['historical_sum'] / windows['historical_known']
+        degradation = recent_avg - historical_avg
+        
+        # Mêmes garde-fous que detect_degradation
+        degraded = (
+            (windows['invoices'] >= 10)
+            & (windows['recent_count'] >= 3)
+            & (windows['historical_count'] >= 3)
+            & ~(degradation <= threshold_days)
+        )
+        result = pd.DataFrame({
+            'degradation_days': degradation,
+            'recent_avg': recent_avg,
+            'historical_avg': historical_avg,
+            'severity': np.select(
+                [degradation < 20, degradation < 30], ["low", "medium"], default="high"
+            )
+        })[degraded]
+        
+        return [
+            {
+                "client_id": client_id,
+                "degradation_days": float(row.degradation_days),
+                "recent_avg": float(row.recent_avg),
+                "historical_avg": float(row.historical_avg),
+                "severity": row.severity
+            }
+            for client_id, row in zip(result.index, result.itertuples(index=False))
+        ]
 
 
 # ============================================================================
@@ -4,7 +4,8 @@ Ajuste probabilités et dates selon historique comportement.
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
@@ -50,6 +51,10 @@ class SmartForecaster:
     Plus précis que simple pondération probabilité.
     """
     
+    # Simulation : taille max d'un lot (tirages x factures) et bins par semaine
+    SIMULATION_BATCH_ELEMENTS = 1_000_000
+    SIMULATION_HISTOGRAM_BINS = 10000
+    
     def __init__(self, payment_analyzer: ClientPaymentAnalyzer):
         """
         Args:
@@ -82,30 +87,7 @@ class SmartForecaster:
         amount = float(invoice['amount'])
         
         # Récupérer pattern client
-        try:
-            pattern = self.analyzer.analyze_client(client_id)
-        except:
-            # Client sans historique : utiliser valeurs par défaut conservatrices
-            from .payment_patterns import ClientPaymentPattern
-            pattern = ClientPaymentPattern(
-                client_id=client_id,
-                client_name=client_name,
-                avg_delay_days=15.0,
-                std_delay_days=10.0,
-                median_delay_days=15.0,
-                on_time_rate=0.5,
-                late_rate=0.3,
-                very_late_rate=0.2,
-                trend="stable",
-                trend_slope=0.0,
-                has_partial_payments=False,
-                partial_payment_count=0,
-                reliability_score=50.0,
-                risk_level="medium",
-                total_invoices=0,
-                analysis_period_months=0,
-                last_payment_date=None
-            )
+        pattern = self._client_pattern(client_id, client_name)
         
         # Calculer expected_payment_date
         expected_payment_date = self._calculate_expected_date(due_date, pattern)
@@ -160,6 +142,32 @@ class SmartForecaster:
             warnings=warnings
         )
     
+    def _client_pattern(self, client_id: str, client_name: str) -> ClientPaymentPattern:
+        """Pattern du client, ou valeurs par défaut s'il n'a pas d'historique"""
+        try:
+            return self.analyzer.analyze_client(client_id)
+        except:
+            # Client sans historique : utiliser valeurs par défaut conservatrices
+            return ClientPaymentPattern(
+                client_id=client_id,
+                client_name=client_name,
+                avg_delay_days=15.0,
+                std_delay_days=10.0,
+                median_delay_days=15.0,
+                on_time_rate=0.5,
+                late_rate=0.3,
+                very_late_rate=0.2,
+                trend="stable",
+                trend_slope=0.0,
+                has_partial_payments=False,
+                partial_payment_count=0,
+                reliability_score=50.0,
+                risk_level="medium",
+                total_invoices=0,
+                analysis_period_months=0,
+                last_payment_date=None
+            )
+    
     def _calculate_expected_date(
         self,
         due_date: datetime,
@@ -175,6 +183,13 @@ class SmartForecaster:
         Returns:
             Date attendue (due_date + délai moyen ajusté)
         """
+        # Calculer date attendue
+        expected_date = due_date + timedelta(days=self._adjusted_delay(pattern))
+        
+        return expected_date
+    
+    def _adjusted_delay(self, pattern: ClientPaymentPattern) -> float:
+        """Délai moyen du client ajusté selon sa tendance (jours)"""
         # Délai de base
         adjusted_delay = pattern.avg_delay_days
         
@@ -184,10 +199,7 @@ class SmartForecaster:
         elif pattern.trend == "improving":
             adjusted_delay = max(0, adjusted_delay - 3)  # Réduire 3 jours si amélioration
         
-        # Calculer date attendue
-        expected_date = due_date + timedelta(days=adjusted_delay)
-        
-        return expected_date
+        return adjusted_delay
     
     def _calculate_probabilities(
         self,
@@ -343,21 +355,207 @@ class SmartForecaster:
         
         return warnings
     
+    def forecast_frame(
+        self,
+        pending_invoices: Union[List[Dict], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Prévisions de toutes les factures, en colonnes.
+        
+        Les indicateurs (délai ajusté, probabilités, confiance) sont calculés
+        une fois par client puis joints aux factures : aucun pattern n'est
+        recalculé par facture. Les factures sans date ou montant valides
+        sont ignorées, comme dans forecast_portfolio.
+        
+        Args:
+            pending_invoices: Factures en attente (liste de dicts ou DataFrame)
+            
+        Returns:
+            DataFrame : invoice_id, client_id, due_date, expected_payment_date,
+            amount, expected_amount, probability_on_time/late/very_late/default,
+            confidence_score, avg_delay_days, std_delay_days
+        """
+        invoices = (
+            pending_invoices if isinstance(pending_invoices, pd.DataFrame)
+            else pd.DataFrame(list(pending_invoices))
+        )
+        columns = [
+            'invoice_id', 'client_id', 'due_date', 'expected_payment_date', 'amount',
+            'expected_amount', 'probability_on_time', 'probability_late',
+            'probability_very_late', 'probability_default', 'confidence_score',
+            'avg_delay_days', 'std_delay_days'
+        ]
+        if len(invoices) == 0:
+            return pd.DataFrame(columns=columns)
+        
+        due_date = pd.to_datetime(invoices['due_date'], errors='coerce')
+        if due_date.dt.tz is not None:
+            due_date = due_date.dt.tz_localize(None)
+        amount = pd.to_numeric(invoices['amount'], errors='coerce')
+        valid = (due_date.notna() & amount.notna()).to_numpy()
+        invoices = invoices[valid]
+        due_date = due_date[valid]
+        amount = amount[valid].to_numpy(dtype=float)
+        
+        # Table par client
+        client_names = (
+            invoices['client_name'] if 'client_name' in invoices.columns else invoices['client_id']
+        ).groupby(invoices['client_id'], sort=False).first()
+        rows = []
+        for client_id, client_name in client_names.items():
+            pattern = self._client_pattern(client_id, client_name)
+            probabilities = self._calculate_probabilities(pattern, 0)
+            rows.append((
+                self._adjusted_delay(pattern),
+                0.9 if pattern.has_partial_payments else 1.0,
+                probabilities['on_time'],
+                probabilities['late'],
+                probabilities['very_late'],
+                probabilities['default'],
+                self._assess_confidence(pattern)[1],
+                pattern.avg_delay_days,
+                pattern.std_delay_days
+            ))
+        table = np.array(rows, dtype=float).reshape(-1, 9)
+        per_invoice = table[client_names.index.get_indexer(invoices['client_id'])]
+        
+        # Date attendue : échéance + délai ajusté (arrondi à la microseconde),
+        # NaT si le client n'a aucun délai connu
+        delay = per_invoice[:, 0]
+        finite = np.isfinite(delay)
+        delay_us = np.round(np.where(finite, delay, 0) * 86400e6).astype('int64')
+        expected_payment_date = (due_date + pd.to_timedelta(delay_us, unit='us')).where(finite)
+        
+        frame = pd.DataFrame({
+            'invoice_id': invoices['invoice_id'].to_numpy() if 'invoice_id' in invoices.columns else None,
+            'client_id': invoices['client_id'].to_numpy(),
+            'due_date': due_date.to_numpy(),
+            'expected_payment_date': expected_payment_date.to_numpy(),
+            'amount': amount,
+            # Réduction conservatrice de 10% si paiements partiels
+            'expected_amount': amount * per_invoice[:, 1]
+        })
+        for position, column in enumerate(columns[6:], start=2):
+            frame[column] = per_invoice[:, position]
+        return frame
+    
     def forecast_portfolio(
         self,
-        pending_invoices: List[Dict],
-        horizon_weeks: int = 13
+        pending_invoices: Union[List[Dict], pd.DataFrame],
+        horizon_weeks: int = 13,
+        vectorized: bool = True,
+        reference_date: Optional[datetime] = None
     ) -> Dict:
         """
         Prévisions pour tout le portefeuille sur N semaines.
         
         Args:
-            pending_invoices: Liste factures en attente
+            pending_invoices: Liste factures en attente (ou DataFrame)
             horizon_weeks: Horizon prévision (défaut 13 semaines = 1 trimestre)
+            vectorized: Calcul en colonnes (forecast_frame) et agrégation
+                hebdomadaire par np.bincount. False = forecast_invoice par
+                facture (même résultat)
+            reference_date: Début de la semaine 1 (défaut: maintenant)
             
         Returns:
             Dict avec prévisions agrégées par semaine
         """
+        reference_date = reference_date or datetime.now()
+        if not vectorized:
+            return self._forecast_portfolio_by_invoice(pending_invoices, horizon_weeks, reference_date)
+        
+        frame = self.forecast_frame(pending_invoices)
+        
+        # Semaine de chaque encaissement attendu (hors horizon = ignoré)
+        offset = (frame['expected_payment_date'] - pd.Timestamp(reference_date)).to_numpy()
+        dated = ~np.isnat(offset)  # date attendue inconnue = ignorée
+        week = np.floor_divide(np.where(dated, offset, np.timedelta64(0)), np.timedelta64(7, 'D')).astype(np.int64)
+        in_horizon = dated & (offset >= np.timedelta64(0)) & (week < horizon_weeks)
+        week = week[in_horizon]
+        
+        def weekly_sum(weights: np.ndarray) -> np.ndarray:
+            return np.bincount(week, weights=weights[in_horizon], minlength=horizon_weeks)
+        
+        expected_amount = frame['expected_amount'].to_numpy(dtype=float)
+        counts = np.bincount(week, minlength=horizon_weeks)
+        # Montants pondérés par probabilités
+        expected = weekly_sum(
+            expected_amount
+            * (frame['probability_on_time'].to_numpy(dtype=float) + frame['probability_late'].to_numpy(dtype=float))
+        )
+        # Scénario optimiste (tout à temps)
+        maximum = weekly_sum(frame['amount'].to_numpy(dtype=float))
+        # Scénario pessimiste (retards + defaults)
+        minimum = weekly_sum(expected_amount * (1 - frame['probability_default'].to_numpy(dtype=float)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_confidence = weekly_sum(frame['confidence_score'].to_numpy(dtype=float)) / counts
+        
+        weekly_forecasts = []
+        for week_num in range(horizon_weeks):
+            count = int(counts[week_num])
+            if count > 0:
+                if avg_confidence[week_num] > 0.8:
+                    confidence = "high"
+                elif avg_confidence[week_num] > 0.6:
+                    confidence = "medium"
+                else:
+                    confidence = "low"
+            else:
+                confidence = "high"
+            weekly_forecasts.append({
+                'week': week_num + 1,
+                'week_start': (reference_date + timedelta(weeks=week_num)).isoformat(),
+                'expected_amount': round(float(expected[week_num]), 2) if count else 0,
+                'min_amount': round(float(minimum[week_num]), 2) if count else 0,
+                'max_amount': round(float(maximum[week_num]), 2) if count else 0,
+                'confidence': confidence,
+                'invoice_count': count
+            })
+        
+        return self._portfolio_summary(
+            weekly_forecasts,
+            total_at_risk=float(np.sum(expected_amount * frame['probability_default'].to_numpy(dtype=float))),
+            horizon_weeks=horizon_weeks,
+            total_invoices=len(frame)
+        )
+    
+    def _portfolio_summary(
+        self,
+        weekly_forecasts: List[Dict],
+        total_at_risk: float,
+        horizon_weeks: int,
+        total_invoices: int
+    ) -> Dict:
+        """Semaines à risque et totaux du portefeuille"""
+        # Identifier semaines à risque (encaissement < seuil)
+        risk_threshold = 10000  # Seuil arbitraire
+        risk_weeks = [
+            w['week'] for w in weekly_forecasts
+            if w['expected_amount'] < risk_threshold and w['invoice_count'] > 0
+        ]
+        
+        # Totaux
+        total_expected = sum(w['expected_amount'] for w in weekly_forecasts)
+        
+        return {
+            'weekly_forecasts': weekly_forecasts,
+            'risk_weeks': risk_weeks,
+            'total_expected': round(total_expected, 2),
+            'total_at_risk': round(total_at_risk, 2),
+            'horizon_weeks': horizon_weeks,
+            'total_invoices': total_invoices
+        }
+    
+    def _forecast_portfolio_by_invoice(
+        self,
+        pending_invoices: Union[List[Dict], pd.DataFrame],
+        horizon_weeks: int,
+        reference_date: datetime
+    ) -> Dict:
+        """forecast_portfolio facture par facture (forecast_invoice)"""
+        if isinstance(pending_invoices, pd.DataFrame):
+            pending_invoices = pending_invoices.to_dict('records')
+        
         # Générer prévisions pour toutes les factures
         forecasts = []
         for invoice in pending_invoices:
@@ -370,7 +568,6 @@ class SmartForecaster:
         
         # Grouper par semaine
         weekly_forecasts = []
-        reference_date = datetime.now()
         
         for week_num in range(horizon_weeks):
             week_start = reference_date + timedelta(weeks=week_num)
@@ -422,28 +619,197 @@ class SmartForecaster:
                 'invoice_count': len(week_forecasts)
             })
         
-        # Identifier semaines à risque (encaissement < seuil)
-        risk_threshold = 10000  # Seuil arbitraire
-        risk_weeks = [
-            w['week'] for w in weekly_forecasts
-            if w['expected_amount'] < risk_threshold and w['invoice_count'] > 0
-        ]
-        
-        # Totaux
-        total_expected = sum(w['expected_amount'] for w in weekly_forecasts)
-        total_at_risk = sum(
-            f.expected_amount * f.probability_default
-            for f in forecasts
+        return self._portfolio_summary(
+            weekly_forecasts,
+            total_at_risk=sum(f.expected_amount * f.probability_default for f in forecasts),
+            horizon_weeks=horizon_weeks,
+            total_invoices=len(forecasts)
         )
+    
+    def simulate_portfolio(
+        self,
+        pending_invoices: Union[List[Dict], pd.DataFrame],
+        horizon_weeks: int = 13,
+        n_simulations: int = 5000,
+        cash_threshold: float = 10000,
+        distribution: str = "empirical",
+        seed: Optional[int] = None,
+        reference_date: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Distribution des encaissements hebdomadaires par simulation.
+        
+        Pour chaque tirage, le délai de chaque facture est échantillonné :
+        - "empirical" : parmi les retards historiques du client (décalés de
+          l'ajustement de tendance), loi normale si le client n'a pas d'historique
+        - "normal" : loi normale (délai ajusté, écart-type du client)
+        La facture fait défaut avec sa probabilité de défaut. Un paiement
+        simulé antérieur à reference_date compte en semaine 1 (facture encore
+        en attente), au-delà de l'horizon il est ignoré.
+        
+        Les tirages sont traités par lots et seuls des histogrammes par semaine
+        sont conservés : la mémoire ne dépend pas de n_simulations. Les
+        quantiles sont interpolés dans l'histogramme (résolution = montant
+        total / SIMULATION_HISTOGRAM_BINS), la moyenne et la probabilité de
+        passer sous le seuil sont exactes.
+        
+        Args:
+            pending_invoices: Factures en attente (liste de dicts ou DataFrame)
+            horizon_weeks: Horizon (défaut 13 semaines)
+            n_simulations: Nombre de tirages
+            cash_threshold: Seuil d'encaissement hebdomadaire
+            distribution: "empirical" ou "normal"
+            seed: Graine (reproductibilité)
+            reference_date: Début de la semaine 1 (défaut: maintenant)
+            
+        Returns:
+            Dict avec bandes P10/P50/P90 et probabilité sous le seuil par semaine
+        """
+        if distribution not in ("empirical", "normal"):
+            raise ValueError(f"Distribution inconnue: {distribution}")
+        reference_date = reference_date or datetime.now()
+        rng = np.random.default_rng(seed)
+        
+        frame = self.forecast_frame(pending_invoices)
+        n_invoices = len(frame)
+        due_offset = (
+            (frame['due_date'] - pd.Timestamp(reference_date)) / pd.Timedelta(days=1)
+        ).to_numpy(dtype=float)
+        adjusted_delay = (
+            (frame['expected_payment_date'] - frame['due_date']) / pd.Timedelta(days=1)
+        ).to_numpy(dtype=float)
+        std_delay = frame['std_delay_days'].to_numpy(dtype=float)
+        expected_amount = frame['expected_amount'].to_numpy(dtype=float)
+        probability_default = frame['probability_default'].to_numpy(dtype=float)
+        
+        # Retards historiques regroupés par client : pool[start : start + count]
+        pool = np.empty(0)
+        start = np.zeros(n_invoices, dtype=np.int64)
+        count = np.zeros(n_invoices, dtype=np.int64)
+        if distribution == "empirical" and n_invoices > 0:
+            paid = self.analyzer.paid_invoices
+            # Retards non exploitables (payée sans payment_date) exclus du pool :
+            # un client sans retard valide passe en tirage paramétrique
+            paid = paid[np.isfinite(paid['delay_days'].to_numpy(dtype=float))]
+            codes, clients = pd.factorize(paid['client_id'])
+            pool = paid['delay_days'].to_numpy(dtype=float)[np.argsort(codes, kind='stable')]
+            client_counts = np.bincount(codes, minlength=len(clients))
+            client_starts = np.cumsum(client_counts) - client_counts
+            position = clients.get_indexer(frame['client_id'])
+            known = position >= 0
+            start[known] = client_starts[position[known]]
+            count[known] = client_counts[position[known]]
+        empirical = count > 0
+        parametric = ~empirical
+        # Décalage de tendance appliqué aux retards historiques
+        shift = adjusted_delay - frame['avg_delay_days'].to_numpy(dtype=float)
+        
+        # Histogrammes : une ligne par semaine + une pour le total de l'horizon
+        n_bins = self.SIMULATION_HISTOGRAM_BINS
+        upper = max(float(expected_amount.sum()), 1.0)
+        histograms = np.zeros((horizon_weeks + 1, n_bins), dtype=np.int64)
+        sums = np.zeros(horizon_weeks + 1)
+        zeros = np.zeros(horizon_weeks + 1, dtype=np.int64)
+        below = np.zeros(horizon_weeks, dtype=np.int64)
+        
+        batch_size = max(1, min(n_simulations, self.SIMULATION_BATCH_ELEMENTS // max(n_invoices, 1)))
+        done = 0
+        while done < n_simulations:
+            size = min(batch_size, n_simulations - done)
+            done += size
+            
+            delay = np.empty((size, n_invoices))
+            if empirical.any():
+                draw = (rng.random((size, int(empirical.sum()))) * count[empirical]).astype(np.int64)
+                delay[:, empirical] = pool[start[empirical] + draw] + shift[empirical]
+            if parametric.any():
+                delay[:, parametric] = rng.normal(
+                    adjusted_delay[parametric], std_delay[parametric], (size, int(parametric.sum()))
+                )
+            # Délai non défini (client sans retard exploitable) : pas d'encaissement
+            days = due_offset + delay
+            finite = np.isfinite(days)
+            week = np.maximum(np.floor(np.where(finite, days, 0) / 7), 0).astype(np.int64)
+            collected = finite & (week < horizon_weeks) & (rng.random((size, n_invoices)) >= probability_default)
+            
+            rows = np.broadcast_to(np.arange(size)[:, None], week.shape)
+            weekly = np.bincount(
+                (rows * horizon_weeks + week)[collected],
+                weights=np.broadcast_to(expected_amount, week.shape)[collected],
+                minlength=size * horizon_weeks
+            ).reshape(size, horizon_weeks)
+            totals = np.column_stack([weekly, weekly.sum(axis=1)])
+            
+            bins = np.minimum((totals / upper * n_bins).astype(np.int64), n_bins - 1)
+            histograms += np.bincount(
+                (np.arange(horizon_weeks + 1) * n_bins + bins).ravel(),
+                minlength=(horizon_weeks + 1) * n_bins
+            ).reshape(horizon_weeks + 1, n_bins)
+            sums += totals.sum(axis=0)
+            zeros += (totals == 0).sum(axis=0)
+            below += (weekly < cash_threshold).sum(axis=0)
+        
+        quantiles = self._histogram_quantiles(histograms, zeros, upper, [0.10, 0.50, 0.90])
+        means = sums / max(n_simulations, 1)
+        probability_below = below / max(n_simulations, 1)
+        
+        weekly_forecasts = [
+            {
+                'week': week_num + 1,
+                'week_start': (reference_date + timedelta(weeks=week_num)).isoformat(),
+                'p10': round(float(quantiles[week_num, 0]), 2),
+                'p50': round(float(quantiles[week_num, 1]), 2),
+                'p90': round(float(quantiles[week_num, 2]), 2),
+                'mean': round(float(means[week_num]), 2),
+                'probability_below_threshold': round(float(probability_below[week_num]), 4)
+            }
+            for week_num in range(horizon_weeks)
+        ]
         
         return {
             'weekly_forecasts': weekly_forecasts,
-            'risk_weeks': risk_weeks,
-            'total_expected': round(total_expected, 2),
-            'total_at_risk': round(total_at_risk, 2),
+            'total': {
+                'p10': round(float(quantiles[-1, 0]), 2),
+                'p50': round(float(quantiles[-1, 1]), 2),
+                'p90': round(float(quantiles[-1, 2]), 2),
+                'mean': round(float(means[-1]), 2)
+            },
+            'cash_threshold': cash_threshold,
+            'distribution': distribution,
+            'n_simulations': n_simulations,
             'horizon_weeks': horizon_weeks,
-            'total_invoices': len(forecasts)
+            'total_invoices': n_invoices
         }
+    
+    def _histogram_quantiles(
+        self,
+        histograms: np.ndarray,
+        zeros: np.ndarray,
+        upper: float,
+        probabilities: List[float]
+    ) -> np.ndarray:
+        """
+        Quantiles de chaque ligne d'histogramme (interpolation linéaire dans
+        le bin). zeros = nombre de tirages exactement nuls par ligne : un
+        quantile qui tombe parmi eux vaut 0.
+        """
+        n_rows, n_bins = histograms.shape
+        width = upper / n_bins
+        cumulative = np.cumsum(histograms, axis=1)
+        n = np.maximum(cumulative[:, -1], 1)
+        result = np.zeros((n_rows, len(probabilities)))
+        for column, probability in enumerate(probabilities):
+            target = probability * n
+            # Premier bin où la fréquence cumulée atteint la cible
+            index = np.minimum((cumulative < target[:, None]).sum(axis=1), n_bins - 1)
+            rows = np.arange(n_rows)
+            before = cumulative[rows, index] - histograms[rows, index]
+            inside = np.divide(
+                target - before, histograms[rows, index],
+                out=np.zeros(n_rows), where=histograms[rows, index] > 0
+            )
+            result[:, column] = np.where(target <= zeros, 0.0, (index + inside) * width)
+        return result
 
 
 # ============================================================================
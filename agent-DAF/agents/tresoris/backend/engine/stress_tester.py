@@ -10,13 +10,25 @@ Effet démo visé :
 "Si Client X part + matières +15%, votre runway tombe à 2.3 mois."
 """
 
+from collections import OrderedDict
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
 import pandas as pd
 import numpy as np
 from scipy import stats
+from scipy.special import ndtr, ndtri
+from scipy.stats import qmc
 
 
 class StressType(str, Enum):
@@ -27,6 +39,14 @@ class StressType(str, Enum):
     REVERSE = "reverse"                 # Stress inversé (quel choc pour casser?)
 
 
+class VarianceReduction(str, Enum):
+    """Stratégie d'échantillonnage du Monte Carlo"""
+    NONE = "none"                       # Pseudo-aléatoire simple
+    ANTITHETIC = "antithetic"           # Paires (Z, -Z)
+    CONTROL_VARIATE = "control_variate" # Correction par l'espérance analytique du cash
+    SOBOL = "sobol"                     # Quasi Monte Carlo (Sobol brouillé)
+
+
 class RiskLevel(str, Enum):
     """Niveau de risque résultant"""
     LOW = "low"                 # < 10% de probabilité de stress
@@ -101,7 +121,16 @@ class MonteCarloResult:
     # Simulations détaillées (sample)
     sample_paths: List[Dict]
     
+    # Échantillonnage
+    variance_reduction: str = VarianceReduction.NONE.value
+    standard_errors: Dict[str, float] = field(default_factory=dict)  # {negative_cash: 0.002, ...}
+    converged: Optional[bool] = None    # Mode adaptatif : précision cible atteinte
+    
+    # Modèle multi-facteurs : contribution de chaque facteur
+    factor_attribution: Optional[Dict[str, Dict]] = None
+    
     def to_dict(self) -> Dict:
+        se = self.standard_errors
         return {
             "n_simulations": self.n_simulations,
             "cash_distribution": {
@@ -116,7 +145,14 @@ class MonteCarloResult:
             "probabilities": {
                 "negative_cash_pct": round(self.prob_negative_cash * 100, 1),
                 "under_safety_pct": round(self.prob_under_safety * 100, 1),
-                "severe_stress_pct": round(self.prob_severe_stress * 100, 1)
+                "severe_stress_pct": round(self.prob_severe_stress * 100, 1),
+                "negative_cash_se_pct": round(se.get("negative_cash", 0) * 100, 2),
+                "under_safety_se_pct": round(se.get("under_safety", 0) * 100, 2),
+                "severe_stress_se_pct": round(se.get("severe_stress", 0) * 100, 2)
+            },
+            "sampling": {
+                "method": self.variance_reduction,
+                "converged": self.converged
             },
             "runway_months": {
                 "mean": round(self.runway_mean, 1),
@@ -127,6 +163,7 @@ class MonteCarloResult:
                 "var_95": round(self.var_95, 0),
                 "cvar_95": round(self.cvar_95, 0)
             },
+            "factor_attribution": self.factor_attribution,
             "sample_paths": self.sample_paths[:5]  # Top 5 pour affichage
         }
 
@@ -175,14 +212,79 @@ class ReverseStressResult:
     
     interpretation: str
     
+    # Surface de rupture : chocs (revenus, coûts, DSO) au point de rupture
+    # par direction, et distance de Mahalanobis correspondante (inf = pas
+    # de rupture dans le rayon exploré)
+    breaking_surface: Optional[np.ndarray] = None
+    breaking_sigma: Optional[np.ndarray] = None
+    
+    def surface_points(self, limit: int = 200) -> List[Dict]:
+        """Points de rupture les plus probables (distance croissante)"""
+        if self.breaking_surface is None:
+            return []
+        finite = np.flatnonzero(np.isfinite(self.breaking_sigma))
+        order = finite[np.argsort(self.breaking_sigma[finite], kind="stable")][:limit]
+        return [
+            {
+                "revenue_shock": round(float(rev), 4),
+                "cost_shock": round(float(cost), 4),
+                "dso_shock_days": round(float(dso), 1),
+                "sigma": round(float(self.breaking_sigma[i]), 3)
+            }
+            for i, (rev, cost, dso) in zip(order, self.breaking_surface[order])
+        ]
+    
     def to_dict(self) -> Dict:
+        n_directions = 0 if self.breaking_sigma is None else len(self.breaking_sigma)
+        n_breaking = 0 if self.breaking_sigma is None else int(np.isfinite(self.breaking_sigma).sum())
         return {
             "question": self.question,
             "breaking_points": self.breaking_points,
             "minimal_combined_shock": self.minimal_combined_shock,
             "scenario_probability_pct": round(self.scenario_probability * 100, 2),
             "time_to_impact_months": round(self.time_to_impact_months, 1),
-            "interpretation": self.interpretation
+            "interpretation": self.interpretation,
+            "breaking_surface": {
+                "n_directions": n_directions,
+                "n_breaking": n_breaking,
+                "points": self.surface_points()
+            }
+        }
+
+
+@dataclass
+class ScenarioGridResult:
+    """Grille de scénarios déterministes (revenus × coûts × DSO)"""
+    revenue_changes: np.ndarray         # Axe 0 : variations CA (-0.2 = -20%)
+    cost_changes: np.ndarray            # Axe 1 : variations coûts
+    dso_changes: np.ndarray             # Axe 2 : variations DSO (jours)
+    horizon_months: int
+    
+    # Tenseurs (len(revenue), len(cost), len(dso))
+    cash_at_horizon: np.ndarray
+    cash_impact: np.ndarray             # vs scénario de base
+    runway_months: np.ndarray           # inf si pas de burn
+    survival_probability: np.ndarray
+    
+    @property
+    def n_scenarios(self) -> int:
+        return int(self.cash_impact.size)
+    
+    def to_dict(self) -> Dict:
+        """Format heatmap : axes + tenseurs en listes imbriquées"""
+        runway = np.where(np.isfinite(self.runway_months), self.runway_months, 999)
+        return {
+            "n_scenarios": self.n_scenarios,
+            "horizon_months": self.horizon_months,
+            "axes": {
+                "revenue_change_pct": (self.revenue_changes * 100).round(1).tolist(),
+                "cost_change_pct": (self.cost_changes * 100).round(1).tolist(),
+                "dso_change_days": self.dso_changes.round(0).tolist()
+            },
+            "cash_at_horizon": self.cash_at_horizon.round(0).tolist(),
+            "cash_impact": self.cash_impact.round(0).tolist(),
+            "runway_months": runway.round(1).tolist(),
+            "survival_pct": (self.survival_probability * 100).round(1).tolist()
         }
 
 
@@ -249,6 +351,589 @@ class StressTestResult:
         }
 
 
+def _standard_normals(
+    rng: np.random.Generator,
+    n_paths: int,
+    dim: int,
+    sampling: str = VarianceReduction.NONE.value,
+    replicate_size: int = 1024
+) -> np.ndarray:
+    """
+    Matrice (n_paths, dim) de N(0, 1) selon la stratégie d'échantillonnage.
+    
+    - antithetic : lignes i et i + ceil(n/2) sont opposées
+    - sobol : réplicats consécutifs de replicate_size points, chacun
+      un Sobol brouillé indépendant (d'où une erreur standard mesurable)
+    """
+    if sampling == VarianceReduction.ANTITHETIC.value:
+        half = -(-n_paths // 2)
+        z = rng.standard_normal((half, dim))
+        return np.concatenate([z, -z])[:n_paths]
+    
+    if sampling == VarianceReduction.SOBOL.value:
+        m = int(np.log2(replicate_size))
+        replicates = []
+        for _ in range(-(-n_paths // replicate_size)):
+            u = qmc.Sobol(d=dim, scramble=True, seed=rng).random_base2(m)
+            replicates.append(ndtri(np.clip(u, 1e-12, 1 - 1e-12)))
+        return np.concatenate(replicates)[:n_paths]
+    
+    return rng.standard_normal((n_paths, dim))
+
+
+def _simulate_paths(
+    rng: np.random.Generator,
+    n_paths: int,
+    horizon_months: int,
+    current_cash: float,
+    monthly_revenues: float,
+    monthly_costs: float,
+    revenue_volatility: float,
+    cost_volatility: float,
+    sampling: str = VarianceReduction.NONE.value,
+    replicate_size: int = 1024
+) -> np.ndarray:
+    """
+    Tire n_paths trajectoires de cash (n_paths, horizon_months).
+    
+    Revenus et coûts suivent des chocs log-normaux de moyenne 1.
+    Fonction de module (et non méthode) pour rester picklable.
+    """
+    z = _standard_normals(rng, n_paths, 2 * horizon_months, sampling, replicate_size)
+    revenue_shocks = z[:, :horizon_months] * revenue_volatility - 0.5 * revenue_volatility**2
+    cost_shocks = z[:, horizon_months:] * cost_volatility - 0.5 * cost_volatility**2
+    del z
+    
+    # Flux nets mensuels puis trajectoires (in-place pour limiter la mémoire)
+    net_flows = monthly_revenues * np.exp(revenue_shocks, out=revenue_shocks)
+    net_flows -= monthly_costs * np.exp(cost_shocks, out=cost_shocks)
+    del cost_shocks
+    
+    paths = np.cumsum(net_flows, axis=1, out=net_flows)
+    paths += current_cash
+    return paths
+
+
+FACTOR_NAMES = ("revenue", "cost", "dso")
+MAX_DSO_DAYS = 360
+
+
+def _factor_cholesky(correlations: Optional[Dict[str, float]]) -> np.ndarray:
+    """
+    Facteur de Cholesky de la corrélation (revenus, coûts, DSO).
+    
+    Args:
+        correlations: {"revenue_cost": ρ, "revenue_dso": ρ, "cost_dso": ρ}
+    """
+    correlations = correlations or {}
+    matrix = np.eye(len(FACTOR_NAMES))
+    for i, a in enumerate(FACTOR_NAMES):
+        for j, b in enumerate(FACTOR_NAMES[i + 1:], start=i + 1):
+            rho = correlations.get(f"{a}_{b}", correlations.get(f"{b}_{a}", 0.0))
+            matrix[i, j] = matrix[j, i] = rho
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        raise ValueError(f"Matrice de corrélation non définie positive: {correlations}")
+
+
+def _simulate_multi_factor_paths(
+    rng: np.random.Generator,
+    n_paths: int,
+    horizon_months: int,
+    current_cash: float,
+    monthly_revenues: float,
+    monthly_costs: float,
+    revenue_volatility: float,
+    cost_volatility: float,
+    dso_volatility_days: float,
+    base_dso_days: float,
+    cholesky: np.ndarray,
+    sampling: str = VarianceReduction.NONE.value,
+    replicate_size: int = 1024
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trajectoires de cash avec chocs corrélés revenus / coûts / DSO.
+    
+    Le CA est facturé chaque mois puis encaissé avec un retard DSO_m
+    (marche aléatoire autour de base_dso_days). Les encaissements cumulés
+    fin de mois m valent B(m + 1 - DSO_m/30), où B est la facturation
+    cumulée interpolée : un simple décalage d'indices sur toute la matrice.
+    
+    Returns:
+        (paths (n, h), effets (n, 3)) - effets revenus, coûts et DSO sur le
+        cash final, relativement au scénario moyen. Leur somme vaut
+        cash_final - (current_cash + h × (revenus - coûts)).
+    """
+    n, h = n_paths, horizon_months
+    z = _standard_normals(rng, n, 3 * h, sampling, replicate_size).reshape(n, 3, h)
+    shocks = np.einsum("ij,njh->nih", cholesky, z)
+    del z
+    
+    revenues = monthly_revenues * np.exp(
+        shocks[:, 0] * revenue_volatility - 0.5 * revenue_volatility**2
+    )
+    costs = monthly_costs * np.exp(shocks[:, 1] * cost_volatility - 0.5 * cost_volatility**2)
+    dso = np.clip(
+        base_dso_days + np.cumsum(shocks[:, 2] * dso_volatility_days, axis=1), 0, MAX_DSO_DAYS
+    )
+    del shocks
+    
+    # Facturation : K mois historiques (niveau moyen) puis les h mois simulés
+    k = int(np.ceil(MAX_DSO_DAYS / 30)) + 1
+    billed = np.concatenate([np.full((n, k), float(monthly_revenues)), revenues], axis=1)
+    billed_cum = np.concatenate([np.zeros((n, 1)), np.cumsum(billed, axis=1)], axis=1)
+    
+    def cumulative_billing(t: np.ndarray) -> np.ndarray:
+        """B(t) pour des temps (n, m) exprimés en mois depuis le début du padding"""
+        i = np.clip(np.floor(t).astype(int), 0, billed.shape[1] - 1)
+        fraction = t - i
+        return (
+            np.take_along_axis(billed_cum, i, axis=1)
+            + fraction * np.take_along_axis(billed, i, axis=1)
+        )
+    
+    months_end = k + np.arange(1, h + 1)[None, :]
+    start = cumulative_billing(np.full((n, 1), k - base_dso_days / 30))
+    
+    # Encaissements cumulés (non décroissants) puis flux mensuels
+    collected_cum = np.maximum.accumulate(cumulative_billing(months_end - dso / 30), axis=1)
+    collected = np.diff(np.concatenate([start, collected_cum], axis=1), axis=1)
+    
+    paths = np.cumsum(collected - costs, axis=1)
+    paths += current_cash
+    
+    # Attribution : facturation au DSO de base vs encaissement réel
+    base_collected = cumulative_billing(
+        np.full((n, 1), k + h - base_dso_days / 30)
+    )[:, 0] - start[:, 0]
+    factors = np.stack([
+        base_collected - h * monthly_revenues,
+        -(costs.sum(axis=1) - h * monthly_costs),
+        collected_cum[:, -1] - start[:, 0] - base_collected
+    ], axis=1)
+    
+    return paths, factors
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MONTE CARLO EN FLUX - accumulateur à mémoire constante
+# ═══════════════════════════════════════════════════════════════════════════════
+
+HISTOGRAM_BINS = 4096           # Résolution des percentiles
+TAIL_MARGIN = 1.2               # Marge sur la taille du buffer de queue (CVaR)
+TAIL_BUFFER_MAX = 100000        # Au-delà, la queue est complétée par l'histogramme
+Z_95 = 1.959963984540054        # Quantile normal de l'intervalle de confiance à 95%
+PROBABILITY_NAMES = ("negative_cash", "under_safety", "severe_stress")
+
+
+def _sample_paths(paths: np.ndarray, current_cash: float, limit: int = 50) -> List[Dict]:
+    """Premières trajectoires d'un bloc, pour visualisation"""
+    return [
+        {
+            "simulation_id": i,
+            "path": [round(c, 0) for c in [current_cash, *paths[i].tolist()]],
+            "final_cash": round(float(paths[i, -1]), 0)
+        }
+        for i in range(min(len(paths), limit))
+    ]
+
+
+def _histogram_edges(
+    current_cash: float,
+    monthly_revenues: float,
+    monthly_costs: float,
+    revenue_volatility: float,
+    cost_volatility: float,
+    horizon_months: int,
+    dso_volatility_days: float = 0.0,
+    bins: int = HISTOGRAM_BINS
+) -> np.ndarray:
+    """
+    Bornes d'histogramme communes à tous les accumulateurs.
+    
+    Centrées sur l'espérance analytique du cash final, ±10 écarts-types
+    (les valeurs hors bornes tombent dans les bins extrêmes). Avec le
+    facteur DSO, les écarts-types s'additionnent (borne haute, quelle que
+    soit la corrélation).
+    """
+    mean = current_cash + horizon_months * (monthly_revenues - monthly_costs)
+    std = (
+        np.sqrt(horizon_months * monthly_revenues**2 * np.expm1(revenue_volatility**2))
+        + np.sqrt(horizon_months * monthly_costs**2 * np.expm1(cost_volatility**2))
+        + monthly_revenues / 30 * dso_volatility_days * np.sqrt(horizon_months)
+    )
+    half_width = 10 * std if std > 0 else max(abs(mean), 1.0)
+    return np.linspace(mean - half_width, mean + half_width, bins + 1)
+
+
+class MonteCarloAccumulator:
+    """
+    Statistiques en flux sur le cash final des trajectoires.
+    
+    La mémoire ne dépend pas du nombre de trajectoires :
+    - compteurs de seuils, moyenne et variance (fusion de Chan et al.)
+    - min/max courants
+    - histogramme à bornes fixes (comptes + sommes par bin) pour p5/p50/p95
+    - buffer borné des plus grosses pertes (top-k) pour la CVaR
+    
+    Deux accumulateurs de mêmes bornes se fusionnent : c'est ce qui
+    circule entre les workers du mode multi-processus.
+    
+    Les erreurs standard des probabilités sont calculées sur des « unités »
+    indépendantes : la trajectoire (none, control_variate), la paire
+    antithétique, ou le réplicat Sobol. Le cash final centré sur son
+    espérance analytique sert de variable de contrôle.
+    """
+    
+    def __init__(
+        self,
+        current_cash: float,
+        safety_threshold: float,
+        monthly_burn: float,
+        edges: np.ndarray,
+        tail_size: int,
+        expected_cash: float = 0.0,
+        sampling: str = VarianceReduction.NONE.value,
+        replicate_size: int = 1024
+    ):
+        self.current_cash = current_cash
+        self.safety_threshold = safety_threshold
+        self.monthly_burn = monthly_burn
+        self.edges = edges
+        self.tail_size = tail_size
+        self.expected_cash = expected_cash
+        self.sampling = sampling
+        self.replicate_size = replicate_size
+        
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.cash_min = np.inf
+        self.cash_max = -np.inf
+        self.negative_count = 0
+        self.under_safety_count = 0
+        self.severe_stress_count = 0
+        self.runway_sum = 0.0
+        self.hist_counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        self.hist_sums = np.zeros(len(edges) - 1)
+        self.tail_losses = np.empty(0)
+        self.sample_paths: List[Dict] = []
+        
+        # Sommes par unité d'échantillonnage (y = indicatrices, x = contrôle)
+        self.unit_n = 0
+        self.unit_sum_y = np.zeros(len(PROBABILITY_NAMES))
+        self.unit_sum_y2 = np.zeros(len(PROBABILITY_NAMES))
+        self.unit_sum_xy = np.zeros(len(PROBABILITY_NAMES))
+        self.unit_sum_x = 0.0
+        self.unit_sum_x2 = 0.0
+        
+        # Attribution multi-facteurs : Σ effet et Σ effet × écart du cash final
+        self.factor_n = 0
+        self.factor_sum = np.zeros(len(FACTOR_NAMES))
+        self.factor_sum_x = np.zeros(len(FACTOR_NAMES))
+    
+    def _empty_like(self) -> "MonteCarloAccumulator":
+        return MonteCarloAccumulator(
+            self.current_cash, self.safety_threshold, self.monthly_burn, self.edges,
+            self.tail_size, self.expected_cash, self.sampling, self.replicate_size
+        )
+    
+    def _sampling_units(
+        self,
+        final_cash: np.ndarray,
+        x: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Indicatrices et contrôle `x` agrégés par unité indépendante"""
+        y = np.stack([
+            final_cash < 0,
+            final_cash < self.safety_threshold,
+            final_cash < self.safety_threshold * 0.5
+        ], axis=1).astype(float)
+        
+        if self.sampling == VarianceReduction.ANTITHETIC.value:
+            # Paires (i, i + ceil(n/2)) ; ligne isolée si n impair
+            half = -(-len(x) // 2)
+            pairs = len(x) - half
+            y = np.concatenate([(y[:pairs] + y[half:half + pairs]) / 2, y[pairs:half]])
+            x = np.concatenate([(x[:pairs] + x[half:half + pairs]) / 2, x[pairs:half]])
+        elif self.sampling == VarianceReduction.SOBOL.value:
+            # Une unité par réplicat brouillé
+            starts = np.arange(0, len(x), self.replicate_size)
+            sizes = np.diff(np.append(starts, len(x)))[:, None]
+            y = np.add.reduceat(y, starts, axis=0) / sizes
+            x = np.add.reduceat(x, starts) / sizes[:, 0]
+        
+        return y, x
+    
+    def update(
+        self,
+        final_cash: np.ndarray,
+        factors: Optional[np.ndarray] = None
+    ) -> "MonteCarloAccumulator":
+        """
+        Ajoute un lot de cash finaux.
+        
+        Args:
+            final_cash: Cash final de chaque trajectoire
+            factors: Effets (n, 3) revenus/coûts/DSO du modèle multi-facteurs.
+                La variable de contrôle exclut alors l'effet DSO, dont
+                l'espérance n'est pas analytique.
+        """
+        if len(final_cash) == 0:
+            return self
+        
+        block = self._empty_like()
+        block.n = len(final_cash)
+        block.mean = float(final_cash.mean())
+        block.m2 = float(((final_cash - block.mean) ** 2).sum())
+        block.cash_min = float(final_cash.min())
+        block.cash_max = float(final_cash.max())
+        block.negative_count = int(np.count_nonzero(final_cash < 0))
+        block.under_safety_count = int(np.count_nonzero(final_cash < self.safety_threshold))
+        block.severe_stress_count = int(np.count_nonzero(final_cash < self.safety_threshold * 0.5))
+        
+        if self.monthly_burn > 0:
+            block.runway_sum = float(np.clip(final_cash / self.monthly_burn, 0, 120).sum())
+        else:
+            block.runway_sum = 120.0 * len(final_cash)
+        
+        bins = len(self.hist_counts)
+        bin_index = np.clip(np.searchsorted(self.edges, final_cash, side="right") - 1, 0, bins - 1)
+        block.hist_counts = np.bincount(bin_index, minlength=bins)
+        block.hist_sums = np.bincount(bin_index, weights=final_cash, minlength=bins)
+        block.tail_losses = self._top_k(self.current_cash - final_cash)
+        
+        deviation = final_cash - self.expected_cash
+        control = deviation if factors is None else deviation - factors[:, 2]
+        
+        if factors is not None:
+            block.factor_n = len(final_cash)
+            block.factor_sum = factors.sum(axis=0)
+            block.factor_sum_x = deviation @ factors
+        
+        y, x = self._sampling_units(final_cash, control)
+        block.unit_n = len(x)
+        block.unit_sum_y = y.sum(axis=0)
+        block.unit_sum_y2 = (y**2).sum(axis=0)
+        block.unit_sum_xy = x @ y
+        block.unit_sum_x = float(x.sum())
+        block.unit_sum_x2 = float(x @ x)
+        
+        return self.merge(block)
+    
+    def merge(self, other: "MonteCarloAccumulator") -> "MonteCarloAccumulator":
+        """Fusionne `other` (mêmes bornes) dans cet accumulateur"""
+        if other.n == 0:
+            return self
+        
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta**2 * self.n * other.n / n
+        self.n = n
+        
+        self.cash_min = min(self.cash_min, other.cash_min)
+        self.cash_max = max(self.cash_max, other.cash_max)
+        self.negative_count += other.negative_count
+        self.under_safety_count += other.under_safety_count
+        self.severe_stress_count += other.severe_stress_count
+        self.runway_sum += other.runway_sum
+        self.hist_counts += other.hist_counts
+        self.hist_sums += other.hist_sums
+        self.tail_losses = self._top_k(np.concatenate([self.tail_losses, other.tail_losses]))
+        
+        self.unit_n += other.unit_n
+        self.unit_sum_y = self.unit_sum_y + other.unit_sum_y
+        self.unit_sum_y2 = self.unit_sum_y2 + other.unit_sum_y2
+        self.unit_sum_xy = self.unit_sum_xy + other.unit_sum_xy
+        self.unit_sum_x += other.unit_sum_x
+        self.unit_sum_x2 += other.unit_sum_x2
+        
+        self.factor_n += other.factor_n
+        self.factor_sum = self.factor_sum + other.factor_sum
+        self.factor_sum_x = self.factor_sum_x + other.factor_sum_x
+        
+        self.sample_paths = self.sample_paths or other.sample_paths
+        return self
+    
+    def factor_attribution(self) -> Optional[Dict[str, Dict]]:
+        """
+        Contribution de chaque facteur au cash final.
+        
+        - mean_impact : effet moyen sur le cash final (€)
+        - variance_share : cov(effet, cash) / var(cash) - allocation d'Euler,
+          les parts somment à 1
+        """
+        if self.factor_n == 0:
+            return None
+        
+        n = self.factor_n
+        mean_deviation = self.mean - self.expected_cash
+        mean_impact = self.factor_sum / n
+        covariance = self.factor_sum_x / n - mean_impact * mean_deviation
+        variance = self.m2 / self.n
+        
+        return {
+            name: {
+                "mean_impact": round(float(mean_impact[i]), 0),
+                "variance_share": round(float(covariance[i] / variance), 3) if variance > 0 else 0.0
+            }
+            for i, name in enumerate(FACTOR_NAMES)
+        }
+    
+    def probability_estimates(self) -> Dict[str, Tuple[float, float]]:
+        """
+        {nom: (probabilité, erreur standard)} pour les trois seuils.
+        
+        En control_variate : p = ȳ - β·x̄ avec β = cov(y, x) / var(x),
+        x étant d'espérance nulle ; la variance résiduelle donne l'erreur.
+        """
+        n = self.unit_n
+        if n < 2:
+            counts = (self.negative_count, self.under_safety_count, self.severe_stress_count)
+            return {name: (c / max(self.n, 1), 0.0) for name, c in zip(PROBABILITY_NAMES, counts)}
+        
+        mean_y = self.unit_sum_y / n
+        syy = np.maximum(self.unit_sum_y2 - n * mean_y**2, 0.0)
+        
+        if self.sampling == VarianceReduction.CONTROL_VARIATE.value and n > 2:
+            mean_x = self.unit_sum_x / n
+            sxx = self.unit_sum_x2 - n * mean_x**2
+            sxy = self.unit_sum_xy - n * mean_x * mean_y
+            beta = sxy / sxx if sxx > 0 else np.zeros_like(sxy)
+            estimates = np.clip(mean_y - beta * mean_x, 0.0, 1.0)
+            residual = np.maximum(syy - beta * sxy, 0.0) / (n - 2)
+        else:
+            estimates = mean_y
+            residual = syy / (n - 1)
+        
+        errors = np.sqrt(residual / n)
+        return {
+            name: (float(p), float(se))
+            for name, p, se in zip(PROBABILITY_NAMES, estimates, errors)
+        }
+    
+    def max_ci_half_width(self) -> float:
+        """Plus grande demi-largeur d'IC 95% parmi les probabilités"""
+        return max(Z_95 * se for _, se in self.probability_estimates().values())
+    
+    def _top_k(self, losses: np.ndarray) -> np.ndarray:
+        """Garde les tail_size plus grosses pertes"""
+        if len(losses) <= self.tail_size:
+            return losses
+        return np.partition(losses, len(losses) - self.tail_size)[-self.tail_size:]
+    
+    def _bin_bounds(self, i: int) -> Tuple[float, float]:
+        """Bornes effectives du bin i (les bins extrêmes absorbent les hors-bornes)"""
+        last = len(self.hist_counts) - 1
+        left = self.cash_min if i == 0 else max(self.edges[i], self.cash_min)
+        right = self.cash_max if i == last else min(self.edges[i + 1], self.cash_max)
+        return left, right
+    
+    def quantile(self, q: float) -> float:
+        """Percentile (0-1) interpolé dans l'histogramme"""
+        target = q * self.n
+        cumulative = np.cumsum(self.hist_counts)
+        i = min(int(np.searchsorted(cumulative, target, side="left")), len(cumulative) - 1)
+        previous = cumulative[i - 1] if i > 0 else 0
+        
+        left, right = self._bin_bounds(i)
+        fraction = (target - previous) / self.hist_counts[i] if self.hist_counts[i] else 0.0
+        return float(left + fraction * (right - left))
+    
+    def _mass_below(self, x: float) -> Tuple[float, float]:
+        """(nombre, somme) des cash finaux <= x, répartition uniforme dans le bin"""
+        bins = len(self.hist_counts)
+        i = int(np.clip(np.searchsorted(self.edges, x, side="right") - 1, 0, bins - 1))
+        count = float(self.hist_counts[:i].sum())
+        total = float(self.hist_sums[:i].sum())
+        
+        left, right = self._bin_bounds(i)
+        if self.hist_counts[i] and right > left:
+            fraction = float(np.clip((x - left) / (right - left), 0, 1))
+            count += fraction * self.hist_counts[i]
+            total += fraction * self.hist_counts[i] * (left + min(x, right)) / 2
+        return count, total
+    
+    def expected_shortfall(self, var: float) -> float:
+        """
+        CVaR : perte moyenne au-delà de `var`.
+        
+        Exacte si le buffer top-k couvre toute la queue ; sinon le buffer
+        donne l'extrême queue et l'histogramme complète jusqu'au seuil.
+        """
+        tail = self.tail_losses
+        if len(tail) == 0:
+            return var
+        
+        covered = tail[tail >= var]
+        if len(covered) < len(tail) or len(tail) < self.tail_size:
+            return float(covered.mean()) if len(covered) else var
+        
+        # Buffer plein et entièrement au-delà du seuil : compléter par l'histogramme
+        cash_threshold = self.current_cash - var
+        cash_buffer_edge = self.current_cash - float(tail.min())
+        count_all, sum_all = self._mass_below(cash_threshold)
+        count_buf, sum_buf = self._mass_below(cash_buffer_edge)
+        extra_count = max(count_all - count_buf, 0.0)
+        extra_cash_sum = sum_all - sum_buf
+        
+        total_count = len(tail) + extra_count
+        total_losses = float(tail.sum()) + extra_count * self.current_cash - extra_cash_sum
+        return total_losses / total_count
+
+
+def _simulate_shard(
+    seeds: List[np.random.SeedSequence],
+    sizes: List[int],
+    keep_samples: bool,
+    accumulator: MonteCarloAccumulator,
+    current_cash: float,
+    monthly_revenues: float,
+    monthly_costs: float,
+    revenue_volatility: float,
+    cost_volatility: float,
+    horizon_months: int,
+    sampling: str = VarianceReduction.NONE.value,
+    replicate_size: int = 1024,
+    factor_model: Optional[Dict] = None
+) -> MonteCarloAccumulator:
+    """
+    Simule une suite de blocs dans `accumulator` (vide au départ).
+    
+    Sert au mode série comme aux workers du ProcessPoolExecutor : seules
+    les statistiques circulent, jamais les trajectoires.
+    
+    factor_model (dso_volatility_days, base_dso_days, cholesky) active le
+    simulateur multi-facteurs corrélé.
+    """
+    for k, (seed, size) in enumerate(zip(seeds, sizes)):
+        simulation = dict(
+            rng=np.random.default_rng(seed),
+            n_paths=size,
+            horizon_months=horizon_months,
+            current_cash=current_cash,
+            monthly_revenues=monthly_revenues,
+            monthly_costs=monthly_costs,
+            revenue_volatility=revenue_volatility,
+            cost_volatility=cost_volatility,
+            sampling=sampling,
+            replicate_size=replicate_size
+        )
+        if factor_model:
+            paths, factors = _simulate_multi_factor_paths(**simulation, **factor_model)
+        else:
+            paths, factors = _simulate_paths(**simulation), None
+        
+        if keep_samples and k == 0:
+            accumulator.sample_paths = _sample_paths(paths, current_cash)
+        accumulator.update(paths[:, -1], factors)
+        del paths, factors
+    
+    return accumulator
+
+
 class StressTester:
     """
     Module de stress testing trésorerie.
@@ -267,8 +952,163 @@ class StressTester:
     CONFIDENCE_LEVEL = 0.95
     HORIZON_MONTHS = 12
     
-    def __init__(self, random_seed: int = 42):
-        np.random.seed(random_seed)
+    # Taille d'un bloc de simulation : chaque bloc tire dans son propre flux
+    # aléatoire, dérivé de la graine et de l'index du bloc uniquement.
+    # Puissance de 2 : un bloc contient un nombre entier de réplicats Sobol.
+    BLOCK_SIZE = 16384
+    
+    # Mode adaptatif (target_precision) : plafond de trajectoires par défaut
+    MAX_ADAPTIVE_SIMULATIONS = 2000000
+    
+    # Reverse stress : directions de la surface de rupture, rayon maximal
+    # (en écarts-types) et itérations de bissection (précision 10 / 2**50)
+    REVERSE_DIRECTIONS = 4096
+    REVERSE_MAX_SIGMA = 10.0
+    REVERSE_BISECTION_STEPS = 50
+    # Volatilité DSO utilisée quand le modèle multi-facteurs est inactif
+    REVERSE_DSO_VOLATILITY_DAYS = 10.0
+    
+    # Cache des résultats (LRU + TTL), clé = empreinte des entrées + graine
+    RESULT_CACHE_SIZE = 32
+    RESULT_CACHE_TTL_SECONDS = 300
+    
+    def __init__(self, random_seed: Optional[int] = 42):
+        """
+        Args:
+            random_seed: Graine de l'instance (None = entropie système).
+                Aucun état global numpy n'est modifié : deux instances
+                concurrentes ne s'influencent pas.
+        """
+        self.random_seed = random_seed
+        self.seed_sequence = np.random.SeedSequence(random_seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        
+        self._result_cache: "OrderedDict[str, Tuple[float, StressTestResult]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Pools de processus réutilisés entre appels, un par n_workers
+        self._pools: Dict[int, ProcessPoolExecutor] = {}
+        self._pool_lock = threading.Lock()
+    
+    def _cache_key(self, inputs: Dict) -> str:
+        """
+        Empreinte canonique des entrées du stress test.
+        
+        Le résultat est identique au bit près à chunk_size effectif donné,
+        quel que soit n_workers : la clé contient le chunk_size réellement
+        utilisé (défaut dérivé de n_workers résolu ici) et pas n_workers.
+        En série ou en mode adaptatif, chunk_size n'est pas utilisé.
+        """
+        inputs = dict(inputs)
+        n_workers = inputs.pop("n_workers")
+        inputs["n_simulations"] = inputs["n_simulations"] or self.N_SIMULATIONS
+        if n_workers <= 1 or inputs.get("target_precision") is not None:
+            inputs["chunk_size"] = None
+        elif inputs["chunk_size"] is None:
+            inputs["chunk_size"] = self._default_chunk_size(inputs["n_simulations"], n_workers)
+        inputs["seed"] = [self.seed_sequence.entropy, list(self.seed_sequence.spawn_key)]
+        canonical = json.dumps(
+            inputs,
+            sort_keys=True,
+            default=lambda o: o.item() if hasattr(o, "item") else str(o)
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional["StressTestResult"]:
+        """Copie du résultat en cache : l'appelant peut la modifier"""
+        with self._cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.RESULT_CACHE_TTL_SECONDS:
+                self._result_cache.move_to_end(key)
+                self.cache_hits += 1
+                return deepcopy(entry[1])
+            if entry is not None:
+                del self._result_cache[key]
+            self.cache_misses += 1
+            return None
+    
+    def _cache_put(self, key: str, result: "StressTestResult"):
+        """Stocke une copie (les modifications de l'appelant n'y remontent pas)"""
+        with self._cache_lock:
+            self._result_cache[key] = (time.monotonic(), deepcopy(result))
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """Vide le cache de résultats (les compteurs sont conservés)"""
+        with self._cache_lock:
+            self._result_cache.clear()
+    
+    def cache_stats(self) -> Dict:
+        """Compteurs du cache de résultats, pour les endpoints de statut"""
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": round(self.cache_hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._result_cache),
+                "max_size": self.RESULT_CACHE_SIZE,
+                "ttl_seconds": self.RESULT_CACHE_TTL_SECONDS
+            }
+    
+    def _process_pool(self, n_workers: int) -> ProcessPoolExecutor:
+        """
+        Pool de n_workers processus, créé au premier appel puis réutilisé.
+        
+        Démarrage "spawn" : les appels viennent de threads (executor de
+        run_full_stress_test_async), un fork avec des threads actifs peut
+        bloquer le processus enfant.
+        """
+        with self._pool_lock:
+            pool = self._pools.get(n_workers)
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=n_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pools[n_workers] = pool
+            return pool
+    
+    def shutdown(self):
+        """Arrête les pools de processus (à l'arrêt de l'application)"""
+        with self._pool_lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown()
+    
+    @staticmethod
+    def _default_chunk_size(n_simulations: int, n_workers: int) -> int:
+        """Trajectoires par tâche multi-processus par défaut (~4 tâches par worker)"""
+        return -(-n_simulations // (n_workers * 4))
+    
+    def block_seed(self, block_index: int) -> np.random.SeedSequence:
+        """
+        SeedSequence du bloc `block_index`.
+        
+        Déterministe (graine, index) : le bloc k produit les mêmes tirages
+        qu'il soit simulé seul, en série ou dans un autre thread/processus.
+        """
+        return np.random.SeedSequence(
+            self.seed_sequence.entropy,
+            spawn_key=self.seed_sequence.spawn_key + (block_index,)
+        )
+    
+    def spawn_streams(self, n_streams: int, start: int = 0) -> List[np.random.Generator]:
+        """Générateurs indépendants pour les blocs [start, start + n_streams)"""
+        return [
+            np.random.default_rng(self.block_seed(start + i))
+            for i in range(n_streams)
+        ]
+    
+    def _iter_blocks(self, n_simulations: int):
+        """Découpe n_simulations en blocs (block_index, taille)"""
+        for block_index, start in enumerate(range(0, n_simulations, self.BLOCK_SIZE)):
+            yield block_index, min(self.BLOCK_SIZE, n_simulations - start)
     
     def run_full_stress_test(
         self,
@@ -278,7 +1118,15 @@ class StressTester:
         revenue_volatility: float = 0.15,
         cost_volatility: float = 0.08,
         safety_threshold: Optional[float] = None,
-        custom_scenarios: Optional[List[Dict]] = None
+        custom_scenarios: Optional[List[Dict]] = None,
+        n_simulations: Optional[int] = None,
+        n_workers: int = 1,
+        chunk_size: Optional[int] = None,
+        variance_reduction: str = VarianceReduction.NONE.value,
+        target_precision: Optional[float] = None,
+        dso_volatility_days: float = 0.0,
+        base_dso_days: float = 45,
+        correlations: Optional[Dict[str, float]] = None
     ) -> StressTestResult:
         """
         Lance le stress test complet.
@@ -291,7 +1139,28 @@ class StressTester:
             cost_volatility: Volatilité des coûts
             safety_threshold: Seuil de sécurité (défaut: 2 mois de coûts)
             custom_scenarios: Scénarios personnalisés
+            n_simulations: Nombre de trajectoires Monte Carlo (défaut: N_SIMULATIONS)
+            n_workers: Processus pour le Monte Carlo (>1 = ProcessPoolExecutor)
+            chunk_size: Trajectoires par tâche en mode multi-processus
+                (arrondi au multiple de BLOCK_SIZE supérieur)
+            variance_reduction: "none" | "antithetic" | "control_variate" | "sobol"
+            target_precision: Mode adaptatif - demi-largeur d'IC 95% visée sur
+                les probabilités (0.005 = ±0.5 pt). La simulation s'arrête dès
+                qu'elle est atteinte ; n_simulations devient alors un plafond.
+            dso_volatility_days: Volatilité mensuelle du DSO (jours). > 0 ou
+                `correlations` fourni active le modèle multi-facteurs
+            base_dso_days: DSO moyen actuel (retard d'encaissement du CA)
+            correlations: {"revenue_cost", "revenue_dso", "cost_dso"} -> ρ
+        
+        Les résultats sont mis en cache (LRU + TTL) : un appel identique
+        sur la même instance renvoie, sans calcul, une copie du résultat
+        (même contenu, y compris timestamp du calcul d'origine).
         """
+        inputs = {k: v for k, v in locals().items() if k != "self"}
+        cache_key = self._cache_key(inputs)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
         # Calculs de base
         monthly_burn = monthly_costs - monthly_revenues  # Négatif si profitable
@@ -308,7 +1177,15 @@ class StressTester:
             revenue_volatility=revenue_volatility,
             cost_volatility=cost_volatility,
             safety_threshold=safety_threshold,
-            horizon_months=self.HORIZON_MONTHS
+            horizon_months=self.HORIZON_MONTHS,
+            n_simulations=n_simulations,
+            n_workers=n_workers,
+            chunk_size=chunk_size,
+            variance_reduction=variance_reduction,
+            target_precision=target_precision,
+            dso_volatility_days=dso_volatility_days,
+            base_dso_days=base_dso_days,
+            correlations=correlations
         )
         
         # 2. Scénarios déterministes
@@ -335,7 +1212,10 @@ class StressTester:
             current_cash=current_cash,
             monthly_revenues=monthly_revenues,
             monthly_costs=monthly_costs,
-            safety_threshold=safety_threshold
+            revenue_volatility=revenue_volatility,
+            cost_volatility=cost_volatility,
+            dso_volatility_days=dso_volatility_days,
+            correlations=correlations
         )
         
         # 5. Risk assessment
@@ -366,7 +1246,7 @@ class StressTester:
             most_sensitive=most_sensitive
         )
         
-        return StressTestResult(
+        result = StressTestResult(
             timestamp=datetime.now(),
             current_cash=current_cash,
             current_monthly_burn=monthly_burn,
@@ -385,6 +1265,18 @@ class StressTester:
             summary=summary,
             key_insights=insights
         )
+        self._cache_put(cache_key, result)
+        return result
+    
+    async def run_full_stress_test_async(self, **kwargs) -> StressTestResult:
+        """
+        Version non bloquante de run_full_stress_test.
+        
+        Le calcul (et l'éventuel pool de processus) tourne dans l'executor
+        par défaut : la boucle d'événements reste libre pendant la simulation.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.run_full_stress_test, **kwargs))
     
     def _run_monte_carlo(
         self,
@@ -394,97 +1286,177 @@ class StressTester:
         revenue_volatility: float,
         cost_volatility: float,
         safety_threshold: float,
-        horizon_months: int
+        horizon_months: int,
+        n_simulations: Optional[int] = None,
+        n_workers: int = 1,
+        chunk_size: Optional[int] = None,
+        variance_reduction: str = VarianceReduction.NONE.value,
+        target_precision: Optional[float] = None,
+        dso_volatility_days: float = 0.0,
+        base_dso_days: float = 45,
+        correlations: Optional[Dict[str, float]] = None
     ) -> MonteCarloResult:
-        """Simulation Monte Carlo"""
+        """
+        Simulation Monte Carlo vectorisée, en flux.
         
-        n = self.N_SIMULATIONS
+        Les trajectoires sont tirées par blocs de BLOCK_SIZE (chocs
+        log-normaux revenus/coûts, cumsum des flux nets), chaque bloc dans
+        son propre flux aléatoire. Seul un MonteCarloAccumulator est conservé
+        entre blocs : la mémoire reste constante quel que soit n_simulations.
         
-        # Simuler n trajectoires
-        final_cash = np.zeros(n)
-        negative_count = 0
-        under_safety_count = 0
-        severe_stress_count = 0
+        Avec n_workers > 1, les blocs sont répartis sur le ProcessPoolExecutor
+        partagé de l'instance (_process_pool) par tâches de chunk_size trajectoires, fusionnées dans l'ordre des
+        tâches. À chunk_size donné, le résultat est identique au bit près
+        quel que soit n_workers.
         
-        sample_paths = []
+        Avec target_precision, les blocs sont simulés un à un (en série)
+        jusqu'à ce que l'IC 95% de chaque probabilité soit assez étroit.
         
-        for i in range(n):
-            cash = current_cash
-            cash_path = [cash]
-            
-            for m in range(horizon_months):
-                # Revenus avec volatilité (distribution log-normale)
-                rev = monthly_revenues * np.exp(
-                    np.random.normal(-0.5 * revenue_volatility**2, revenue_volatility)
-                )
-                
-                # Coûts avec volatilité
-                cost = monthly_costs * np.exp(
-                    np.random.normal(-0.5 * cost_volatility**2, cost_volatility)
-                )
-                
-                # Update cash
-                cash = cash + rev - cost
-                cash_path.append(cash)
-            
-            final_cash[i] = cash
+        Avec dso_volatility_days ou correlations, les chocs revenus / coûts /
+        DSO sont corrélés (Cholesky) et le CA est encaissé avec retard
+        (_simulate_multi_factor_paths) ; le résultat inclut l'attribution
+        par facteur.
+        """
+        
+        sampling = VarianceReduction(variance_reduction).value
+        adaptive = target_precision is not None
+        if adaptive:
+            n = n_simulations or self.MAX_ADAPTIVE_SIMULATIONS
+        else:
+            n = n_simulations or self.N_SIMULATIONS
+        blocks = list(self._iter_blocks(n))
+        
+        factor_model = None
+        if dso_volatility_days > 0 or correlations:
+            factor_model = {
+                "dso_volatility_days": dso_volatility_days,
+                "base_dso_days": base_dso_days,
+                "cholesky": _factor_cholesky(correlations)
+            }
+        
+        # Réplicats Sobol : ~16 par simulation, entre 256 et 4096 points
+        replicate_size = int(2 ** np.clip(np.floor(np.log2(max(n // 16, 1))), 8, 12))
+        
+        empty = partial(
+            MonteCarloAccumulator,
+            current_cash=current_cash,
+            safety_threshold=safety_threshold,
+            monthly_burn=monthly_costs - monthly_revenues,
+            edges=_histogram_edges(
+                current_cash, monthly_revenues, monthly_costs,
+                revenue_volatility, cost_volatility, horizon_months, dso_volatility_days
+            ),
+            tail_size=min(
+                int(np.ceil(n * (1 - self.CONFIDENCE_LEVEL) * TAIL_MARGIN)) + 1,
+                TAIL_BUFFER_MAX
+            ),
+            expected_cash=current_cash + horizon_months * (monthly_revenues - monthly_costs),
+            sampling=sampling,
+            replicate_size=replicate_size
+        )
+        shard = partial(
+            _simulate_shard,
+            current_cash=current_cash,
+            monthly_revenues=monthly_revenues,
+            monthly_costs=monthly_costs,
+            revenue_volatility=revenue_volatility,
+            cost_volatility=cost_volatility,
+            horizon_months=horizon_months,
+            sampling=sampling,
+            replicate_size=replicate_size,
+            factor_model=factor_model
+        )
+        
+        converged = None
+        if adaptive:
+            merged = empty()
+            converged = False
+            for block_index, size in blocks:
+                shard([self.block_seed(block_index)], [size], block_index == 0, merged)
+                if merged.max_ci_half_width() <= target_precision:
+                    converged = True
+                    break
+        elif n_workers <= 1:
+            merged = shard(
+                [self.block_seed(b) for b, _ in blocks],
+                [size for _, size in blocks],
+                True,
+                empty()
+            )
+        else:
+            if chunk_size is None:
+                chunk_size = self._default_chunk_size(n, n_workers)
+            blocks_per_task = max(1, -(-chunk_size // self.BLOCK_SIZE))
             
-            if cash < 0:
-                negative_count += 1
-            if cash < safety_threshold:
-                under_safety_count += 1
-            if cash < safety_threshold * 0.5:
-                severe_stress_count += 1
+            pool = self._process_pool(n_workers)
+            futures = []
+            for start in range(0, len(blocks), blocks_per_task):
+                task_blocks = blocks[start:start + blocks_per_task]
+                futures.append(pool.submit(
+                    shard,
+                    [self.block_seed(b) for b, _ in task_blocks],
+                    [size for _, size in task_blocks],
+                    start == 0,
+                    empty()
+                ))
             
-            # Garder quelques trajectoires pour visualisation
-            if i < 50:
-                sample_paths.append({
-                    "simulation_id": i,
-                    "path": [round(c, 0) for c in cash_path],
-                    "final_cash": round(cash, 0)
-                })
-        
-        # Statistiques
-        cash_mean = np.mean(final_cash)
-        cash_median = np.median(final_cash)
-        cash_std = np.std(final_cash)
-        cash_p5 = np.percentile(final_cash, 5)
-        cash_p95 = np.percentile(final_cash, 95)
-        
-        # Runway (simplifié)
+            merged = empty()
+            for future in futures:
+                merged.merge(future.result())
+        
+        result = self._monte_carlo_result(merged, monthly_revenues, monthly_costs)
+        result.converged = converged
+        return result
+    
+    def _monte_carlo_result(
+        self,
+        acc: MonteCarloAccumulator,
+        monthly_revenues: float,
+        monthly_costs: float
+    ) -> MonteCarloResult:
+        """Construit le MonteCarloResult depuis l'accumulateur"""
+        
+        n = acc.n
+        cash_p5 = acc.quantile(0.05)
+        cash_median = acc.quantile(0.50)
+        cash_p95 = acc.quantile(0.95)
+        
+        # Runway : transformation monotone du cash final
         monthly_burn = monthly_costs - monthly_revenues
-        runway_samples = np.where(
-            monthly_burn > 0,
-            final_cash / monthly_burn,
-            np.inf
-        )
-        runway_mean = np.mean(np.clip(runway_samples, 0, 120))
-        runway_p5 = np.percentile(np.clip(runway_samples, 0, 120), 5)
-        runway_p95 = np.percentile(np.clip(runway_samples, 0, 120), 95)
+        if monthly_burn > 0:
+            runway_p5 = float(np.clip(cash_p5 / monthly_burn, 0, 120))
+            runway_p95 = float(np.clip(cash_p95 / monthly_burn, 0, 120))
+        else:
+            runway_p5 = runway_p95 = 120.0
         
         # VaR et CVaR
-        var_95 = current_cash - cash_p5
-        losses = current_cash - final_cash
-        cvar_95 = np.mean(losses[losses >= var_95])
+        var_95 = acc.current_cash - cash_p5
+        cvar_95 = acc.expected_shortfall(var_95)
+        
+        # Probabilités (corrigées en control_variate) et erreurs standard
+        estimates = acc.probability_estimates()
         
         return MonteCarloResult(
             n_simulations=n,
-            cash_mean=cash_mean,
+            cash_mean=acc.mean,
             cash_median=cash_median,
-            cash_std=cash_std,
+            cash_std=float(np.sqrt(acc.m2 / n)),
             cash_p5=cash_p5,
             cash_p95=cash_p95,
-            cash_min=np.min(final_cash),
-            cash_max=np.max(final_cash),
-            prob_negative_cash=negative_count / n,
-            prob_under_safety=under_safety_count / n,
-            prob_severe_stress=severe_stress_count / n,
-            runway_mean=runway_mean,
+            cash_min=acc.cash_min,
+            cash_max=acc.cash_max,
+            prob_negative_cash=estimates["negative_cash"][0],
+            prob_under_safety=estimates["under_safety"][0],
+            prob_severe_stress=estimates["severe_stress"][0],
+            runway_mean=acc.runway_sum / n,
             runway_p5=runway_p5,
             runway_p95=runway_p95,
             var_95=var_95,
             cvar_95=cvar_95,
-            sample_paths=sorted(sample_paths, key=lambda x: x['final_cash'])[:10]
+            sample_paths=sorted(acc.sample_paths, key=lambda x: x['final_cash'])[:10],
+            variance_reduction=acc.sampling,
+            standard_errors={name: se for name, (_, se) in estimates.items()},
+            factor_attribution=acc.factor_attribution()
         )
     
     def _run_scenarios(
@@ -497,7 +1469,6 @@ class StressTester:
         """Scénarios déterministes"""
         
         scenarios = []
-        monthly_burn = monthly_costs - monthly_revenues
         
         # Scénarios standards
         standard_scenarios = [
@@ -544,82 +1515,145 @@ class StressTester:
             }
         ]
         
-        for s in standard_scenarios:
-            scenario = self._evaluate_scenario(
-                scenario_def=s,
-                current_cash=current_cash,
-                monthly_revenues=monthly_revenues,
-                monthly_costs=monthly_costs
-            )
-            scenarios.append(scenario)
-        
-        # Scénarios custom
-        if custom_scenarios:
-            for cs in custom_scenarios:
-                scenario = self._evaluate_scenario(
-                    scenario_def=cs,
-                    current_cash=current_cash,
-                    monthly_revenues=monthly_revenues,
-                    monthly_costs=monthly_costs
-                )
-                scenarios.append(scenario)
+        # Tous les scénarios (standards + custom) évalués en un seul passage
+        scenario_defs = standard_scenarios + list(custom_scenarios or [])
+        impacts = self._scenario_impacts(
+            current_cash=current_cash,
+            monthly_revenues=monthly_revenues,
+            monthly_costs=monthly_costs,
+            revenue_shock=np.array([s.get('revenue_shock', 0) for s in scenario_defs], dtype=float),
+            cost_shock=np.array([s.get('cost_shock', 0) for s in scenario_defs], dtype=float),
+            dso_shock=np.array([s.get('dso_shock', 0) for s in scenario_defs], dtype=float)
+        )
+        
+        for i, s in enumerate(scenario_defs):
+            scenarios.append(StressScenario(
+                scenario_id=s.get('id', 'custom'),
+                name=s.get('name', 'Custom'),
+                description=s.get('description', ''),
+                revenue_shock_pct=s.get('revenue_shock', 0) * 100,
+                cost_shock_pct=s.get('cost_shock', 0) * 100,
+                dso_shock_days=s.get('dso_shock', 0),
+                client_loss_pct=s.get('client_loss', 0) * 100,
+                impact_on_cash=float(impacts["impact_cash"][i]),
+                impact_on_runway=float(impacts["impact_runway"][i]),
+                survival_probability=float(impacts["survival"][i])
+            ))
         
         return scenarios
     
-    def _evaluate_scenario(
+    def _scenario_impacts(
         self,
-        scenario_def: Dict,
         current_cash: float,
         monthly_revenues: float,
-        monthly_costs: float
-    ) -> StressScenario:
-        """Évalue un scénario"""
+        monthly_costs: float,
+        revenue_shock,
+        cost_shock,
+        dso_shock,
+        horizon_months: int = 6
+    ) -> Dict[str, np.ndarray]:
+        """
+        Modèle déterministe, vectorisé par broadcasting NumPy.
+        
+        Les chocs (revenus et coûts en fraction, DSO en jours) peuvent être
+        des scalaires ou des tableaux de formes compatibles : un appel
+        évalue une liste de scénarios comme une grille N-dimensionnelle.
+        
+        Returns:
+            Dict de tableaux à la forme broadcastée des chocs :
+            cash_at_horizon, impact_cash, runway, impact_runway, survival
+        """
+        revenue_shock, cost_shock, dso_shock = np.broadcast_arrays(
+            np.asarray(revenue_shock, dtype=float),
+            np.asarray(cost_shock, dtype=float),
+            np.asarray(dso_shock, dtype=float)
+        )
         
         # Appliquer les chocs
-        shocked_revenues = monthly_revenues * (1 + scenario_def.get('revenue_shock', 0))
-        shocked_costs = monthly_costs * (1 + scenario_def.get('cost_shock', 0))
+        shocked_revenues = monthly_revenues * (1 + revenue_shock)
+        shocked_costs = monthly_costs * (1 + cost_shock)
+        shocked_burn = shocked_costs - shocked_revenues
         
         # Impact DSO sur cash (simplifié)
-        dso_impact = scenario_def.get('dso_shock', 0) / 30 * monthly_revenues
+        dso_impact = dso_shock / 30 * monthly_revenues
         
-        # Nouveau burn mensuel
-        shocked_burn = shocked_costs - shocked_revenues
+        # Cash à l'horizon et impact vs scénario de base
+        cash_at_horizon = current_cash - dso_impact - shocked_burn * horizon_months
+        base_cash = current_cash + (monthly_revenues - monthly_costs) * horizon_months
+        impact_cash = cash_at_horizon - base_cash
         
-        # Cash après 6 mois
-        cash_6m = current_cash - dso_impact + (shocked_revenues - shocked_costs) * 6
+        # Runway (infini si pas de burn)
+        base_burn = monthly_costs - monthly_revenues
+        base_runway = current_cash / base_burn if base_burn > 0 else np.inf
+        with np.errstate(divide='ignore', invalid='ignore'):
+            runway = np.where(
+                shocked_burn > 0, (current_cash - dso_impact) / shocked_burn, np.inf
+            )
+            impact_runway = runway - base_runway
+            
+            # Probabilité de survie
+            survival = np.where(
+                cash_at_horizon > 0,
+                1.0,
+                np.maximum(0, cash_at_horizon / current_cash + 1) if current_cash else 0.0
+            )
         
-        # Impact
-        base_cash_6m = current_cash + (monthly_revenues - monthly_costs) * 6
-        impact_cash = cash_6m - base_cash_6m
+        # Runway infini -> 999 (affichage), inf - inf -> pas d'impact
+        impact_runway = np.nan_to_num(impact_runway, nan=0.0, posinf=999, neginf=-999)
         
-        # Runway
-        if shocked_burn > 0:
-            new_runway = (current_cash - dso_impact) / shocked_burn
-        else:
-            new_runway = float('inf')
+        return {
+            "cash_at_horizon": cash_at_horizon,
+            "impact_cash": impact_cash,
+            "runway": runway,
+            "impact_runway": impact_runway,
+            "survival": survival
+        }
+    
+    def evaluate_scenario_grid(
+        self,
+        current_cash: float,
+        monthly_revenues: float,
+        monthly_costs: float,
+        revenue_changes: Optional[List[float]] = None,
+        cost_changes: Optional[List[float]] = None,
+        dso_changes: Optional[List[float]] = None,
+        horizon_months: int = 6
+    ) -> ScenarioGridResult:
+        """
+        Évalue toute la grille revenus × coûts × DSO en un seul broadcast.
         
-        base_burn = monthly_costs - monthly_revenues
-        if base_burn > 0:
-            base_runway = current_cash / base_burn
-        else:
-            base_runway = float('inf')
-        
-        impact_runway = new_runway - base_runway
-        
-        # Probabilité de survie
-        survival = 1.0 if cash_6m > 0 else max(0, cash_6m / current_cash + 1)
-        
-        return StressScenario(
-            scenario_id=scenario_def.get('id', 'custom'),
-            name=scenario_def.get('name', 'Custom'),
-            description=scenario_def.get('description', ''),
-            revenue_shock_pct=scenario_def.get('revenue_shock', 0) * 100,
-            cost_shock_pct=scenario_def.get('cost_shock', 0) * 100,
-            dso_shock_days=scenario_def.get('dso_shock', 0),
-            client_loss_pct=scenario_def.get('client_loss', 0) * 100,
-            impact_on_cash=impact_cash,
-            impact_on_runway=impact_runway if impact_runway != float('inf') else 999,
-            survival_probability=survival
+        Args:
+            revenue_changes: Variations de CA (-0.2 = -20%), défaut [0]
+            cost_changes: Variations de coûts (+0.1 = +10%), défaut [0]
+            dso_changes: Variations de DSO en jours, défaut [0]
+            horizon_months: Horizon du calcul de cash
+            
+        Returns:
+            ScenarioGridResult avec tenseurs (len(rev), len(cost), len(dso))
+        """
+        revenue_axis = np.asarray(revenue_changes if revenue_changes is not None else [0.0], dtype=float)
+        cost_axis = np.asarray(cost_changes if cost_changes is not None else [0.0], dtype=float)
+        dso_axis = np.asarray(dso_changes if dso_changes is not None else [0.0], dtype=float)
+        
+        impacts = self._scenario_impacts(
+            current_cash=current_cash,
+            monthly_revenues=monthly_revenues,
+            monthly_costs=monthly_costs,
+            revenue_shock=revenue_axis[:, None, None],
+            cost_shock=cost_axis[None, :, None],
+            dso_shock=dso_axis[None, None, :],
+            horizon_months=horizon_months
+        )
+        
+        return ScenarioGridResult(
+            revenue_changes=revenue_axis,
+            cost_changes=cost_axis,
+            dso_changes=dso_axis,
+            horizon_months=horizon_months,
+            cash_at_horizon=impacts["cash_at_horizon"],
+            cash_impact=impacts["impact_cash"],
+            runway_months=impacts["runway"],
+            survival_probability=impacts["survival"]
         )
     
     def _run_sensitivity(
@@ -640,25 +1674,28 @@ class StressTester:
         ]
         
         for var_name, base_value, changes in variables:
-            impacts = []
+            shocks = {"revenues": 0.0, "costs": 0.0, "dso_days": 0.0}
+            shocks[var_name] = np.asarray(changes, dtype=float)
+            
+            # Impact cash sur 6 mois, toutes les variations d'un coup
+            cash_impacts = self._scenario_impacts(
+                current_cash=current_cash,
+                monthly_revenues=monthly_revenues,
+                monthly_costs=monthly_costs,
+                revenue_shock=shocks["revenues"],
+                cost_shock=shocks["costs"],
+                dso_shock=shocks["dso_days"]
+            )["impact_cash"]
+            runway_impacts = cash_impacts / monthly_costs if monthly_costs > 0 else np.zeros_like(cash_impacts)
             
-            for change in changes:
-                if var_name == "revenues":
-                    new_rev = monthly_revenues * (1 + change)
-                    cash_impact = (new_rev - monthly_revenues) * 6  # Sur 6 mois
-                elif var_name == "costs":
-                    new_cost = monthly_costs * (1 + change)
-                    cash_impact = -(new_cost - monthly_costs) * 6
-                else:  # DSO
-                    cash_impact = -change / 30 * monthly_revenues
-                
-                runway_impact = cash_impact / monthly_costs if monthly_costs > 0 else 0
-                
-                impacts.append({
+            impacts = [
+                {
                     "change": f"{change:+.0%}" if var_name != "dso_days" else f"{change:+d}j",
-                    "cash_impact": round(cash_impact, 0),
-                    "runway_impact_months": round(runway_impact, 1)
-                })
+                    "cash_impact": round(float(cash_impact), 0),
+                    "runway_impact_months": round(float(runway_impact), 1)
+                }
+                for change, cash_impact, runway_impact in zip(changes, cash_impacts, runway_impacts)
+            ]
             
             # Élasticité (approximation)
             if len(impacts) >= 2:
@@ -692,38 +1729,108 @@ class StressTester:
         current_cash: float,
         monthly_revenues: float,
         monthly_costs: float,
-        safety_threshold: float
+        revenue_volatility: float = 0.15,
+        cost_volatility: float = 0.08,
+        dso_volatility_days: float = 0.0,
+        correlations: Optional[Dict[str, float]] = None,
+        horizon_months: int = 6
     ) -> ReverseStressResult:
-        """Reverse stress test"""
-        
-        # Calculer les seuils de rupture
-        breaking_points = {}
-        
-        # Baisse de revenus pour atteindre 0
-        # current_cash + (rev * (1+x) - cost) * 6 = 0
-        # x = (cost * 6 - current_cash) / (rev * 6) - 1
-        rev_break = ((monthly_costs * 6 - current_cash) / (monthly_revenues * 6)) - 1 if monthly_revenues > 0 else 0
-        breaking_points["revenue_drop"] = f"{rev_break*100:.0f}%"
-        
-        # Hausse de coûts
-        # current_cash + (rev - cost * (1+x)) * 6 = 0
-        cost_break = (current_cash / (monthly_costs * 6)) + (monthly_revenues / monthly_costs) - 1 if monthly_costs > 0 else 0
-        breaking_points["cost_increase"] = f"{cost_break*100:.0f}%"
-        
-        # DSO
-        dso_break = current_cash / monthly_revenues * 30 if monthly_revenues > 0 else 999
-        breaking_points["dso_increase"] = f"+{dso_break:.0f} jours"
-        
-        # Scénario combiné minimal
-        minimal = {
-            "revenue": f"{rev_break*0.5*100:.0f}%",
-            "costs": f"+{cost_break*0.3*100:.0f}%",
-            "dso": f"+{dso_break*0.3:.0f}j",
-            "description": "Combinaison probable amenant au seuil critique"
+        """
+        Reverse stress test : surface de rupture (cash à l'horizon = 0).
+        
+        Les chocs persistants (revenus, coûts, DSO) suivent une loi normale
+        centrée, d'écarts-types les volatilités mensuelles (DSO : volatilité
+        × √horizon) et corrélée selon `correlations`. Chaque direction de
+        l'espace standardisé est résolue par bissection, toutes en même
+        temps : le rayon trouvé est la distance de Mahalanobis β du point de
+        rupture. Le point le plus probable minimise β, de probabilité Φ(-β).
+        Sans rupture, minimal_combined_shock garde les mêmes clés à None.
+        """
+        cholesky = _factor_cholesky(correlations)
+        dso_volatility = dso_volatility_days or self.REVERSE_DSO_VOLATILITY_DAYS
+        scales = np.array([
+            revenue_volatility, cost_volatility, dso_volatility * np.sqrt(horizon_months)
+        ])
+        
+        # Directions : sphère de Fibonacci (quasi-uniforme) + 3 axes purs
+        # (un seul facteur choqué), normalisées à une distance de Mahalanobis 1
+        n = self.REVERSE_DIRECTIONS
+        k = np.arange(n) + 0.5
+        polar = np.arccos(1 - 2 * k / n)
+        azimuth = np.pi * (1 + 5 ** 0.5) * k
+        sphere = np.column_stack([
+            np.cos(azimuth) * np.sin(polar),
+            np.sin(azimuth) * np.sin(polar),
+            np.cos(polar)
+        ]) @ cholesky.T
+        axes = np.diag([-1.0, 1.0, 1.0])  # baisse CA, hausse coûts, hausse DSO
+        axes /= np.linalg.norm(np.linalg.solve(cholesky, axes.T), axis=0)[:, None]
+        directions = np.vstack([sphere, axes]) * scales
+        
+        def cash_at(radius: np.ndarray) -> np.ndarray:
+            shocks = directions * radius[:, None]
+            return self._scenario_impacts(
+                current_cash=current_cash,
+                monthly_revenues=monthly_revenues,
+                monthly_costs=monthly_costs,
+                revenue_shock=np.maximum(shocks[:, 0], -1.0),  # CA >= 0
+                cost_shock=np.maximum(shocks[:, 1], -1.0),
+                dso_shock=shocks[:, 2],
+                horizon_months=horizon_months
+            )["cash_at_horizon"]
+        
+        # Bissection vectorisée sur [0, REVERSE_MAX_SIGMA]
+        lo = np.zeros(len(directions))
+        hi = np.full(len(directions), self.REVERSE_MAX_SIGMA)
+        breaks = cash_at(hi) <= 0
+        if cash_at(np.zeros(1))[0] <= 0:
+            hi[:] = 0.0  # Rupture déjà atteinte sans choc
+        else:
+            for _ in range(self.REVERSE_BISECTION_STEPS):
+                mid = (lo + hi) / 2
+                broken = cash_at(mid) <= 0
+                hi = np.where(broken, mid, hi)
+                lo = np.where(broken, lo, mid)
+        sigma = np.where(breaks | (hi == 0), hi, np.inf)
+        surface = directions * np.where(np.isfinite(sigma), sigma, np.nan)[:, None]
+        surface[:, :2] = np.maximum(surface[:, :2], -1.0)
+        surface += 0.0  # pas de "-0%" à l'affichage
+        
+        # Ruptures sur un seul facteur
+        axis_surface = surface[n:]
+        breaking_points = {
+            "revenue_drop": (
+                f"{axis_surface[0, 0]*100:.0f}%" if np.isfinite(sigma[n]) else "non atteignable"
+            ),
+            "cost_increase": (
+                f"+{axis_surface[1, 1]*100:.0f}%" if np.isfinite(sigma[n + 1]) else "non atteignable"
+            ),
+            "dso_increase": (
+                f"+{axis_surface[2, 2]:.0f} jours" if np.isfinite(sigma[n + 2]) else "non atteignable"
+            )
         }
         
-        # Probabilité (estimation heuristique)
-        probability = 0.05 if abs(rev_break) > 0.40 else 0.15 if abs(rev_break) > 0.25 else 0.30
+        # Point de rupture le plus probable
+        best = int(np.argmin(sigma))
+        beta = float(sigma[best])
+        probability = float(ndtr(-beta))
+        if np.isfinite(beta):
+            rev, cost, dso = surface[best]
+            minimal = {
+                "revenue": f"{rev*100:+.0f}%",
+                "costs": f"{cost*100:+.0f}%",
+                "dso": f"{dso:+.0f}j",
+                "sigma": round(beta, 2),
+                "description": "Combinaison la plus probable amenant au cash négatif"
+            }
+        else:
+            minimal = {
+                "revenue": None,
+                "costs": None,
+                "dso": None,
+                "sigma": None,
+                "description": f"Aucune rupture à moins de {self.REVERSE_MAX_SIGMA:.0f} écarts-types"
+            }
         
         # Temps avant impact
         monthly_burn = monthly_costs - monthly_revenues
@@ -732,19 +1839,27 @@ class StressTester:
         else:
             time_to_impact = 24  # Plus d'un an
         
-        interpretation = (
-            f"Il faudrait une baisse de revenus de {abs(rev_break)*100:.0f}% pour atteindre le cash négatif, "
-            f"ou une hausse de coûts de {cost_break*100:.0f}%. "
-            f"Ces niveaux de stress ont une probabilité estimée à {probability*100:.0f}%."
-        )
+        if np.isfinite(beta):
+            interpretation = (
+                f"Le scénario de rupture le plus probable combine revenus {minimal['revenue']}, "
+                f"coûts {minimal['costs']} et DSO {minimal['dso']} ({beta:.1f} écarts-types). "
+                f"Probabilité estimée de ce niveau de stress : {probability*100:.1f}%."
+            )
+        else:
+            interpretation = (
+                f"Aucune combinaison de chocs à moins de {self.REVERSE_MAX_SIGMA:.0f} écarts-types "
+                f"n'amène le cash en négatif à {horizon_months} mois."
+            )
         
         return ReverseStressResult(
-            question="Quel niveau de choc pour atteindre un cash négatif à 6 mois?",
+            question=f"Quel niveau de choc pour atteindre un cash négatif à {horizon_months} mois?",
             breaking_points=breaking_points,
             minimal_combined_shock=minimal,
             scenario_probability=probability,
             time_to_impact_months=time_to_impact,
-            interpretation=interpretation
+            interpretation=interpretation,
+            breaking_surface=surface,
+            breaking_sigma=sigma
         )
     
     def _assess_risk(
@@ -0,0 +1,282 @@
+"""
+Simulation what-if d'une facture hypothétique.
+Impact runway, rating client, alertes et actions en O(1) par facture.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .client_scoring import ClientRiskScorer
+from .payment_patterns import ClientPaymentAnalyzer
+
+
+class WhatIfSimulator:
+    """
+    Simulateur d'impact d'une facture ajoutée au portefeuille.
+
+    Une facture simulée est en attente : elle ne modifie pas l'historique
+    de paiement du client (pattern), seulement son encours et le total
+    portefeuille. Les statistiques suffisantes sont donc calculées une
+    fois par version des factures :
+    - encours par client et total
+    - part du score indépendante de l'encours (comportement, tendance,
+      stabilité pondérés) par client
+    Chaque simulation ne recalcule que le sous-score d'exposition.
+    """
+
+    RATING_ORDER = {'A': 1, 'B': 2, 'C': 3, 'D': 4}
+
+    def __init__(self, invoices: pd.DataFrame, scorer: Optional[ClientRiskScorer] = None):
+        """
+        Args:
+            invoices: Factures (client_id, client_name, amount, status,
+                due_date, payment_date...). Non modifié.
+        """
+        self.scorer = scorer or ClientRiskScorer()
+
+        pending = invoices[invoices['status'] != 'paid']
+        self.total_pending = float(pending['amount'].sum())
+        self.client_pending: Dict[str, float] = pending.groupby('client_name')['amount'].sum().to_dict()
+        self.known_clients = set(invoices['client_name'])
+
+        # Client_id de chaque nom (première occurrence)
+        names = invoices.drop_duplicates('client_name')
+        client_ids = dict(zip(names['client_name'], names['client_id']))
+
+        # Part du score hors exposition, par nom de client
+        self._base_scores: Dict[str, float] = {}
+        patterns = ClientPaymentAnalyzer(invoices.copy()).analyze_all()
+        if patterns:
+            table = self.scorer.score_table(
+                [{"pattern": pattern, "pending_amount": 0} for pattern in patterns.values()]
+            )
+            weights = self.scorer.weights
+            base = (
+                table["payment_behavior_score"] * weights["payment_behavior"] +
+                table["trend_score"] * weights["trend"] +
+                table["stability_score"] * weights["stability"]
+            )
+            base_by_id = dict(zip(table["client_id"], base.tolist()))
+            self._base_scores = {
+                name: base_by_id[client_id]
+                for name, client_id in client_ids.items()
+                if client_id in base_by_id
+            }
+
+    def client_score(self, client_name: str, pending_amount: float, total_portfolio: float) -> Optional[Dict]:
+        """
+        Score et rating d'un client pour un encours donné.
+
+        Returns:
+            {"risk_score", "rating"} ou None si aucun historique de paiement
+        """
+        base = self._base_scores.get(client_name)
+        if base is None:
+            return None
+
+        amount_score = self.scorer.amount_score(pending_amount, total_portfolio)
+        risk_score = base + amount_score * self.scorer.weights["amount"]
+        return {
+            "risk_score": round(risk_score, 2),
+            "rating": self.scorer.rating_for(risk_score)
+        }
+
+    def simulate(self, client_name: str, amount: float, days_overdue: int = 0) -> Dict:
+        """
+        Impact de l'ajout d'une facture en attente.
+
+        Args:
+            client_name: Nom client (existant ou nouveau)
+            amount: Montant en €
+            days_overdue: Jours de retard (0 = pas en retard)
+
+        Returns:
+            Dict aux champs de SimulationResult (hors is_demo)
+        """
+        # ─── ÉTAT AVANT ───
+        total_pending_before = self.total_pending
+        client_pending_before = self.client_pending.get(client_name, 0.0)
+
+        # Runway avant (approximation: pending / moyenne mensuelle)
+        avg_monthly = total_pending_before / 3  # Hypothèse 3 mois de data
+        runway_before = (total_pending_before / avg_monthly * 4) if avg_monthly > 0 else 12  # en semaines
+
+        # Score client avant (si existe)
+        client_rating_before = None
+        client_score_before = None
+        if client_name in self.known_clients:
+            score_before = self.client_score(
+                client_name,
+                client_pending_before,
+                total_pending_before if total_pending_before > 0 else 1
+            )
+            if score_before is not None:
+                client_rating_before = score_before["rating"]
+                client_score_before = score_before["risk_score"]
+
+        # ─── ÉTAT APRÈS ───
+        total_pending_after = total_pending_before + amount
+        client_total = client_pending_before + amount
+
+        # Runway après
+        runway_after = (total_pending_after / avg_monthly * 4) if avg_monthly > 0 else 12
+
+        # Score client après
+        score_after = self.client_score(
+            client_name,
+            client_total,
+            total_pending_after if total_pending_after > 0 else 1
+        )
+        if score_after is not None:
+            client_rating_after = score_after["rating"]
+            client_score_after = score_after["risk_score"]
+        else:
+            # Nouveau client sans historique = rating C par défaut
+            client_rating_after = "C" if days_overdue < 30 else "D"
+            client_score_after = 55 if days_overdue < 30 else 75
+
+        # ─── DÉTECTER WARNINGS ───
+        warnings_triggered = []
+
+        # Warning: Retard critique
+        if days_overdue > 60:
+            warnings_triggered.append({
+                "type": "critical_delay",
+                "severity": "critical",
+                "message": f"Retard > 60 jours ({days_overdue}j) - Action immédiate requise",
+                "amount_at_risk": amount
+            })
+        elif days_overdue > 30:
+            warnings_triggered.append({
+                "type": "significant_delay",
+                "severity": "high",
+                "message": f"Retard significatif ({days_overdue}j) - Surveillance renforcée",
+                "amount_at_risk": amount
+            })
+
+        # Warning: Montant élevé
+        if amount > 200000:
+            warnings_triggered.append({
+                "type": "high_amount",
+                "severity": "high" if amount > 400000 else "medium",
+                "message": f"Montant élevé ({amount/1000:.0f}K€) - Impact runway significatif",
+                "amount_at_risk": amount
+            })
+
+        # Warning: Concentration
+        concentration = (client_total / total_pending_after * 100) if total_pending_after > 0 else 0
+        if concentration > 30:
+            warnings_triggered.append({
+                "type": "concentration_risk",
+                "severity": "critical" if concentration > 40 else "high",
+                "message": f"Concentration client: {concentration:.0f}% du portefeuille",
+                "amount_at_risk": client_total
+            })
+
+        # Warning: Dégradation rating
+        if client_rating_before and client_rating_after:
+            if self.RATING_ORDER.get(client_rating_after, 0) > self.RATING_ORDER.get(client_rating_before, 0):
+                warnings_triggered.append({
+                    "type": "rating_degradation",
+                    "severity": "high",
+                    "message": f"Dégradation rating: {client_rating_before} → {client_rating_after}",
+                    "amount_at_risk": client_total
+                })
+
+        # ─── DÉTERMINER RISK STATUS ───
+        risk_status = "CERTAIN"
+        risk_score = 25
+
+        if days_overdue > 60 or concentration > 40:
+            risk_status = "CRITICAL"
+            risk_score = 85
+        elif days_overdue > 30 or concentration > 30 or amount > 300000:
+            risk_status = "UNCERTAIN"
+            risk_score = 60
+        elif days_overdue > 0 or amount > 100000:
+            risk_status = "UNCERTAIN"
+            risk_score = 45
+
+        # ─── GÉNÉRER ACTIONS ───
+        actions_generated = []
+
+        if risk_status == "CRITICAL":
+            actions_generated.append({
+                "priority": "P1",
+                "title": f"Relancer immédiatement {client_name}",
+                "description": f"Facture {amount/1000:.0f}K€ en retard de {days_overdue}j",
+                "deadline": "Immédiat",
+                "impact_amount": amount
+            })
+
+        if risk_status in ["CRITICAL", "UNCERTAIN"]:
+            actions_generated.append({
+                "priority": "P2",
+                "title": f"Requalifier forecast {client_name}",
+                "description": "Mettre à jour les prévisions de trésorerie",
+                "deadline": "Cette semaine",
+                "impact_amount": amount
+            })
+
+        if concentration > 25:
+            actions_generated.append({
+                "priority": "P2" if concentration > 35 else "P3",
+                "title": f"Analyser exposition {client_name}",
+                "description": f"Concentration à {concentration:.0f}% - diversifier si possible",
+                "deadline": "2 semaines",
+                "impact_amount": client_total
+            })
+
+        # ─── CONSTRUIRE SUMMARY ───
+        summary_parts = []
+
+        if risk_status == "CRITICAL":
+            summary_parts.append(f"🔴 ALERTE CRITIQUE: Cette facture déclenche un risque majeur")
+        elif risk_status == "UNCERTAIN":
+            summary_parts.append(f"🟡 ATTENTION: Cette facture nécessite une surveillance renforcée")
+        else:
+            summary_parts.append(f"🟢 OK: Cette facture ne déclenche pas d'alerte particulière")
+
+        summary_parts.append(f"Impact runway: {runway_before:.1f} → {runway_after:.1f} semaines ({runway_after - runway_before:+.1f})")
+
+        if client_rating_before and client_rating_before != client_rating_after:
+            summary_parts.append(f"Rating client: {client_rating_before} → {client_rating_after}")
+        elif not client_rating_before:
+            summary_parts.append(f"Nouveau client détecté avec rating initial: {client_rating_after}")
+
+        if warnings_triggered:
+            summary_parts.append(f"{len(warnings_triggered)} alerte(s) déclenchée(s)")
+
+        return {
+            "runway_before_weeks": round(runway_before, 1),
+            "runway_after_weeks": round(runway_after, 1),
+            "runway_delta_weeks": round(runway_after - runway_before, 1),
+            "client_rating_before": client_rating_before,
+            "client_rating_after": client_rating_after,
+            "client_score_before": client_score_before,
+            "client_score_after": client_score_after,
+            "rating_changed": client_rating_before != client_rating_after if client_rating_before else True,
+            "risk_status": risk_status,
+            "risk_score": risk_score,
+            "warnings_triggered": warnings_triggered,
+            "actions_generated": actions_generated,
+            "simulation_summary": " | ".join(summary_parts)
+        }
+
+    def simulate_batch(self, invoices: Iterable[Dict]) -> List[Dict]:
+        """
+        Simule plusieurs factures, chacune seule face au portefeuille actuel
+        (les factures du lot ne se cumulent pas).
+
+        Args:
+            invoices: Dicts client_name, amount, days_overdue (optionnel)
+        """
+        return [
+            self.simulate(
+                invoice["client_name"],
+                invoice["amount"],
+                invoice.get("days_overdue", 0)
+            )
+            for invoice in invoices
+        ]
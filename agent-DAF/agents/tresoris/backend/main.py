@@ -44,7 +44,8 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import pandas as pd
@@ -59,6 +60,12 @@ from engine.payment_patterns import ClientPaymentAnalyzer
 from engine.client_scoring import ClientRiskScorer
 from engine.early_warning import EarlyWarningDetector
 from engine.smart_forecast import SmartForecaster
+from engine.whatif_simulator import WhatIfSimulator
+
+# Snapshot partagé des factures (un parsing CSV par version du fichier)
+from services.invoice_snapshot import InvoiceSnapshotStore
+from services.dashboard_view import DashboardView, etag_matches
+from services.client_index import ClientIndex
 
 # V3 - Google Sheets Integration
 from api.gsheet_router import router as gsheet_router, storage as gsheet_storage, run_analysis, gsheet_to_dataframe
@@ -95,6 +102,7 @@ class StatusResponse(BaseModel):
     version: str
     last_decision: Optional[Dict]
     current_analysis_summary: Optional[Dict]
+    stress_cache: Optional[Dict] = None
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -102,11 +110,22 @@ class StatusResponse(BaseModel):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 class SimulateInvoiceRequest(BaseModel):
-    """Requête pour simuler l'ajout d'une facture"""
+    """
+    Requête pour simuler l'ajout d'une facture.
+
+    due_date est accepté pour compatibilité mais sans effet : une facture
+    en attente ne modifie pas le pattern de paiement du client, seuls
+    amount et days_overdue entrent dans la simulation.
+    """
     client_name: str                    # Nom client (existant ou nouveau)
     amount: float                       # Montant en €
     days_overdue: int = 0               # Jours de retard (0 = pas en retard)
-    due_date: Optional[str] = None      # Date échéance (optionnel, calculée si absent)
+    due_date: Optional[str] = None      # Ignoré (compatibilité)
+
+
+class SimulateBatchRequest(BaseModel):
+    """Requête pour simuler plusieurs factures (chacune isolément)"""
+    invoices: List[SimulateInvoiceRequest]
 
 
 class SimulationResult(BaseModel):
@@ -174,6 +193,8 @@ class AppState:
         self.memory: Optional[TresorisMemory] = None
         self.websocket_clients: List[WebSocket] = []
         self.sheets_poller: Optional[SheetsPoller] = None  # ← Nouveau
+        self.invoice_store: Optional[InvoiceSnapshotStore] = None
+        self.dashboard: Optional[DashboardView] = None
 
 
 state = AppState()
@@ -235,6 +256,13 @@ async def lifespan(app: FastAPI):
     state.agent.register_event_callback(broadcast_event)
     print(f"✅ Agent créé")
     
+    # Snapshot factures partagé entre l'agent et les endpoints
+    state.invoice_store = state.agent.invoice_store
+    
+    # Vue dashboard recalculée en fin d'analyse / changement de snapshot
+    state.dashboard = DashboardView(state.invoice_store, state.agent)
+    state.agent.register_event_callback(state.dashboard.on_agent_event)
+    
     print("💡 API prête sur http://localhost:8000")
     print("📡 WebSocket sur ws://localhost:8000/ws")
     
@@ -333,6 +361,10 @@ async def lifespan(app: FastAPI):
         state.sheets_poller.stop()
     if state.agent and state.agent.running:
         await state.agent.stop()
+    if state.agent:
+        state.agent.stress_tester.shutdown()
+    if state.memory:
+        state.memory.close()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -613,9 +645,8 @@ async def upload_invoices(file: UploadFile = File(...)):
             df['days_overdue'] = (datetime.now() - df['due_date']).dt.days
             df['days_overdue'] = df['days_overdue'].clip(lower=0).fillna(0).astype(int)
         
-        # Sauvegarder
-        data_path = Path(__file__).parent / "data" / "customer_invoices.csv"
-        df.to_csv(data_path, index=False)
+        # Sauvegarder (bascule du snapshot partagé)
+        state.invoice_store.replace(df)
         
         # Stats
         pending = df[df['status'] != 'paid']
@@ -650,20 +681,20 @@ async def init_demo_data():
         raise HTTPException(status_code=500, detail="Agent non initialisé")
     
     try:
-        data_path = Path(__file__).parent / "data" / "customer_invoices.csv"
+        snapshot = state.invoice_store.get()
         
-        if not data_path.exists():
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Fichier demo introuvable")
         
         # Charger données
-        df = pd.read_csv(data_path)
+        df = snapshot.invoices
         
         # Recalculer days_overdue (dates peuvent être obsolètes)
         if 'due_date' in df.columns:
-            df['due_date'] = pd.to_datetime(df['due_date'], errors='coerce')
+            df = df.copy()
             df['days_overdue'] = (datetime.now() - df['due_date']).dt.days
             df['days_overdue'] = df['days_overdue'].clip(lower=0).fillna(0).astype(int)
-            df.to_csv(data_path, index=False)
+            df = state.invoice_store.replace(df).invoices
         
         # Lancer analyse si agent pas déjà en cours
         if not state.agent.running:
@@ -707,93 +738,23 @@ async def get_client_details(client_id: str):
     - Early warnings
     - Historique
     """
-    data_path = Path(__file__).parent / "data" / "customer_invoices.csv"
+    snapshot = state.invoice_store.get()
     
-    if not data_path.exists():
+    if snapshot is None:
         raise HTTPException(status_code=404, detail="Aucune donnée chargée")
     
     try:
-        df = pd.read_csv(data_path)
-        
-        # Chercher par client_id ou client_name
-        client_col = 'client_name'
-        client_data = df[df[client_col] == client_id]
+        # Index clients du snapshot (positions, pattern, score, risques)
+        index = snapshot.derived("client_index", ClientIndex)
+        analysis = state.agent.current_analysis if state.agent else None
         
-        if client_data.empty:
-            # Essayer avec client_id
-            if 'client_id' in df.columns:
-                client_data = df[df['client_id'] == client_id]
+        # Chercher par client_name ou client_id
+        details = index.details(client_id, analysis)
         
-        if client_data.empty:
+        if details is None:
             raise HTTPException(status_code=404, detail=f"Client '{client_id}' non trouvé")
         
-        client_name = client_data[client_col].iloc[0]
-        
-        # Analyser pattern
-        analyzer = ClientPaymentAnalyzer(df)
-        try:
-            pattern = analyzer.analyze_client(client_name)
-        except:
-            pattern = None
-        
-        # Scorer client
-        pending = df[df['status'] != 'paid']
-        total_pending = pending['amount'].sum()
-        client_pending = client_data[client_data['status'] != 'paid']['amount'].sum()
-        
-        scorer = ClientRiskScorer()
-        if pattern:
-            score = scorer.calculate_risk_score(
-                pattern=pattern,
-                pending_amount=float(client_pending),
-                total_portfolio=float(total_pending) if total_pending > 0 else 1
-            )
-        else:
-            score = None
-        
-        # Early warnings
-        warnings = []
-        if state.agent and state.agent.current_analysis:
-            for risk in state.agent.current_analysis.risks:
-                if risk.client == client_name:
-                    warnings.append({
-                        "type": risk.type,
-                        "status": risk.status.value,
-                        "amount": risk.amount,
-                        "days_overdue": risk.days_overdue,
-                        "score": risk.score,
-                        "justification": risk.justification
-                    })
-        
-        return {
-            "client_id": client_id,
-            "client_name": client_name,
-            "pattern": {
-                "avg_delay_days": pattern.avg_delay_days if pattern else None,
-                "on_time_rate": pattern.on_time_rate if pattern else None,
-                "trend": pattern.trend if pattern else None,
-                "reliability_score": pattern.reliability_score if pattern else None,
-                "risk_level": pattern.risk_level if pattern else None
-            } if pattern else None,
-            "scoring": {
-                "rating": score.rating if score else None,
-                "risk_score": score.risk_score if score else None,
-                "explanation": score.explanation if score else None,
-                "risk_factors": score.risk_factors if score else [],
-                "positive_factors": score.positive_factors if score else [],
-                "confidence": score.confidence if score else None
-            } if score else None,
-            "invoices": {
-                "total": len(client_data),
-                "pending": len(client_data[client_data['status'] != 'paid']),
-                "paid": len(client_data[client_data['status'] == 'paid']),
-                "total_amount": float(client_data['amount'].sum()),
-                "pending_amount": float(client_pending),
-                "overdue_amount": float(client_data[client_data['days_overdue'] > 0]['amount'].sum())
-            },
-            "warnings": warnings,
-            "pending_invoices": client_data[client_data['status'] != 'paid'].to_dict(orient='records')
-        }
+        return details
         
     except HTTPException:
         raise
@@ -801,6 +762,16 @@ async def get_client_details(client_id: str):
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 
+def _whatif_simulator() -> WhatIfSimulator:
+    """Simulateur what-if du snapshot courant (construit une fois par version)"""
+    snapshot = state.invoice_store.get()
+    
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Aucune donnée chargée. Utilisez /demo/init ou /upload d'abord.")
+    
+    return snapshot.derived("whatif_simulator", lambda s: WhatIfSimulator(s.invoices))
+
+
 @app.post("/agent/simulate", response_model=SimulationResult)
 async def simulate_invoice_impact(request: SimulateInvoiceRequest):
     """
@@ -814,219 +785,11 @@ async def simulate_invoice_impact(request: SimulateInvoiceRequest):
     
     Parfait pour démonstrations interactives.
     """
-    data_path = Path(__file__).parent / "data" / "customer_invoices.csv"
-    
-    if not data_path.exists():
-        raise HTTPException(status_code=404, detail="Aucune donnée chargée. Utilisez /demo/init ou /upload d'abord.")
+    simulator = _whatif_simulator()
     
     try:
-        # Charger données actuelles
-        df = pd.read_csv(data_path)
-        
-        # ─── ÉTAT AVANT ───
-        pending_before = df[df['status'] != 'paid']
-        total_pending_before = pending_before['amount'].sum()
-        
-        # Runway avant (approximation: pending / moyenne mensuelle)
-        avg_monthly = total_pending_before / 3  # Hypothèse 3 mois de data
-        runway_before = (total_pending_before / avg_monthly * 4) if avg_monthly > 0 else 12  # en semaines
-        
-        # Score client avant (si existe)
-        client_exists = request.client_name in df['client_name'].values
-        client_rating_before = None
-        client_score_before = None
-        
-        if client_exists:
-            analyzer = ClientPaymentAnalyzer(df)
-            try:
-                pattern_before = analyzer.analyze_client(request.client_name)
-                scorer = ClientRiskScorer()
-                client_pending = pending_before[pending_before['client_name'] == request.client_name]['amount'].sum()
-                score_before = scorer.calculate_risk_score(
-                    pattern=pattern_before,
-                    pending_amount=float(client_pending),
-                    total_portfolio=float(total_pending_before) if total_pending_before > 0 else 1
-                )
-                client_rating_before = score_before.rating
-                client_score_before = score_before.risk_score
-            except:
-                pass
-        
-        # ─── AJOUTER FACTURE SIMULÉE ───
-        due_date = request.due_date or (datetime.now() - timedelta(days=request.days_overdue)).strftime('%Y-%m-%d')
-        
-        simulated_invoice = {
-            'invoice_id': f'SIM-{datetime.now().strftime("%H%M%S")}',
-            'client_id': f'CLI-{hash(request.client_name) % 10000:04d}',
-            'client_name': request.client_name,
-            'invoice_date': (datetime.now() - timedelta(days=request.days_overdue + 30)).strftime('%Y-%m-%d'),
-            'due_date': due_date,
-            'amount': request.amount,
-            'status': 'overdue' if request.days_overdue > 0 else 'pending',
-            'payment_date': None,
-            'days_overdue': request.days_overdue,
-            'risk_level': 'critical' if request.days_overdue > 60 else 'high' if request.days_overdue > 30 else 'medium' if request.days_overdue > 0 else 'low'
-        }
-        
-        df_with_sim = pd.concat([df, pd.DataFrame([simulated_invoice])], ignore_index=True)
-        
-        # ─── ÉTAT APRÈS ───
-        pending_after = df_with_sim[df_with_sim['status'] != 'paid']
-        total_pending_after = pending_after['amount'].sum()
-        
-        # Runway après
-        runway_after = (total_pending_after / avg_monthly * 4) if avg_monthly > 0 else 12
-        
-        # Score client après
-        analyzer_after = ClientPaymentAnalyzer(df_with_sim)
-        try:
-            pattern_after = analyzer_after.analyze_client(request.client_name)
-            scorer = ClientRiskScorer()
-            client_pending_after = pending_after[pending_after['client_name'] == request.client_name]['amount'].sum()
-            score_after = scorer.calculate_risk_score(
-                pattern=pattern_after,
-                pending_amount=float(client_pending_after),
-                total_portfolio=float(total_pending_after) if total_pending_after > 0 else 1
-            )
-            client_rating_after = score_after.rating
-            client_score_after = score_after.risk_score
-        except:
-            # Nouveau client sans historique = rating C par défaut
-            client_rating_after = "C" if request.days_overdue < 30 else "D"
-            client_score_after = 55 if request.days_overdue < 30 else 75
-        
-        # ─── DÉTECTER WARNINGS ───
-        warnings_triggered = []
-        
-        # Warning: Retard critique
-        if request.days_overdue > 60:
-            warnings_triggered.append({
-                "type": "critical_delay",
-                "severity": "critical",
-                "message": f"Retard > 60 jours ({request.days_overdue}j) - Action immédiate requise",
-                "amount_at_risk": request.amount
-            })
-        elif request.days_overdue > 30:
-            warnings_triggered.append({
-                "type": "significant_delay",
-                "severity": "high",
-                "message": f"Retard significatif ({request.days_overdue}j) - Surveillance renforcée",
-                "amount_at_risk": request.amount
-            })
-        
-        # Warning: Montant élevé
-        if request.amount > 200000:
-            warnings_triggered.append({
-                "type": "high_amount",
-                "severity": "high" if request.amount > 400000 else "medium",
-                "message": f"Montant élevé ({request.amount/1000:.0f}K€) - Impact runway significatif",
-                "amount_at_risk": request.amount
-            })
-        
-        # Warning: Concentration
-        client_total = pending_after[pending_after['client_name'] == request.client_name]['amount'].sum()
-        concentration = (client_total / total_pending_after * 100) if total_pending_after > 0 else 0
-        if concentration > 30:
-            warnings_triggered.append({
-                "type": "concentration_risk",
-                "severity": "critical" if concentration > 40 else "high",
-                "message": f"Concentration client: {concentration:.0f}% du portefeuille",
-                "amount_at_risk": client_total
-            })
-        
-        # Warning: Dégradation rating
-        if client_rating_before and client_rating_after:
-            rating_order = {'A': 1, 'B': 2, 'C': 3, 'D': 4}
-            if rating_order.get(client_rating_after, 0) > rating_order.get(client_rating_before, 0):
-                warnings_triggered.append({
-                    "type": "rating_degradation",
-                    "severity": "high",
-                    "message": f"Dégradation rating: {client_rating_before} → {client_rating_after}",
-                    "amount_at_risk": client_total
-                })
-        
-        # ─── DÉTERMINER RISK STATUS ───
-        risk_status = "CERTAIN"
-        risk_score = 25
-        
-        if request.days_overdue > 60 or concentration > 40:
-            risk_status = "CRITICAL"
-            risk_score = 85
-        elif request.days_overdue > 30 or concentration > 30 or request.amount > 300000:
-            risk_status = "UNCERTAIN"
-            risk_score = 60
-        elif request.days_overdue > 0 or request.amount > 100000:
-            risk_status = "UNCERTAIN"
-            risk_score = 45
-        
-        # ─── GÉNÉRER ACTIONS ───
-        actions_generated = []
-        
-        if risk_status == "CRITICAL":
-            actions_generated.append({
-                "priority": "P1",
-                "title": f"Relancer immédiatement {request.client_name}",
-                "description": f"Facture {request.amount/1000:.0f}K€ en retard de {request.days_overdue}j",
-                "deadline": "Immédiat",
-                "impact_amount": request.amount
-            })
-        
-        if risk_status in ["CRITICAL", "UNCERTAIN"]:
-            actions_generated.append({
-                "priority": "P2",
-                "title": f"Requalifier forecast {request.client_name}",
-                "description": "Mettre à jour les prévisions de trésorerie",
-                "deadline": "Cette semaine",
-                "impact_amount": request.amount
-            })
-        
-        if concentration > 25:
-            actions_generated.append({
-                "priority": "P2" if concentration > 35 else "P3",
-                "title": f"Analyser exposition {request.client_name}",
-                "description": f"Concentration à {concentration:.0f}% - diversifier si possible",
-                "deadline": "2 semaines",
-                "impact_amount": client_total
-            })
-        
-        # ─── CONSTRUIRE SUMMARY ───
-        summary_parts = []
-        
-        if risk_status == "CRITICAL":
-            summary_parts.append(f"🔴 ALERTE CRITIQUE: Cette facture déclenche un risque majeur")
-        elif risk_status == "UNCERTAIN":
-            summary_parts.append(f"🟡 ATTENTION: Cette facture nécessite une surveillance renforcée")
-        else:
-            summary_parts.append(f"🟢 OK: Cette facture ne déclenche pas d'alerte particulière")
-        
-        summary_parts.append(f"Impact runway: {runway_before:.1f} → {runway_after:.1f} semaines ({runway_after - runway_before:+.1f})")
-        
-        if client_rating_before and client_rating_before != client_rating_after:
-            summary_parts.append(f"Rating client: {client_rating_before} → {client_rating_after}")
-        elif not client_rating_before:
-            summary_parts.append(f"Nouveau client détecté avec rating initial: {client_rating_after}")
-        
-        if warnings_triggered:
-            summary_parts.append(f"{len(warnings_triggered)} alerte(s) déclenchée(s)")
-        
-        simulation_summary = " | ".join(summary_parts)
-        
-        return SimulationResult(
-            runway_before_weeks=round(runway_before, 1),
-            runway_after_weeks=round(runway_after, 1),
-            runway_delta_weeks=round(runway_after - runway_before, 1),
-            client_rating_before=client_rating_before,
-            client_rating_after=client_rating_after,
-            client_score_before=client_score_before,
-            client_score_after=client_score_after,
-            rating_changed=client_rating_before != client_rating_after if client_rating_before else True,
-            risk_status=risk_status,
-            risk_score=risk_score,
-            warnings_triggered=warnings_triggered,
-            actions_generated=actions_generated,
-            simulation_summary=simulation_summary,
-            is_demo=True
-        )
+        result = simulator.simulate(request.client_name, request.amount, request.days_overdue)
+        return SimulationResult(**result, is_demo=True)
         
     except HTTPException:
         raise
@@ -1034,133 +797,52 @@ async def simulate_invoice_impact(request: SimulateInvoiceRequest):
         raise HTTPException(status_code=500, detail=f"Erreur simulation: {str(e)}")
 
 
-@app.get("/dashboard")
-async def get_dashboard_data():
+@app.post("/agent/simulate/batch")
+async def simulate_invoices_batch(request: SimulateBatchRequest):
     """
-    Données agrégées pour le dashboard frontend.
-    Tout ce dont le frontend a besoin en un seul appel.
+    Simule un lot de factures hypothétiques en un appel.
+    
+    Chaque facture est évaluée seule face au portefeuille actuel (pas de
+    cumul entre factures du lot). Résultats dans l'ordre de la requête.
     """
-    data_path = Path(__file__).parent / "data" / "customer_invoices.csv"
+    if len(request.invoices) > 1000:
+        raise HTTPException(status_code=400, detail="Maximum 1000 factures par lot")
     
-    if not data_path.exists():
-        raise HTTPException(status_code=404, detail="Aucune donnée chargée")
+    simulator = _whatif_simulator()
     
     try:
-        df = pd.read_csv(data_path)
-        
-        # Calculer days_overdue si pas présent
-        if 'days_overdue' not in df.columns and 'due_date' in df.columns:
-            df['due_date'] = pd.to_datetime(df['due_date'], errors='coerce')
-            df['days_overdue'] = (datetime.now() - df['due_date']).dt.days
-            df['days_overdue'] = df['days_overdue'].clip(lower=0).fillna(0).astype(int)
-        
-        pending = df[df['status'] != 'paid']
-        overdue = pending[pending['days_overdue'] > 0]
-        
-        # Position cash
-        total_pending = float(pending['amount'].sum()) if not pending.empty else 0
-        total_overdue = float(overdue['amount'].sum()) if not overdue.empty else 0
-        
-        # Runway (approximation)
-        avg_monthly = total_pending / 3 if total_pending > 0 else 1
-        runway_weeks = round(total_pending / avg_monthly * 4, 1) if avg_monthly > 0 else 12
-        
-        # Répartition par status (depuis analyse)
-        risks_by_status = {"CERTAIN": 0, "UNCERTAIN": 0, "CRITICAL": 0}
-        amount_by_status = {"CERTAIN": 0.0, "UNCERTAIN": 0.0, "CRITICAL": 0.0}
-        
-        if state.agent and state.agent.current_analysis:
-            for risk in state.agent.current_analysis.risks:
-                status = risk.status.value.upper()
-                risks_by_status[status] = risks_by_status.get(status, 0) + 1
-                amount_by_status[status] = amount_by_status.get(status, 0) + risk.amount
-        
-        # Top clients à risque
-        top_risky_clients = []
-        if state.agent and state.agent.current_analysis:
-            # Grouper risques par client
-            client_risks = {}
-            for risk in state.agent.current_analysis.risks:
-                if risk.client not in client_risks:
-                    client_risks[risk.client] = {
-                        "client_name": risk.client,
-                        "total_amount": 0,
-                        "max_days_overdue": 0,
-                        "risk_count": 0,
-                        "max_score": 0,
-                        "status": "CERTAIN"
-                    }
-                client_risks[risk.client]["total_amount"] += risk.amount
-                client_risks[risk.client]["max_days_overdue"] = max(
-                    client_risks[risk.client]["max_days_overdue"], 
-                    risk.days_overdue
-                )
-                client_risks[risk.client]["risk_count"] += 1
-                client_risks[risk.client]["max_score"] = max(
-                    client_risks[risk.client]["max_score"],
-                    risk.score
-                )
-                if risk.status.value.upper() in ["CRITICAL", "UNCERTAIN"]:
-                    client_risks[risk.client]["status"] = risk.status.value.upper()
-            
-            # Trier par score max
-            top_risky_clients = sorted(
-                client_risks.values(),
-                key=lambda x: x["max_score"],
-                reverse=True
-            )[:5]
-        
-        # Alertes actives
-        active_warnings = []
-        if state.agent and state.agent.current_analysis:
-            for risk in state.agent.current_analysis.risks:
-                if risk.status.value.upper() in ["CRITICAL", "UNCERTAIN"]:
-                    active_warnings.append({
-                        "id": risk.id,
-                        "client": risk.client,
-                        "type": risk.type,
-                        "severity": "critical" if risk.status.value == "critical" else "high",
-                        "amount": risk.amount,
-                        "days_overdue": risk.days_overdue,
-                        "message": risk.justification
-                    })
-        
-        # Actions pending
-        pending_actions = []
-        if state.agent and state.agent.current_analysis:
-            for action in state.agent.current_analysis.actions:
-                if action.validation_status == "pending":
-                    pending_actions.append({
-                        "id": action.id,
-                        "priority": action.priority.name,
-                        "title": action.title,
-                        "deadline": action.deadline,
-                        "impact_amount": action.impact_amount
-                    })
-        
-        # DSO moyen
-        dso_moyen = float(pending['days_overdue'].mean()) if not pending.empty else 0
-        
+        results = simulator.simulate_batch(invoice.model_dump() for invoice in request.invoices)
         return {
-            "total_pending": total_pending,
-            "total_overdue": total_overdue,
-            "runway_weeks": runway_weeks,
-            "risks_by_status": risks_by_status,
-            "amount_by_status": amount_by_status,
-            "top_risky_clients": top_risky_clients,
-            "active_warnings": active_warnings[:10],  # Max 10
-            "pending_actions": pending_actions,
-            "dso_moyen": round(dso_moyen, 1),
-            "nb_clients": int(df['client_name'].nunique()),
-            "nb_factures_pending": len(pending),
-            "last_analysis": state.agent.current_analysis.id if state.agent and state.agent.current_analysis else None,
-            "agent_running": state.agent.running if state.agent else False
+            "results": [SimulationResult(**result, is_demo=True) for result in results],
+            "count": len(results)
         }
         
-    except HTTPException:
-        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur simulation: {str(e)}")
+
+
+@app.get("/dashboard")
+async def get_dashboard_data(request: Request):
+    """
+    Données agrégées pour le dashboard frontend.
+    Tout ce dont le frontend a besoin en un seul appel.
+    
+    Vue matérialisée (recalculée en fin d'analyse ou si les factures
+    changent) servie avec ETag : If-None-Match identique -> 304.
+    """
+    try:
+        view = state.dashboard.current()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur dashboard: {str(e)}")
+    
+    if view is None:
+        raise HTTPException(status_code=404, detail="Aucune donnée chargée")
+    
+    etag, body = view
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/agent/start", response_model=StartResponse)
@@ -1230,7 +912,8 @@ async def get_agent_status():
         mode=status["mode"],
         version=get_version_info()["current"],
         last_decision=status["last_decision"],
-        current_analysis_summary=analysis_summary
+        current_analysis_summary=analysis_summary,
+        stress_cache=status["stress_cache"]
     )
 
 
@@ -1438,7 +1121,8 @@ async def get_statistics():
         stats["agent"] = {
             "running": state.agent.running,
             "mode": state.agent.mode.value,
-            "thresholds": state.agent.thresholds
+            "thresholds": state.agent.thresholds,
+            "stress_cache": state.agent.stress_tester.cache_stats()
         }
     
     return stats
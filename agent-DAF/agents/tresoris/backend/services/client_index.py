@@ -0,0 +1,173 @@
+"""
+TRESORIS - Index clients
+━━━━━━━━━━━━━━━━━━━━━━━━
+
+client_name / client_id -> positions des factures dans le snapshot,
+pattern de paiement, score et risques de l'analyse courante. Construit
+une fois par snapshot (snapshot.derived) : GET /client/{id} devient une
+recherche au lieu d'un ClientPaymentAnalyzer sur tout le portefeuille.
+Pattern et score sont calculés au premier accès à chaque client, sur ses
+seules factures ; les risques sont regroupés une fois par analyse.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from engine.client_scoring import ClientRiskScore, ClientRiskScorer
+from engine.payment_patterns import ClientPaymentAnalyzer, ClientPaymentPattern
+from services.invoice_snapshot import InvoiceSnapshot
+
+
+class ClientIndex:
+    """Index des clients d'un snapshot factures"""
+
+    def __init__(self, snapshot: InvoiceSnapshot, scorer: Optional[ClientRiskScorer] = None):
+        """
+        Args:
+            snapshot: Snapshot factures indexé (non modifié)
+        """
+        self.snapshot = snapshot
+        self.scorer = scorer or ClientRiskScorer()
+        invoices = snapshot.invoices
+
+        # Positions des lignes par nom puis par id
+        self._by_name: Dict[str, np.ndarray] = invoices.groupby('client_name', sort=False).indices
+        self._by_id: Dict[str, np.ndarray] = (
+            invoices.groupby('client_id', sort=False).indices if 'client_id' in invoices.columns else {}
+        )
+        self.total_pending = float(snapshot.pending['amount'].sum())
+
+        self._lock = threading.Lock()
+        self._patterns: Dict[str, Optional[ClientPaymentPattern]] = {}
+        self._scores: Dict[str, Optional[ClientRiskScore]] = {}
+        self._risks_key: Optional[tuple] = None
+        self._risks: Dict[str, List] = {}
+
+    def positions(self, key: str) -> Optional[np.ndarray]:
+        """Positions des factures du client (recherche par nom, puis par id)"""
+        positions = self._by_name.get(key)
+        if positions is None:
+            positions = self._by_id.get(key)
+        return positions
+
+    def invoices(self, key: str) -> Optional[pd.DataFrame]:
+        """Factures du client (vue du snapshot, ne pas modifier)"""
+        positions = self.positions(key)
+        if positions is None:
+            return None
+        return self.snapshot.invoices.iloc[positions]
+
+    @staticmethod
+    def _client_id(client_data: pd.DataFrame) -> str:
+        """client_id des factures (client_name si colonne absente)"""
+        column = 'client_id' if 'client_id' in client_data.columns else 'client_name'
+        return client_data[column].iloc[0]
+
+    def pattern(self, client_id: str, client_data: pd.DataFrame) -> Optional[ClientPaymentPattern]:
+        """Pattern de paiement calculé sur les seules factures du client"""
+        with self._lock:
+            if client_id not in self._patterns:
+                try:
+                    analyzer = ClientPaymentAnalyzer(client_data.copy())
+                    self._patterns[client_id] = analyzer.analyze_client(client_id)
+                except ValueError:
+                    # Aucune facture payée
+                    self._patterns[client_id] = None
+            return self._patterns[client_id]
+
+    def score(self, key: str) -> Optional[ClientRiskScore]:
+        """Score risque du client (None sans historique de paiement)"""
+        client_data = self.invoices(key)
+        if client_data is None:
+            return None
+        with self._lock:
+            if key in self._scores:
+                return self._scores[key]
+
+        pattern = self.pattern(self._client_id(client_data), client_data)
+        score = None
+        if pattern:
+            client_pending = client_data[client_data['status'] != 'paid']['amount'].sum()
+            score = self.scorer.calculate_risk_score(
+                pattern=pattern,
+                pending_amount=float(client_pending),
+                total_portfolio=self.total_pending if self.total_pending > 0 else 1
+            )
+        with self._lock:
+            self._scores[key] = score
+        return score
+
+    def risks(self, client_name: str, analysis=None) -> List:
+        """Risques de l'analyse courante pour ce client (regroupés une fois par analysis)"""
+        key = (analysis.id, id(analysis)) if analysis is not None else None
+        with self._lock:
+            if key != self._risks_key:
+                grouped: Dict[str, List] = {}
+                for risk in (analysis.risks if analysis is not None else []):
+                    grouped.setdefault(risk.client, []).append(risk)
+                self._risks = grouped
+                self._risks_key = key
+            return self._risks.get(client_name, [])
+
+    def details(self, key: str, analysis=None) -> Optional[Dict]:
+        """
+        Détails complets d'un client (payload GET /client/{id}).
+
+        Returns:
+            None si le client est inconnu
+        """
+        client_data = self.invoices(key)
+        if client_data is None:
+            return None
+
+        client_name = client_data['client_name'].iloc[0]
+        pattern = self.pattern(self._client_id(client_data), client_data)
+        score = self.score(key)
+
+        status = client_data['status']
+        pending_data = client_data[status != 'paid']
+
+        warnings = [
+            {
+                "type": risk.type,
+                "status": risk.status.value,
+                "amount": risk.amount,
+                "days_overdue": risk.days_overdue,
+                "score": risk.score,
+                "justification": risk.justification
+            }
+            for risk in self.risks(client_name, analysis)
+        ]
+
+        return {
+            "client_id": key,
+            "client_name": client_name,
+            "pattern": {
+                "avg_delay_days": pattern.avg_delay_days,
+                "on_time_rate": pattern.on_time_rate,
+                "trend": pattern.trend,
+                "reliability_score": pattern.reliability_score,
+                "risk_level": pattern.risk_level
+            } if pattern else None,
+            "scoring": {
+                "rating": score.rating,
+                "risk_score": score.risk_score,
+                "explanation": score.explanation,
+                "risk_factors": score.risk_factors,
+                "positive_factors": score.positive_factors,
+                "confidence": score.confidence
+            } if score else None,
+            "invoices": {
+                "total": len(client_data),
+                "pending": len(pending_data),
+                "paid": int((status == 'paid').sum()),
+                "total_amount": float(client_data['amount'].sum()),
+                "pending_amount": float(pending_data['amount'].sum()),
+                "overdue_amount": float(client_data[client_data['days_overdue'] > 0]['amount'].sum())
+            },
+            "warnings": warnings,
+            "pending_invoices": pending_data.to_dict(orient='records')
+        }
@@ -0,0 +1,207 @@
+"""
+TRESORIS - Vue dashboard matérialisée
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Le payload de GET /dashboard est recalculé une seule fois par état
+(snapshot factures, analyse courante, validations d'actions, agent
+démarré/arrêté) puis servi tel quel, sérialisé, avec un ETag : les
+clients qui interrogent en boucle reçoivent un 304 tant que rien ne
+change, quelle que soit la taille du portefeuille.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from services.invoice_snapshot import InvoiceSnapshot, InvoiceSnapshotStore
+
+
+# Événements agent qui modifient le contenu du dashboard
+REFRESH_EVENTS = {"analysis_completed", "action_validated"}
+
+
+def build_dashboard(snapshot: InvoiceSnapshot, analysis=None, agent_running: bool = False) -> Dict:
+    """
+    Payload dashboard en un seul passage sur les risques.
+
+    Args:
+        snapshot: Snapshot factures courant
+        analysis: AnalysisResult courant (None si aucune analyse)
+        agent_running: Agent autonome démarré
+    """
+    df = snapshot.invoices
+    pending = snapshot.pending
+    overdue = pending[pending['days_overdue'] > 0]
+
+    # Position cash
+    total_pending = float(pending['amount'].sum()) if not pending.empty else 0
+    total_overdue = float(overdue['amount'].sum()) if not overdue.empty else 0
+
+    # Runway (approximation)
+    avg_monthly = total_pending / 3 if total_pending > 0 else 1
+    runway_weeks = round(total_pending / avg_monthly * 4, 1) if avg_monthly > 0 else 12
+
+    risks_by_status = {"CERTAIN": 0, "UNCERTAIN": 0, "CRITICAL": 0}
+    amount_by_status = {"CERTAIN": 0.0, "UNCERTAIN": 0.0, "CRITICAL": 0.0}
+    client_risks = {}
+    active_warnings = []
+    pending_actions = []
+
+    if analysis is not None:
+        for risk in analysis.risks:
+            # Répartition par status
+            status = risk.status.value.upper()
+            risks_by_status[status] = risks_by_status.get(status, 0) + 1
+            amount_by_status[status] = amount_by_status.get(status, 0) + risk.amount
+
+            # Risques groupés par client
+            client = client_risks.get(risk.client)
+            if client is None:
+                client = client_risks[risk.client] = {
+                    "client_name": risk.client,
+                    "total_amount": 0,
+                    "max_days_overdue": 0,
+                    "risk_count": 0,
+                    "max_score": 0,
+                    "status": "CERTAIN"
+                }
+            client["total_amount"] += risk.amount
+            client["max_days_overdue"] = max(client["max_days_overdue"], risk.days_overdue)
+            client["risk_count"] += 1
+            client["max_score"] = max(client["max_score"], risk.score)
+
+            # Alertes actives (max 10)
+            if status in ("CRITICAL", "UNCERTAIN"):
+                client["status"] = status
+                if len(active_warnings) < 10:
+                    active_warnings.append({
+                        "id": risk.id,
+                        "client": risk.client,
+                        "type": risk.type,
+                        "severity": "critical" if status == "CRITICAL" else "high",
+                        "amount": risk.amount,
+                        "days_overdue": risk.days_overdue,
+                        "message": risk.justification
+                    })
+
+        # Actions pending
+        for action in analysis.actions:
+            if action.validation_status == "pending":
+                pending_actions.append({
+                    "id": action.id,
+                    "priority": action.priority.name,
+                    "title": action.title,
+                    "deadline": action.deadline,
+                    "impact_amount": action.impact_amount
+                })
+
+    # Top clients à risque (tri par score max)
+    top_risky_clients = sorted(client_risks.values(), key=lambda x: x["max_score"], reverse=True)[:5]
+
+    # DSO moyen
+    dso_moyen = float(pending['days_overdue'].mean()) if not pending.empty else 0
+
+    return {
+        "total_pending": total_pending,
+        "total_overdue": total_overdue,
+        "runway_weeks": runway_weeks,
+        "risks_by_status": risks_by_status,
+        "amount_by_status": amount_by_status,
+        "top_risky_clients": top_risky_clients,
+        "active_warnings": active_warnings,
+        "pending_actions": pending_actions,
+        "dso_moyen": round(dso_moyen, 1),
+        "nb_clients": int(df['client_name'].nunique()),
+        "nb_factures_pending": len(pending),
+        "last_analysis": analysis.id if analysis is not None else None,
+        "agent_running": agent_running
+    }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match désigne cet ETag (ou '*')"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate == etag:
+            return True
+    return False
+
+
+def _json_default(obj):
+    """Types numpy/pandas restants dans le payload"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
+
+
+class DashboardView:
+    """
+    Payload dashboard mémorisé avec son ETag.
+
+    Recalculé quand le snapshot factures change (version ou jour), quand
+    une analyse se termine ou qu'une action est validée (refresh() via
+    callback agent), ou quand l'agent démarre/s'arrête. Sinon current()
+    ne fait qu'un os.stat du fichier factures.
+    """
+
+    def __init__(self, store: InvoiceSnapshotStore, agent=None):
+        """
+        Args:
+            store: Snapshot factures partagé
+            agent: RiskRequalificationAgent (analyse courante, état running)
+        """
+        self.store = store
+        self.agent = agent
+        self._lock = threading.Lock()
+        self._revision = 0
+        self._key: Optional[tuple] = None
+        self._view: Optional[Tuple[str, bytes]] = None
+        self.build_count = 0
+
+    def on_agent_event(self, event: Dict):
+        """Callback agent : recalcul en fin d'analyse ou après validation"""
+        if event.get("type") in REFRESH_EVENTS:
+            self.refresh()
+
+    def refresh(self) -> Optional[Tuple[str, bytes]]:
+        """Invalide la vue et la recalcule immédiatement"""
+        with self._lock:
+            self._revision += 1
+        return self.current()
+
+    def current(self) -> Optional[Tuple[str, bytes]]:
+        """(ETag, corps JSON) à jour ; None si aucune facture chargée"""
+        snapshot = self.store.get()
+        if snapshot is None:
+            return None
+
+        analysis = self.agent.current_analysis if self.agent else None
+        running = bool(self.agent.running) if self.agent else False
+
+        with self._lock:
+            key = (
+                snapshot.version,
+                snapshot.as_of,
+                analysis.id if analysis is not None else None,
+                id(analysis),
+                running,
+                self._revision
+            )
+            if key != self._key:
+                payload = build_dashboard(snapshot, analysis, running)
+                body = json.dumps(payload, default=_json_default, ensure_ascii=False).encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                self._view = (etag, body)
+                self._key = key
+                self.build_count += 1
+            return self._view
+
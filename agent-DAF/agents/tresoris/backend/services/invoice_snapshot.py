@@ -0,0 +1,159 @@
+"""
+TRESORIS - Snapshot partagé des factures clients
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Un seul parsing de data/customer_invoices.csv par version du fichier :
+les endpoints de main.py et l'agent lisent le même DataFrame typé (dates
+parsées, days_overdue, factures en attente) au lieu de relire le CSV à
+chaque requête. Les valeurs dérivées (agrégats, index) sont mémorisées
+sur le snapshot et disparaissent avec lui.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+
+DATE_COLUMNS = ['invoice_date', 'due_date', 'payment_date']
+
+
+@dataclass
+class InvoiceSnapshot:
+    """
+    Factures d'une version du fichier, déjà typées.
+
+    Partagé entre requêtes : invoices et pending ne doivent pas être
+    modifiés en place (copy() avant toute mutation).
+    """
+    version: str                   # Hash MD5 du contenu du fichier
+    as_of: date                    # Jour de calcul de days_overdue
+    invoices: pd.DataFrame         # Toutes les factures
+    pending: pd.DataFrame          # Factures status != 'paid'
+    loaded_at: datetime = field(default_factory=datetime.now)
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def derived(self, name: str, build: Callable[["InvoiceSnapshot"], Any]) -> Any:
+        """Valeur calculée une seule fois pour ce snapshot (agrégat, index...)"""
+        if name not in self._derived:
+            self._derived[name] = build(self)
+        return self._derived[name]
+
+
+class InvoiceSnapshotStore:
+    """
+    Snapshot courant du fichier factures.
+
+    Détection de changement en couches : os.stat (mtime_ns, taille) à
+    chaque accès, hash du contenu par blocs seulement si le stat change,
+    parsing seulement si le hash change. replace() écrit un nouveau
+    fichier (temporaire + os.replace) et bascule le snapshot d'un bloc.
+    """
+
+    # Taille des blocs lus pour le hash du fichier
+    HASH_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Chemin du CSV factures (data/customer_invoices.csv)
+        """
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._stat: Optional[tuple] = None
+        self._hash: Optional[str] = None
+        self._raw: Optional[pd.DataFrame] = None
+        self._raw_hash: Optional[str] = None
+        self._snapshot: Optional[InvoiceSnapshot] = None
+        self.parse_count = 0
+
+    def version(self) -> Optional[str]:
+        """Hash du contenu actuel du fichier (None si absent)"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return None
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature != self._stat or self._hash is None:
+                self._hash = self._hash_file()
+                self._stat = signature
+            return self._hash
+
+    def get(self) -> Optional[InvoiceSnapshot]:
+        """Snapshot à jour (re-parsé seulement si le contenu a changé)"""
+        with self._lock:
+            version = self.version()
+            if version is None:
+                return None
+
+            today = date.today()
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version and snapshot.as_of == today:
+                return snapshot
+
+            # Nouveau jour, même fichier : days_overdue recalculé, sans re-parsing
+            new_day = snapshot is not None and snapshot.version == version
+            if self._raw is None or self._raw_hash != version:
+                self._raw = pd.read_csv(self.path)
+                self._raw_hash = version
+                self.parse_count += 1
+            self._snapshot = self._build(self._raw, version, today, recompute_overdue=new_day)
+            return self._snapshot
+
+    def replace(self, invoices: pd.DataFrame) -> InvoiceSnapshot:
+        """
+        Remplace le fichier factures et bascule le snapshot.
+
+        Écriture dans un fichier temporaire puis os.replace : un lecteur
+        voit l'ancien ou le nouveau fichier, jamais un fichier partiel.
+        """
+        with self._lock:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            invoices.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, self.path)
+            return self.get()
+
+    def _build(
+        self,
+        raw: pd.DataFrame,
+        version: str,
+        as_of: date,
+        recompute_overdue: bool = False
+    ) -> InvoiceSnapshot:
+        """
+        Types et colonnes dérivées à partir du CSV parsé.
+
+        Args:
+            recompute_overdue: Recalculer days_overdue au jour as_of même si
+                le CSV contient la colonne (valeur figée à l'écriture)
+        """
+        invoices = raw.copy()
+        for column in DATE_COLUMNS:
+            if column in invoices.columns:
+                invoices[column] = pd.to_datetime(invoices[column], errors='coerce')
+
+        # Calculer days_overdue si pas présent (ou périmé)
+        if 'due_date' in invoices.columns and (recompute_overdue or 'days_overdue' not in invoices.columns):
+            invoices['days_overdue'] = (pd.Timestamp(as_of) - invoices['due_date']).dt.days
+            invoices['days_overdue'] = invoices['days_overdue'].clip(lower=0).fillna(0).astype(int)
+
+        if 'status' in invoices.columns:
+            pending = invoices[invoices['status'] != 'paid']
+        else:
+            pending = invoices
+
+        return InvoiceSnapshot(version=version, as_of=as_of, invoices=invoices, pending=pending)
+
+    def _hash_file(self) -> str:
+        """MD5 du fichier, lu par blocs (mémoire constante)"""
+        digest = hashlib.md5()
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour services/client_index.py
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.risk_agent import RiskStatus
+from engine.client_scoring import ClientRiskScorer
+from engine.payment_patterns import ClientPaymentAnalyzer
+from services.client_index import ClientIndex
+from services.invoice_snapshot import InvoiceSnapshotStore
+from tests.test_payment_patterns import _make_invoices
+
+
+def _risk(client: str, amount: float):
+    return SimpleNamespace(
+        client=client, type="retard", status=RiskStatus.CRITICAL, amount=amount,
+        days_overdue=45, score=80, justification="test"
+    )
+
+
+class TestClientIndex:
+    """Tests index clients"""
+
+    def test_details_match_full_portfolio_analysis(self, tmp_path):
+        """Pattern/score sur les factures du client = analyzer sur tout le portefeuille"""
+        path = tmp_path / "customer_invoices.csv"
+        _make_invoices(n_clients=25, n_invoices=2000, seed=8).to_csv(path, index=False)
+        snapshot = InvoiceSnapshotStore(path).get()
+        index = ClientIndex(snapshot)
+
+        analyzer = ClientPaymentAnalyzer(snapshot.invoices.copy())
+        pending = snapshot.pending
+        for client_id in ["C0", "C11", "C24"]:
+            pattern = analyzer.analyze_client(client_id)
+            score = ClientRiskScorer().calculate_risk_score(
+                pattern,
+                float(pending.loc[pending["client_id"] == client_id, "amount"].sum()),
+                float(pending["amount"].sum())
+            )
+            details = index.details(client_id)
+            assert details == index.details(pattern.client_name) | {"client_id": client_id}
+            assert details["pattern"]["avg_delay_days"] == pytest.approx(pattern.avg_delay_days)
+            assert details["pattern"]["trend"] == pattern.trend
+            assert details["scoring"]["risk_score"] == score.risk_score
+            assert details["scoring"]["explanation"] == score.explanation
+            assert details["invoices"]["total"] == (snapshot.invoices["client_id"] == client_id).sum()
+
+        assert index.details("INCONNU") is None
+
+    def test_risks_follow_current_analysis(self, tmp_path):
+        """Risques regroupés par analyse ; nouvelle analyse -> regroupement refait"""
+        path = tmp_path / "customer_invoices.csv"
+        _make_invoices(n_clients=5, n_invoices=200).to_csv(path, index=False)
+        index = ClientIndex(InvoiceSnapshotStore(path).get())
+
+        first = SimpleNamespace(id="A1", risks=[_risk("Client 1", 10.0), _risk("Client 2", 20.0)])
+        second = SimpleNamespace(id="A2", risks=[_risk("Client 1", 30.0), _risk("Client 1", 40.0)])
+
+        assert [w["amount"] for w in index.details("C1", first)["warnings"]] == [10.0]
+        assert [w["amount"] for w in index.details("C1", second)["warnings"]] == [30.0, 40.0]
+        assert index.details("C2", second)["warnings"] == []
+        assert index.details("C2")["warnings"] == []
@@ -0,0 +1,81 @@
+"""
+Tests unitaires pour client_scoring.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.client_scoring import ClientRiskScorer
+from engine.payment_patterns import ClientPaymentPattern
+
+
+def _make_clients(n_clients: int = 300, seed: int = 0):
+    """Patterns variés, seuils de pénalité inclus"""
+    rng = np.random.default_rng(seed)
+    clients = []
+    for i in range(n_clients):
+        pattern = ClientPaymentPattern(
+            client_id=f"C{i}",
+            client_name=f"Client {i}",
+            avg_delay_days=float(rng.normal(10, 10)),
+            std_delay_days=float(abs(rng.normal(12, 10))),
+            median_delay_days=5.0,
+            on_time_rate=float(rng.random()),
+            late_rate=float(rng.choice([0.3, 0.35, 0.4, rng.random()])),
+            very_late_rate=float(rng.choice([0.0, 0.1, 0.15, 0.2, rng.random() * 0.3])),
+            trend=str(rng.choice(["stable", "improving", "worsening"])),
+            trend_slope=float(rng.normal(0, 4)),
+            has_partial_payments=bool(rng.random() < 0.2),
+            partial_payment_count=1,
+            reliability_score=float(rng.uniform(0, 100)),
+            risk_level="medium",
+            total_invoices=int(rng.integers(0, 30)),
+            analysis_period_months=int(rng.integers(0, 12)),
+            last_payment_date=None
+        )
+        clients.append({"pattern": pattern, "pending_amount": float(rng.uniform(0, 1e5))})
+    # Client concentrant plus de 50% de l'encours
+    clients[7]["pending_amount"] = 1e8
+    return clients
+
+
+def _comparable(score):
+    values = dict(vars(score))
+    values.pop("calculated_at")
+    return values
+
+
+class TestScorePortfolio:
+    """Tests scoring portefeuille en colonnes"""
+
+    def test_vectorized_matches_per_client(self):
+        """score_table + explain_scores = calculate_risk_score par client"""
+        clients = _make_clients()
+        scorer = ClientRiskScorer()
+
+        expected = scorer.score_portfolio(clients, vectorized=False)
+        result = scorer.score_portfolio(clients)
+
+        assert [_comparable(s) for s in result] == [_comparable(s) for s in expected]
+
+    def test_explanations_only_for_requested_rows(self):
+        """Table sans textes ; explications à la demande, patterns reconstruits"""
+        clients = _make_clients()
+        scorer = ClientRiskScorer()
+        expected = scorer.score_portfolio(clients, vectorized=False)
+
+        features = scorer.portfolio_features(clients).drop(columns="pattern")
+        table = scorer.score_table(features)
+        assert "explanation" not in table.columns
+        assert table["risk_score"].round(2).is_monotonic_decreasing
+        assert table["client_id"].tolist() == [s.client_id for s in expected]
+
+        top = scorer.explain_scores(table, range(5))
+        assert [_comparable(s) for s in top] == [_comparable(s) for s in expected[:5]]
+        assert scorer.score_table([]).empty
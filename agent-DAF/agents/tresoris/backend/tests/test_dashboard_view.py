@@ -0,0 +1,110 @@
+"""
+Tests unitaires pour services/dashboard_view.py
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.memory_v2 import TresorisMemory
+from agent.risk_agent import Action, ActionPriority, AnalysisResult, RiskRequalificationAgent
+from services.dashboard_view import DashboardView, build_dashboard, etag_matches
+from tests.test_payment_patterns import _make_invoices
+
+
+def _agent_with_analysis(tmp_path: Path) -> RiskRequalificationAgent:
+    """Agent avec une analyse courante (risques réels, deux actions)"""
+    rng = np.random.default_rng(4)
+    invoices = _make_invoices(n_clients=30, n_invoices=1500, seed=4)
+    invoices["due_date"] = pd.Timestamp.now().normalize() - pd.to_timedelta(
+        rng.integers(-60, 150, len(invoices)), "D"
+    )
+    invoices["amount"] *= rng.choice([1, 5, 20], len(invoices))
+    invoices.to_csv(tmp_path / "customer_invoices.csv", index=False)
+    agent = RiskRequalificationAgent(tmp_path, TresorisMemory(tmp_path / "memory"))
+    risks = asyncio.run(agent.requalify_risks())
+    actions = [
+        Action(
+            id=f"ACT{i}", risk_id=risks[i].id, priority=ActionPriority.P1, title="Relance",
+            description="", justification="", impact_amount=risks[i].amount, deadline="Immédiat"
+        )
+        for i in range(2)
+    ]
+    agent.current_analysis = AnalysisResult(
+        id="ANALYSIS_1", timestamp=datetime.now(), trigger_reason="test",
+        risks=risks, actions=actions, crisis_note="", summary={}
+    )
+    return agent
+
+
+class TestBuildDashboard:
+    """Tests agrégats dashboard"""
+
+    def test_single_pass_aggregates(self, tmp_path):
+        """Comptes, top clients et alertes = filtres directs sur les risques"""
+        agent = _agent_with_analysis(tmp_path)
+        risks = agent.current_analysis.risks
+        payload = build_dashboard(agent.invoice_store.get(), agent.current_analysis)
+
+        for status in ("certain", "uncertain", "critical"):
+            selected = [r for r in risks if r.status.value == status]
+            assert payload["risks_by_status"][status.upper()] == len(selected)
+            assert payload["amount_by_status"][status.upper()] == pytest.approx(sum(r.amount for r in selected))
+
+        alerts = [r.id for r in risks if r.status.value != "certain"][:10]
+        assert [w["id"] for w in payload["active_warnings"]] == alerts
+
+        top = payload["top_risky_clients"]
+        assert len(top) == 5
+        assert top[0]["max_score"] == max(r.score for r in risks)
+        client = [r for r in risks if r.client == top[0]["client_name"]]
+        assert top[0]["risk_count"] == len(client)
+        assert top[0]["total_amount"] == pytest.approx(sum(r.amount for r in client))
+        assert len(payload["pending_actions"]) == 2
+
+
+class TestDashboardView:
+    """Tests vue matérialisée + ETag"""
+
+    def test_recomputed_only_on_change(self, tmp_path):
+        """Même ETag sans changement ; recalcul sur validation ou nouveau fichier"""
+        agent = _agent_with_analysis(tmp_path)
+        view = DashboardView(agent.invoice_store, agent)
+
+        etag, body = view.current()
+        assert view.current() == (etag, body)
+        assert view.build_count == 1
+        assert json.loads(body)["last_analysis"] == "ANALYSIS_1"
+
+        # Événement sans impact : pas de recalcul
+        view.on_agent_event({"type": "step_started"})
+        assert view.current()[0] == etag and view.build_count == 1
+
+        # Action validée : recalcul immédiat, nouvel ETag
+        agent.current_analysis.actions[0].validation_status = "approved"
+        view.on_agent_event({"type": "action_validated"})
+        assert view.build_count == 2
+        etag_validated, body = view.current()
+        assert etag_validated != etag
+        assert len(json.loads(body)["pending_actions"]) == 1
+
+        # Nouveau fichier factures
+        _make_invoices(n_clients=5, n_invoices=40).to_csv(tmp_path / "customer_invoices.csv", index=False)
+        assert json.loads(view.current()[1])["nb_clients"] == 5
+        assert view.build_count == 3
+
+    def test_etag_matches(self):
+        """If-None-Match : liste, préfixe faible, joker"""
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches('*', '"b"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"b"')
@@ -2,8 +2,18 @@
 Tests unitaires pour early_warning.py
 """
 
+import sys
+from pathlib import Path
+
 import pytest
-from datetime import datetime
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.early_warning import EarlyWarningDetector
+from engine.payment_patterns import ClientPaymentAnalyzer
 
 # TODO: Importer après implémentation
 # from backend.engine.early_warning import EarlyWarningDetector, EarlyWarning
@@ -46,3 +56,75 @@ class TestEarlyWarning:
 
 
 # TODO: Ajouter plus de tests
+
+
+
+def _worsening_history(client_id: str, step_days: int, n: int = 20) -> list:
+    """Historique payé avec retards croissants de step_days par facture"""
+    base_date = datetime(2025, 1, 1)
+    return [
+        {
+            'client_id': client_id,
+            'client_name': f'Client {client_id}',
+            'invoice_id': f'{client_id}_{i}',
+            'due_date': base_date + timedelta(days=i * 15),
+            'payment_date': base_date + timedelta(days=i * 15 + 5 + i * step_days),
+            'amount': 10000,
+            'amount_paid': 10000 if i % 4 else 6000,
+            'status': 'paid'
+        }
+        for i in range(n)
+    ]
+
+
+class TestWarningScan:
+    """Tests scan complet du portefeuille"""
+
+    def test_one_analysis_per_client(self, monkeypatch):
+        """Les 5 détecteurs partagent un seul pattern par client"""
+        history = pd.DataFrame(
+            _worsening_history('A', 3) + _worsening_history('B', 0) + _worsening_history('C', 2)
+        )
+        analyzer = ClientPaymentAnalyzer(history)
+        calls = []
+        original = analyzer._calculate_reliability_score
+        monkeypatch.setattr(
+            analyzer, '_calculate_reliability_score',
+            lambda data: calls.append(data) or original(data)
+        )
+
+        pending = pd.DataFrame([
+            {'client_id': client_id, 'client_name': f'Client {client_id}', 'amount': amount}
+            for client_id, amount in (('A', 50000), ('B', 10000), ('C', 10000))
+        ])
+        warnings = EarlyWarningDetector(analyzer).detect_all_warnings(pending)
+
+        assert len(calls) == 3
+        assert {'progressive_delay', 'partial_payments', 'concentration_risk'} <= {
+            w.warning_type for w in warnings
+        }
+
+    def test_vectorized_scan_matches_loop(self):
+        """Règles en colonnes = détecteurs client par client"""
+        history = pd.DataFrame(
+            _worsening_history('A', 3) + _worsening_history('B', 0) + _worsening_history('C', 2)
+        )
+        analyzer = ClientPaymentAnalyzer(history)
+        pending = pd.DataFrame([
+            {'client_id': client_id, 'client_name': f'Client {client_id}', 'amount': amount}
+            for client_id, amount in (('A', 20000), ('B', 35000), ('C', 10000), ('NOUVEAU', 5000))
+        ])
+        detector = EarlyWarningDetector(analyzer)
+
+        def comparable(warnings):
+            return [
+                (w.client_id, w.warning_type, w.severity, w.probability, w.message)
+                for w in warnings
+            ]
+
+        vectorized = detector.detect_all_warnings(pending)
+        assert comparable(vectorized) == comparable(detector.detect_all_warnings(pending, vectorized=False))
+
+        features = detector.warning_features(pending, pending['amount'].sum())
+        assert not features.loc['NOUVEAU', 'has_history']
+        assert features.loc['B', 'concentration'] == pytest.approx(35000 / 70000)
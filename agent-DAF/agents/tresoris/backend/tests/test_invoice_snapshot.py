@@ -0,0 +1,91 @@
+"""
+Tests unitaires pour services/invoice_snapshot.py
+"""
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.invoice_snapshot import InvoiceSnapshotStore
+
+
+def _write_invoices(path: Path, n_invoices: int = 6):
+    pd.DataFrame({
+        "invoice_id": [f"F{i}" for i in range(n_invoices)],
+        "client_id": [f"C{i % 2}" for i in range(n_invoices)],
+        "client_name": [f"Client {i % 2}" for i in range(n_invoices)],
+        "due_date": ["2025-01-10"] * n_invoices,
+        "amount": [1000.0 * (i + 1) for i in range(n_invoices)],
+        "status": ["paid" if i % 3 == 0 else "pending" for i in range(n_invoices)],
+    }).to_csv(path, index=False)
+
+
+class TestInvoiceSnapshotStore:
+    """Tests snapshot partagé des factures"""
+
+    def test_snapshot_reused_until_content_changes(self, tmp_path):
+        """Même objet tant que le fichier ne change pas ; colonnes typées"""
+        path = tmp_path / "customer_invoices.csv"
+        _write_invoices(path)
+        store = InvoiceSnapshotStore(path)
+
+        snapshot = store.get()
+        assert store.get() is snapshot
+        assert store.parse_count == 1
+        assert pd.api.types.is_datetime64_any_dtype(snapshot.invoices["due_date"])
+        assert (snapshot.invoices["days_overdue"] > 0).all()
+        assert len(snapshot.pending) == 4
+        assert snapshot.derived("total", lambda s: s.pending["amount"].sum()) == 16000.0
+        assert snapshot.derived("total", lambda s: 0) == 16000.0
+
+        _write_invoices(path, n_invoices=9)
+        refreshed = store.get()
+        assert refreshed is not snapshot
+        assert len(refreshed.invoices) == 9
+        assert store.parse_count == 2
+
+    def test_new_day_recomputes_without_parsing(self, tmp_path):
+        """days_overdue du CSV recalculé au changement de jour, sans relire le CSV"""
+        path = tmp_path / "customer_invoices.csv"
+        _write_invoices(path)
+        invoices = pd.read_csv(path)
+        invoices["days_overdue"] = 0
+        invoices.to_csv(path, index=False)
+        store = InvoiceSnapshotStore(path)
+        snapshot = store.get()
+        assert (snapshot.invoices["days_overdue"] == 0).all()
+
+        snapshot.as_of = date.today() - timedelta(days=1)
+        refreshed = store.get()
+        assert refreshed is not snapshot
+        assert store.parse_count == 1
+        expected = (pd.Timestamp(date.today()) - pd.Timestamp("2025-01-10")).days
+        assert (refreshed.invoices["days_overdue"] == expected).all()
+
+    def test_replace_swaps_snapshot(self, tmp_path):
+        """replace() écrit le fichier (sans .tmp résiduel) et bascule le snapshot"""
+        path = tmp_path / "customer_invoices.csv"
+        _write_invoices(path)
+        store = InvoiceSnapshotStore(path)
+        before = store.get()
+
+        invoices = before.invoices.copy()
+        invoices.loc[0, "amount"] = 99.0
+        after = store.replace(invoices)
+
+        assert after is not before and after.version != before.version
+        assert after.invoices.loc[0, "amount"] == 99.0
+        assert before.invoices.loc[0, "amount"] == 1000.0
+        assert pd.read_csv(path).loc[0, "amount"] == 99.0
+        assert not (tmp_path / "customer_invoices.csv.tmp").exists()
+
+    def test_missing_file(self, tmp_path):
+        store = InvoiceSnapshotStore(tmp_path / "absent.csv")
+        assert store.get() is None
+        assert store.version() is None
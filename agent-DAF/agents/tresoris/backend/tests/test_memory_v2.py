@@ -0,0 +1,110 @@
+"""
+Tests unitaires pour memory_v2.py (stockage JSON Lines)
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.memory_v2 import AppendOnlyLog, TresorisMemory
+
+
+def _analysis(i: int):
+    return {
+        "id": f"ANALYSIS_{i}",
+        "timestamp": f"2026-01-{i + 1:02d}T10:00:00",
+        "risks": [],
+        "actions": [{"id": f"ACT_{i}_A"}, {"id": f"ACT_{i}_B"}]
+    }
+
+
+def _lines(path: Path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+class TestAppendOnlyStorage:
+    """Tests journal en ajout seul"""
+
+    def test_legacy_json_migrated_then_appended(self, tmp_path):
+        """Anciens .json relus ; chaque écriture = une ligne ajoutée"""
+        legacy = [dict(_analysis(i), validation_status="pending") for i in range(3)]
+        (tmp_path / "analyses.json").write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+        (tmp_path / "audit_trail.json").write_text(json.dumps([{"id": "AUDIT_0"}]), encoding="utf-8")
+
+        memory = TresorisMemory(tmp_path)
+        assert memory.analyses == legacy
+        assert len(_lines(tmp_path / "analyses.jsonl")) == 3
+
+        memory.save_analysis(_analysis(3))
+        memory.save_daf_decision("ANALYSIS_3", "ACT_3_A", "approved")
+        memory.close()
+
+        # Analyse, puis patch validation_status ; audit : 1 migré + 2 événements
+        assert len(_lines(tmp_path / "analyses.jsonl")) == 5
+        assert len(_lines(tmp_path / "audit_trail.jsonl")) == 3
+        assert len(_lines(tmp_path / "daf_decisions.jsonl")) == 1
+
+        reloaded = TresorisMemory(tmp_path)
+        assert reloaded.analyses == memory.analyses
+        assert reloaded.analyses[-1]["validation_status"] == "partial"
+        assert reloaded.audit_trail == memory.audit_trail
+        assert reloaded.decisions == memory.decisions
+
+    def test_patches_compacted_and_torn_line_ignored(self, tmp_path, monkeypatch):
+        """Compaction quand les patchs dépassent la table ; ligne incomplète ignorée"""
+        monkeypatch.setattr(AppendOnlyLog, "COMPACT_MIN_PATCHES", 4)
+        path = tmp_path / "table.jsonl"
+        log = AppendOnlyLog(path)
+        for i in range(3):
+            log.append({"id": i, "value": 0})
+        for step in range(3):
+            log.update(1, {"value": step + 1})
+        assert len(_lines(path)) == 6
+        log.update(2, {"value": 9})
+        assert len(_lines(path)) == 3
+        log.close()
+
+        # Crash pendant l'écriture d'une ligne
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"id": 3, "val')
+        log = AppendOnlyLog(path)
+        assert log.records == [{"id": 0, "value": 0}, {"id": 1, "value": 3}, {"id": 2, "value": 9}]
+        log.append({"id": 3, "value": 0})
+        log.close()
+        assert len(AppendOnlyLog(path).records) == 4
+
+    def test_corrupt_middle_line_skipped(self, tmp_path):
+        """Ligne illisible au milieu : ignorée, les suivantes et les ajouts sont relus"""
+        path = tmp_path / "table.jsonl"
+        path.write_bytes(b'{"id": 1}\n{"id": 2, \xff\n[1, 2]\n{"id": 3}\n{"id": 4}\n')
+
+        log = AppendOnlyLog(path)
+        assert [r["id"] for r in log.records] == [1, 3, 4]
+        log.append({"id": 5})
+        log.close()
+        assert [r["id"] for r in AppendOnlyLog(path).records] == [1, 3, 4, 5]
+
+        log = AppendOnlyLog(path)
+        log.compact()
+        assert [r["id"] for r in AppendOnlyLog(path).records] == [1, 3, 4, 5]
+
+    def test_fsync_batched(self, tmp_path, monkeypatch):
+        """fsync tous les FSYNC_BATCH ajouts, puis à la fermeture"""
+        synced = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+        monkeypatch.setattr(AppendOnlyLog, "FSYNC_BATCH", 4)
+        monkeypatch.setattr(AppendOnlyLog, "FSYNC_INTERVAL", 3600)
+
+        log = AppendOnlyLog(tmp_path / "audit.jsonl")
+        for i in range(10):
+            log.append({"id": i})
+        assert len(synced) == 2
+        log.close()
+        assert len(synced) == 3
@@ -2,10 +2,19 @@
 Tests unitaires pour payment_patterns.py
 """
 
+import sys
+from pathlib import Path
+
+import numpy as np
 import pytest
 import pandas as pd
 from datetime import datetime, timedelta
 
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.payment_patterns import ClientPaymentAnalyzer
+
 # TODO: Importer après implémentation
 # from backend.engine.payment_patterns import ClientPaymentAnalyzer, ClientPaymentPattern
 
@@ -53,3 +62,190 @@ class TestPaymentPatterns:
 
 
 # TODO: Ajouter plus de tests après implémentation
+
+
+def _make_invoices(n_clients: int = 40, n_invoices: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """Portefeuille synthétique : retards bruités, dérive par client, partiels"""
+    rng = np.random.default_rng(seed)
+    clients = rng.integers(0, n_clients, n_invoices)
+    due = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 540, n_invoices), "D")
+    drift = rng.normal(0, 0.05, n_clients)[clients] * (due - pd.Timestamp("2024-01-01")).days
+    delay = np.round(rng.normal(10, 15, n_invoices) + drift).astype(int)
+    amount = rng.integers(1000, 50000, n_invoices).astype(float)
+    df = pd.DataFrame({
+        "client_id": [f"C{i}" for i in clients],
+        "client_name": [f"Client {i}" for i in clients],
+        "invoice_id": [f"INV{i}" for i in range(n_invoices)],
+        "due_date": due,
+        "payment_date": due + pd.to_timedelta(delay, "D"),
+        "amount": amount,
+        "amount_paid": np.where(rng.random(n_invoices) < 0.05, amount * 0.6, amount),
+        "status": np.where(rng.random(n_invoices) < 0.85, "paid", "pending")
+    })
+    df.loc[df["status"] == "pending", "payment_date"] = pd.NaT
+    return df
+
+
+def _polyfit_trend(client_invoices: pd.DataFrame) -> tuple:
+    """Référence par client : np.polyfit sur les délais moyens mensuels"""
+    if len(client_invoices) < 6:
+        return "stable", 0.0
+    monthly = client_invoices.groupby(client_invoices["payment_date"].dt.to_period("M"))["delay_days"].mean()
+    if len(monthly) < 3:
+        return "stable", 0.0
+    slope = float(np.polyfit(np.arange(len(monthly)), monthly.to_numpy(dtype=float), 1)[0])
+    return ("worsening" if slope > 3 else "improving" if slope < -3 else "stable"), slope
+
+
+class TestClientStatsTable:
+    """Tests table de statistiques par client"""
+
+    def test_stats_match_per_client_filtering(self):
+        """Chaque ligne = calcul direct sur les factures du client"""
+        analyzer = ClientPaymentAnalyzer(_make_invoices())
+        paid = analyzer.paid_invoices
+
+        for client_id, row in analyzer.client_stats.iterrows():
+            invoices = paid[paid["client_id"] == client_id]
+            delays = invoices["delay_days"]
+            assert row["total_invoices"] == len(invoices)
+            assert row["avg_delay_days"] == pytest.approx(delays.mean())
+            assert row["std_delay_days"] == pytest.approx(delays.std() if len(delays) > 1 else 0.0)
+            assert row["median_delay_days"] == pytest.approx(delays.median())
+            assert row["late_rate"] == pytest.approx(((delays > 0) & (delays <= 60)).mean())
+            assert row["partial_payment_count"] == (
+                (invoices["amount_paid"] < invoices["amount"]) & (invoices["amount_paid"] > 0)
+            ).sum()
+            assert row["last_payment_date"] == invoices["payment_date"].max()
+
+    def test_analyze_client_reads_table(self):
+        """analyze_client = lecture de la table ; client inconnu -> ValueError"""
+        analyzer = ClientPaymentAnalyzer(_make_invoices())
+        client_id = analyzer.client_stats.index[0]
+        pattern = analyzer.analyze_client(client_id)
+
+        assert pattern.total_invoices == analyzer.client_stats.loc[client_id, "total_invoices"]
+        assert pattern.has_partial_payments == (pattern.partial_payment_count > 0)
+        assert len(analyzer.get_all_clients_summary()) == len(analyzer.client_stats)
+        with pytest.raises(ValueError):
+            analyzer.analyze_client("INCONNU")
+
+    def test_vectorized_trends_match_per_client_fit(self):
+        """Pentes en forme fermée = np.polyfit client par client"""
+        df = _make_invoices(n_clients=60, n_invoices=1500)
+        # Client à retards strictement croissants (pente entière, cas limite)
+        due = pd.date_range("2024-01-05", periods=8, freq="MS")
+        df = pd.concat([df, pd.DataFrame({
+            "client_id": "CROISSANT",
+            "client_name": "Client Croissant",
+            "invoice_id": [f"CR{i}" for i in range(8)],
+            "due_date": due,
+            "payment_date": due + pd.to_timedelta([3 * i for i in range(8)], "D"),
+            "amount": 1000.0,
+            "amount_paid": 1000.0,
+            "status": "paid"
+        })], ignore_index=True)
+        analyzer = ClientPaymentAnalyzer(df)
+        paid = analyzer.paid_invoices
+
+        for client_id, row in analyzer.client_stats.iterrows():
+            trend, slope = _polyfit_trend(paid[paid["client_id"] == client_id])
+            assert row["trend"] == trend
+            assert row["trend_slope"] == pytest.approx(slope, abs=1e-9)
+        assert analyzer.client_stats.loc["CROISSANT", "trend_slope"] == pytest.approx(3.0)
+
+
+class TestPatternCache:
+    """Tests cache des patterns clients"""
+
+    def test_patterns_cached_until_reload(self):
+        """Même objet tant que les factures ne changent pas"""
+        df = _make_invoices()
+        analyzer = ClientPaymentAnalyzer(df)
+        patterns = analyzer.analyze_all()
+
+        assert list(patterns) == list(analyzer.client_stats.index)
+        client_id = next(iter(patterns))
+        assert analyzer.analyze_client(client_id) is patterns[client_id]
+
+        # Modification sur place puis rechargement : cache invalidé
+        df.loc[df["client_id"] == client_id, "payment_date"] += pd.Timedelta(days=90)
+        analyzer.reload()
+        refreshed = analyzer.analyze_client(client_id)
+        assert refreshed is not patterns[client_id]
+        assert refreshed.avg_delay_days == pytest.approx(patterns[client_id].avg_delay_days + 90)
+
+
+class TestIncrementalUpdates:
+    """Tests upsert_invoices / mark_paid"""
+
+    @staticmethod
+    def _assert_same_stats(incremental: ClientPaymentAnalyzer, invoices: pd.DataFrame):
+        rebuilt = ClientPaymentAnalyzer(invoices.copy()).client_stats
+        stats = incremental.client_stats
+        assert sorted(stats.index) == sorted(rebuilt.index)
+        stats = stats.loc[rebuilt.index]
+        assert stats.dtypes.to_dict() == rebuilt.dtypes.to_dict()
+        for column in rebuilt.columns:
+            if rebuilt[column].dtype.kind in "fi":
+                np.testing.assert_allclose(
+                    stats[column].astype(float), rebuilt[column].astype(float), atol=1e-7
+                )
+            else:
+                assert stats[column].tolist() == rebuilt[column].tolist()
+
+    def test_deltas_match_full_rebuild(self):
+        """Modifications, ajouts, nouveau client, paiements = reconstruction"""
+        invoices = _make_invoices(n_clients=30, n_invoices=1500)
+        analyzer = ClientPaymentAnalyzer(invoices.copy())
+        analyzer.analyze_all()
+
+        # Retards modifiés + factures repassées en attente
+        changed = invoices.sample(40, random_state=1).copy()
+        changed["payment_date"] = changed["due_date"] + pd.Timedelta(days=75)
+        changed["status"] = np.where(np.arange(40) % 4, "paid", "pending")
+        changed.loc[changed["status"] == "pending", "payment_date"] = pd.NaT
+        # Nouvelles factures, dont un nouveau client
+        added = _make_invoices(n_clients=3, n_invoices=12, seed=7)
+        added["invoice_id"] = [f"NEW{i}" for i in range(12)]
+        added.loc[:5, ["client_id", "client_name"]] = ["C_NEW", "Nouveau client"]
+        analyzer.upsert_invoices(pd.concat([changed, added]))
+
+        invoices = invoices.set_index("invoice_id")
+        invoices.loc[changed["invoice_id"]] = changed.set_index("invoice_id")[invoices.columns]
+        invoices = pd.concat([invoices, added.set_index("invoice_id")]).reset_index()
+        self._assert_same_stats(analyzer, invoices)
+        assert analyzer.analyze_client("C_NEW").client_name == "Nouveau client"
+        assert type(analyzer.analyze_client("C_NEW").analysis_period_months) is int
+
+        # Encaissement de factures en attente
+        pending_ids = invoices.loc[invoices["status"] == "pending", "invoice_id"].tolist()[:15]
+        analyzer.mark_paid(pending_ids, "2025-07-01")
+        invoices = invoices.set_index("invoice_id")
+        invoices.loc[pending_ids, ["payment_date", "status"]] = [pd.Timestamp("2025-07-01"), "paid"]
+        self._assert_same_stats(analyzer, invoices.reset_index())
+
+        with pytest.raises(ValueError):
+            analyzer.mark_paid(["INCONNUE"], "2025-07-01")
+
+
+class TestDegradationScan:
+    """Tests détection de dégradation sur tout le portefeuille"""
+
+    @pytest.mark.parametrize("threshold_days", [0, 10])
+    def test_matches_per_client_detection(self, threshold_days):
+        """Même résultat que detect_degradation client par client"""
+        analyzer = ClientPaymentAnalyzer(_make_invoices(n_clients=40, n_invoices=4000, seed=3))
+        expected = [
+            degradation
+            for client_id in analyzer.client_stats.index
+            if (degradation := analyzer.detect_degradation(client_id, threshold_days))
+        ]
+        found = analyzer.detect_degradation_all(threshold_days)
+
+        assert expected
+        assert [d["client_id"] for d in found] == [d["client_id"] for d in expected]
+        for got, ref in zip(found, expected):
+            assert got["severity"] == ref["severity"]
+            assert got["degradation_days"] == pytest.approx(ref["degradation_days"])
+            assert got["recent_avg"] == pytest.approx(ref["recent_avg"])
@@ -0,0 +1,105 @@
+"""
+Tests unitaires pour risk_agent.py (requalification des risques)
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.memory_v2 import TresorisMemory
+from agent.risk_agent import RiskRequalificationAgent, RiskStatus
+from tests.test_payment_patterns import _make_invoices
+
+
+def _agent(data_path: Path, storage_path: Path) -> RiskRequalificationAgent:
+    return RiskRequalificationAgent(data_path, TresorisMemory(storage_path))
+
+
+def _comparable(risks):
+    return [{k: v for k, v in risk.to_dict().items() if k != "created_at"} for risk in risks]
+
+
+class TestRequalifyRisks:
+    """Tests requalification en colonnes"""
+
+    def test_vectorized_matches_per_invoice(self, tmp_path):
+        """np.select sur toutes les factures = règles V2 facture par facture"""
+        n_invoices = 8000
+        rng = np.random.default_rng(2)
+        invoices = _make_invoices(n_clients=150, n_invoices=n_invoices, seed=2)
+        invoices["due_date"] = pd.Timestamp.now().normalize() - pd.to_timedelta(
+            rng.integers(-120, 120, n_invoices), "D"
+        )
+        invoices["amount"] *= rng.choice([1, 5, 20], n_invoices)
+        # Moitié des clients ponctuels (ratings A/B, pas de warnings)
+        punctual = (invoices["client_id"].str[1:].astype(int) < 75) & (invoices["status"] == "paid")
+        invoices.loc[punctual, "payment_date"] = invoices.loc[punctual, "due_date"]
+        invoices.loc[punctual, "amount_paid"] = invoices.loc[punctual, "amount"]
+        invoices.to_csv(tmp_path / "customer_invoices.csv", index=False)
+        agent = _agent(tmp_path, tmp_path / "memory")
+
+        expected = asyncio.run(agent.requalify_risks(vectorized=False))
+        risks = asyncio.run(agent.requalify_risks())
+
+        assert len({risk.status for risk in risks}) == 3
+        assert _comparable(risks) == _comparable(expected)
+
+    def test_sample_data(self, tmp_path):
+        """Données de démo : factures >= amount_min, triées par score"""
+        data_path = Path(__file__).parent.parent / "data"
+        invoices = pd.read_csv(data_path / "customer_invoices.csv")
+        agent = _agent(data_path, tmp_path)
+
+        risks = asyncio.run(agent.requalify_risks())
+
+        pending = invoices[invoices["status"] != "paid"]
+        assert len(risks) == (pending["amount"] >= agent.thresholds["amount_min"]).sum()
+        assert [r.score for r in risks] == sorted((r.score for r in risks), reverse=True)
+        assert all(r.status == RiskStatus.CRITICAL for r in risks if r.days_overdue > 90)
+
+
+class TestChangeDetection:
+    """Tests détection de changement du fichier factures"""
+
+    def test_stat_then_hash(self, tmp_path, monkeypatch):
+        """stat inchangé : ni hash ni parsing ; fichier touché : hash sans parsing"""
+        path = tmp_path / "customer_invoices.csv"
+        _make_invoices(n_clients=5, n_invoices=50).to_csv(path, index=False)
+        agent = _agent(tmp_path, tmp_path / "memory")
+        store = agent.invoice_store
+
+        hashes = []
+        hash_file = store._hash_file
+        monkeypatch.setattr(store, "_hash_file", lambda: hashes.append(1) or hash_file())
+
+        assert agent._has_data_changed()
+        invoices = agent._load_invoices()
+        assert not agent._has_data_changed()
+        assert len(hashes) == 1 and store.parse_count == 1
+
+        # Copie à chaque chargement : le snapshot n'est pas modifié
+        invoices["amount"] = 0
+        assert agent._load_invoices()["amount"].sum() > 0
+        assert store.parse_count == 1
+
+        # Date de modification changée, contenu identique
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert not agent._has_data_changed()
+        agent._load_invoices()
+        assert len(hashes) == 2 and store.parse_count == 1
+
+        # Contenu modifié
+        _make_invoices(n_clients=5, n_invoices=60).to_csv(path, index=False)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        assert agent._has_data_changed()
+        assert len(agent._load_invoices()) == 60
+        assert len(hashes) == 3 and store.parse_count == 2
@@ -2,9 +2,21 @@
 Tests unitaires pour smart_forecast.py
 """
 
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 import pytest
 from datetime import datetime, timedelta
 
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.payment_patterns import ClientPaymentAnalyzer
+from engine.smart_forecast import SmartForecaster
+from tests.test_payment_patterns import _make_invoices
+
 # TODO: Importer après implémentation
 # from backend.engine.smart_forecast import SmartForecaster, SmartForecast
 
@@ -48,3 +60,146 @@ class TestSmartForecast:
 
 
 # TODO: Ajouter plus de tests
+
+
+def _pending_portfolio(seed: int = 4):
+    """Historique synthétique + factures en attente sur ~12 semaines"""
+    invoices = _make_invoices(n_clients=40, n_invoices=3000, seed=seed)
+    pending = invoices[invoices["status"] == "pending"].copy()
+    rng = np.random.default_rng(seed)
+    pending["due_date"] = pd.Timestamp("2025-06-01") + pd.to_timedelta(rng.integers(0, 80, len(pending)), "D")
+    # Client sans historique -> pattern par défaut
+    pending.loc[pending.index[:5], "client_id"] = "SANS_HISTORIQUE"
+    return ClientPaymentAnalyzer(invoices), pending
+
+
+class TestPortfolioForecast:
+    """Tests prévision portefeuille vectorisée"""
+
+    def test_vectorized_matches_per_invoice(self):
+        """Agrégation en colonnes = forecast_invoice facture par facture"""
+        analyzer, pending = _pending_portfolio()
+        forecaster = SmartForecaster(analyzer)
+        records = pending.to_dict("records")
+        for record in records[:20]:
+            record["due_date"] = record["due_date"].isoformat()
+        reference_date = datetime(2025, 6, 3, 10, 17, 3)
+
+        expected = forecaster.forecast_portfolio(records, vectorized=False, reference_date=reference_date)
+        result = forecaster.forecast_portfolio(records, reference_date=reference_date)
+
+        assert result["total_invoices"] == len(records)
+        assert result == expected
+
+    def test_forecast_frame_matches_forecast_invoice(self):
+        """Une ligne par facture valide, mêmes dates et probabilités"""
+        analyzer, pending = _pending_portfolio()
+        forecaster = SmartForecaster(analyzer)
+        pending.loc[pending.index[-1], "due_date"] = pd.NaT
+        frame = forecaster.forecast_frame(pending)
+
+        assert len(frame) == len(pending) - 1
+        for record, (_, row) in zip(pending.to_dict("records")[:50], frame.iterrows()):
+            forecast = forecaster.forecast_invoice(record)
+            assert row["expected_payment_date"] == forecast.expected_payment_date
+            assert row["expected_amount"] == pytest.approx(forecast.expected_amount)
+            assert row["probability_default"] == pytest.approx(forecast.probability_default)
+            assert row["confidence_score"] == pytest.approx(forecast.confidence_score)
+
+
+class TestPortfolioSimulation:
+    """Tests simulation des encaissements"""
+
+    def test_bands_reproducible_and_ordered(self):
+        """Même graine = même résultat ; P10 <= P50 <= P90"""
+        analyzer, pending = _pending_portfolio()
+        forecaster = SmartForecaster(analyzer)
+        reference_date = datetime(2025, 6, 1)
+        result = forecaster.simulate_portfolio(pending, n_simulations=500, seed=3, reference_date=reference_date)
+
+        assert result == forecaster.simulate_portfolio(
+            pending, n_simulations=500, seed=3, reference_date=reference_date
+        )
+        assert len(result["weekly_forecasts"]) == 13
+        for week in result["weekly_forecasts"] + [result["total"]]:
+            assert 0 <= week["p10"] <= week["p50"] <= week["p90"]
+        assert result["total"]["mean"] <= pending["amount"].sum()
+
+    def test_batches_do_not_change_distribution(self):
+        """Lots de tirages bornés : mêmes bandes qu'un lot unique (à l'erreur Monte Carlo près)"""
+        analyzer, pending = _pending_portfolio()
+        kwargs = dict(n_simulations=4000, seed=0, reference_date=datetime(2025, 6, 1))
+        single = SmartForecaster(analyzer).simulate_portfolio(pending, **kwargs)
+        forecaster = SmartForecaster(analyzer)
+        forecaster.SIMULATION_BATCH_ELEMENTS = 50 * len(pending)
+        batched = forecaster.simulate_portfolio(pending, **kwargs)
+
+        for key in ("p10", "p50", "p90", "mean"):
+            assert batched["total"][key] == pytest.approx(single["total"][key], rel=0.01)
+        for got, ref in zip(batched["weekly_forecasts"], single["weekly_forecasts"]):
+            assert got["p50"] == pytest.approx(ref["p50"], rel=0.05)
+
+    def test_threshold_probability_matches_default_rate(self):
+        """Retard certain : semaine sous le seuil <=> défaut de paiement"""
+        due = pd.date_range("2024-01-01", periods=10, freq="MS")
+        history = pd.DataFrame({
+            "client_id": "C1",
+            "client_name": "Client 1",
+            "invoice_id": [f"H{i}" for i in range(10)],
+            "due_date": due,
+            "payment_date": due + pd.Timedelta(days=3),
+            "amount": 1000.0,
+            "amount_paid": 1000.0,
+            "status": "paid"
+        })
+        forecaster = SmartForecaster(ClientPaymentAnalyzer(history))
+        pending = [{
+            "invoice_id": "P1", "client_id": "C1", "client_name": "Client 1",
+            "due_date": datetime(2025, 6, 2), "amount": 50000.0
+        }]
+        result = forecaster.simulate_portfolio(
+            pending, n_simulations=20000, seed=1, reference_date=datetime(2025, 6, 1)
+        )
+        probability_default = forecaster.forecast_frame(pending)["probability_default"].iloc[0]
+
+        week = result["weekly_forecasts"][0]
+        assert week["probability_below_threshold"] == pytest.approx(probability_default, abs=0.01)
+        assert week["p50"] == pytest.approx(50000.0, rel=1e-3)
+        assert all(w["p90"] == 0 for w in result["weekly_forecasts"][1:])
+        with pytest.raises(ValueError):
+            forecaster.simulate_portfolio(pending, distribution="uniforme")
+
+    def test_paid_invoice_without_payment_date(self):
+        """Retard NaN exclu du pool empirique ; client sans retard valide ignoré"""
+        due = pd.date_range("2024-01-01", periods=11, freq="MS")
+        history = pd.DataFrame({
+            "client_id": ["C1"] * 10 + ["C2"],
+            "client_name": ["Client 1"] * 10 + ["Client 2"],
+            "invoice_id": [f"H{i}" for i in range(11)],
+            "due_date": due,
+            "payment_date": due + pd.Timedelta(days=3),
+            "amount": 1000.0,
+            "amount_paid": 1000.0,
+            "status": "paid"
+        })
+        history.loc[[9, 10], "payment_date"] = pd.NaT
+        forecaster = SmartForecaster(ClientPaymentAnalyzer(history))
+        pending = [
+            {"invoice_id": "P1", "client_id": "C1", "client_name": "Client 1",
+             "due_date": datetime(2025, 6, 2), "amount": 50000.0},
+            {"invoice_id": "P2", "client_id": "C2", "client_name": "Client 2",
+             "due_date": datetime(2025, 6, 2), "amount": 20000.0}
+        ]
+        result = forecaster.simulate_portfolio(
+            pending, n_simulations=2000, seed=1, reference_date=datetime(2025, 6, 1)
+        )
+
+        assert result["weekly_forecasts"][0]["p50"] == pytest.approx(50000.0, rel=1e-3)
+        assert result["total"]["p90"] <= 50000.0 * (1 + 1e-3)
+
+        # Date attendue inconnue : NaT, hors des semaines de forecast_portfolio
+        frame = forecaster.forecast_frame(pending).set_index("invoice_id")
+        assert pd.isna(frame.at["P2", "expected_payment_date"])
+        assert frame.at["P1", "expected_payment_date"] == pd.Timestamp("2025-06-05")
+        weekly = forecaster.forecast_portfolio(pending, horizon_weeks=4, reference_date=datetime(2025, 6, 1))
+        assert sum(w["invoice_count"] for w in weekly["weekly_forecasts"]) == 1
@@ -0,0 +1,412 @@
+"""
+Tests unitaires pour stress_tester.py
+"""
+
+import sys
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy import stats
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.stress_tester import StressTester
+
+
+BASE_INPUTS = dict(
+    current_cash=250000,
+    monthly_revenues=100000,
+    monthly_costs=110000,
+    revenue_volatility=0.18,
+    cost_volatility=0.08
+)
+
+
+class TestMonteCarlo:
+    """Tests simulation Monte Carlo vectorisée"""
+
+    def test_result_shape(self):
+        """Le résultat garde tous les champs attendus"""
+        result = StressTester(random_seed=42).run_full_stress_test(**BASE_INPUTS)
+        mc = result.monte_carlo
+
+        assert mc.n_simulations == StressTester.N_SIMULATIONS
+        assert mc.cash_min <= mc.cash_p5 <= mc.cash_median <= mc.cash_p95 <= mc.cash_max
+        assert 0 <= mc.prob_severe_stress <= mc.prob_under_safety <= 1
+        assert mc.cvar_95 >= mc.var_95
+        assert mc.runway_p5 <= mc.runway_p95
+
+        assert len(mc.sample_paths) == 10
+        assert all(len(p["path"]) == StressTester.HORIZON_MONTHS + 1 for p in mc.sample_paths)
+        finals = [p["final_cash"] for p in mc.sample_paths]
+        assert finals == sorted(finals)
+
+        assert set(mc.to_dict()) == {
+            "n_simulations", "cash_distribution", "probabilities", "sampling",
+            "runway_months", "value_at_risk", "factor_attribution", "sample_paths"
+        }
+
+    def test_custom_simulation_count(self):
+        """n_simulations surcharge la valeur par défaut"""
+        result = StressTester().run_full_stress_test(**BASE_INPUTS, n_simulations=200000)
+        assert result.monte_carlo.n_simulations == 200000
+
+    def test_mean_matches_analytic_expectation(self):
+        """Les chocs log-normaux sont de moyenne 1 : E[cash final] analytique"""
+        result = StressTester().run_full_stress_test(**BASE_INPUTS, n_simulations=200000)
+        expected = BASE_INPUTS["current_cash"] + 12 * (
+            BASE_INPUTS["monthly_revenues"] - BASE_INPUTS["monthly_costs"]
+        )
+        mc = result.monte_carlo
+        assert abs(mc.cash_mean - expected) < 4 * mc.cash_std / np.sqrt(mc.n_simulations)
+
+
+class TestReproducibility:
+    """Tests générateur par instance"""
+
+    def test_same_seed_same_result(self):
+        """Même graine -> résultats identiques, même après d'autres tirages globaux"""
+        a = StressTester(random_seed=7).run_full_stress_test(**BASE_INPUTS)
+        np.random.seed(0)
+        np.random.normal(size=1000)
+        b = StressTester(random_seed=7).run_full_stress_test(**BASE_INPUTS)
+        assert a.monte_carlo.to_dict() == b.monte_carlo.to_dict()
+
+    def test_does_not_touch_global_state(self):
+        """L'instance ne réinitialise pas np.random"""
+        np.random.seed(123)
+        expected = np.random.random()
+        np.random.seed(123)
+        StressTester(random_seed=42).run_full_stress_test(**BASE_INPUTS)
+        assert np.random.random() == expected
+
+    def test_block_streams_are_deterministic(self):
+        """Le flux d'un bloc ne dépend que de (graine, index)"""
+        tester = StressTester(random_seed=42)
+        streams = tester.spawn_streams(4)
+        again = StressTester(random_seed=42).spawn_streams(2, start=2)
+        assert np.array_equal(streams[2].random(5), again[0].random(5))
+        assert np.array_equal(streams[3].random(5), again[1].random(5))
+        assert not np.array_equal(streams[0].random(5), streams[1].random(5))
+
+
+class TestProcessPool:
+    """Tests Monte Carlo multi-processus"""
+
+    def test_identical_whatever_worker_count(self):
+        """À chunk_size fixé, le résultat ne dépend pas du nombre de workers"""
+        kwargs = dict(**BASE_INPUTS, n_simulations=120000, chunk_size=50000)
+        a = StressTester(random_seed=3).run_full_stress_test(**kwargs, n_workers=2)
+        b = StressTester(random_seed=3).run_full_stress_test(**kwargs, n_workers=3)
+        assert a.monte_carlo.to_dict() == b.monte_carlo.to_dict()
+        assert a.monte_carlo.cvar_95 == b.monte_carlo.cvar_95
+
+    def test_pool_reused_until_shutdown(self):
+        """Un pool "spawn" par n_workers, réutilisé d'un appel à l'autre"""
+        tester = StressTester(random_seed=3)
+        try:
+            tester.run_full_stress_test(**BASE_INPUTS, n_simulations=20000, n_workers=2)
+            pool = tester._process_pool(2)
+            assert pool._mp_context.get_start_method() == "spawn"
+            tester.clear_cache()
+            tester.run_full_stress_test(**BASE_INPUTS, n_simulations=20000, n_workers=2)
+            assert tester._process_pool(2) is pool
+        finally:
+            tester.shutdown()
+        assert tester._pools == {}
+
+    def test_matches_serial_statistics(self):
+        """Les statistiques fusionnées correspondent au calcul en mémoire"""
+        kwargs = dict(**BASE_INPUTS, n_simulations=120000)
+        serial = StressTester(random_seed=3).run_full_stress_test(**kwargs).monte_carlo
+        pooled = StressTester(random_seed=3).run_full_stress_test(**kwargs, n_workers=2).monte_carlo
+
+        assert pooled.n_simulations == serial.n_simulations
+        assert pooled.prob_negative_cash == serial.prob_negative_cash
+        assert pooled.prob_under_safety == serial.prob_under_safety
+        assert pooled.cash_min == serial.cash_min
+        assert pooled.cash_max == serial.cash_max
+        assert pooled.cash_mean == pytest.approx(serial.cash_mean)
+        assert pooled.cash_std == pytest.approx(serial.cash_std)
+        tolerance = 0.01 * serial.cash_std
+        assert abs(pooled.cash_p5 - serial.cash_p5) < tolerance
+        assert abs(pooled.cash_median - serial.cash_median) < tolerance
+        assert abs(pooled.cvar_95 - serial.cvar_95) < tolerance
+        assert pooled.sample_paths == serial.sample_paths
+
+    def test_async_wrapper(self):
+        """run_full_stress_test_async renvoie le même résultat"""
+        import asyncio
+
+        tester = StressTester(random_seed=5)
+        result = asyncio.run(tester.run_full_stress_test_async(**BASE_INPUTS))
+        expected = StressTester(random_seed=5).run_full_stress_test(**BASE_INPUTS)
+        assert result.monte_carlo.to_dict() == expected.monte_carlo.to_dict()
+
+
+class TestStreamingAccumulator:
+    """Tests accumulateur Monte Carlo à mémoire constante"""
+
+    def _exact(self, tester, n):
+        """Cash finaux recalculés en mémoire sur les mêmes flux"""
+        from engine.stress_tester import _simulate_paths
+
+        return np.concatenate([
+            _simulate_paths(
+                np.random.default_rng(tester.block_seed(b)), size, 12,
+                BASE_INPUTS["current_cash"], BASE_INPUTS["monthly_revenues"],
+                BASE_INPUTS["monthly_costs"], BASE_INPUTS["revenue_volatility"],
+                BASE_INPUTS["cost_volatility"]
+            )[:, -1]
+            for b, size in tester._iter_blocks(n)
+        ])
+
+    @pytest.mark.parametrize("tail_buffer_max", [100000, 500])
+    def test_matches_exact_statistics(self, monkeypatch, tail_buffer_max):
+        """Percentiles et CVaR en flux ≈ calcul exact, buffer de queue borné ou non"""
+        import engine.stress_tester as stress_tester_module
+
+        monkeypatch.setattr(stress_tester_module, "TAIL_BUFFER_MAX", tail_buffer_max)
+        n = 150000
+        tester = StressTester(random_seed=11)
+        mc = tester.run_full_stress_test(**BASE_INPUTS, n_simulations=n).monte_carlo
+        final_cash = self._exact(tester, n)
+
+        tolerance = 0.005 * final_cash.std()
+        p5, median, p95 = np.percentile(final_cash, [5, 50, 95])
+        losses = BASE_INPUTS["current_cash"] - final_cash
+        var_95 = BASE_INPUTS["current_cash"] - p5
+
+        assert abs(mc.cash_p5 - p5) < tolerance
+        assert abs(mc.cash_median - median) < tolerance
+        assert abs(mc.cash_p95 - p95) < tolerance
+        assert abs(mc.cvar_95 - losses[losses >= var_95].mean()) < tolerance
+        assert mc.cash_mean == pytest.approx(final_cash.mean())
+        assert mc.cash_min == final_cash.min()
+        assert mc.prob_negative_cash == np.mean(final_cash < 0)
+
+
+class TestVarianceReduction:
+    """Tests stratégies de réduction de variance"""
+
+    @pytest.mark.parametrize("method", ["none", "antithetic", "control_variate", "sobol"])
+    def test_methods_agree(self, method):
+        """Toutes les stratégies estiment les mêmes probabilités"""
+        reference = StressTester(random_seed=1).run_full_stress_test(
+            **BASE_INPUTS, n_simulations=200000
+        ).monte_carlo
+        mc = StressTester(random_seed=2).run_full_stress_test(
+            **BASE_INPUTS, n_simulations=100000, variance_reduction=method
+        ).monte_carlo
+
+        assert mc.variance_reduction == method
+        assert mc.to_dict()["sampling"]["method"] == method
+        for name, prob in [
+            ("negative_cash", mc.prob_negative_cash),
+            ("under_safety", mc.prob_under_safety),
+            ("severe_stress", mc.prob_severe_stress),
+        ]:
+            assert 0 < mc.standard_errors[name] < 0.01
+            expected = getattr(reference, f"prob_{name}")
+            assert abs(prob - expected) < 5 * (mc.standard_errors[name] + reference.standard_errors[name])
+
+    def test_control_variate_reduces_error(self):
+        """La variable de contrôle réduit l'erreur standard sur les mêmes tirages"""
+        plain = StressTester(random_seed=4).run_full_stress_test(**BASE_INPUTS).monte_carlo
+        controlled = StressTester(random_seed=4).run_full_stress_test(
+            **BASE_INPUTS, variance_reduction="control_variate"
+        ).monte_carlo
+        for name in plain.standard_errors:
+            assert controlled.standard_errors[name] < plain.standard_errors[name]
+
+    def test_adaptive_stops_at_target(self):
+        """Le mode adaptatif s'arrête dès que la précision est atteinte"""
+        mc = StressTester(random_seed=4).run_full_stress_test(
+            **BASE_INPUTS, target_precision=0.003, variance_reduction="control_variate"
+        ).monte_carlo
+        assert mc.converged is True
+        assert mc.n_simulations < StressTester.MAX_ADAPTIVE_SIMULATIONS
+        assert max(mc.standard_errors.values()) * 1.96 <= 0.003
+
+    def test_unknown_method_rejected(self):
+        with pytest.raises(ValueError):
+            StressTester().run_full_stress_test(**BASE_INPUTS, variance_reduction="magic")
+
+
+class TestMultiFactor:
+    """Tests modèle multi-facteurs revenus / coûts / DSO"""
+
+    def test_effects_sum_to_cash_deviation(self):
+        """Les effets par facteur décomposent exactement le cash final"""
+        from engine.stress_tester import _factor_cholesky, _simulate_multi_factor_paths
+
+        paths, factors = _simulate_multi_factor_paths(
+            np.random.default_rng(0), 2000, 12,
+            BASE_INPUTS["current_cash"], BASE_INPUTS["monthly_revenues"],
+            BASE_INPUTS["monthly_costs"], BASE_INPUTS["revenue_volatility"],
+            BASE_INPUTS["cost_volatility"], dso_volatility_days=6, base_dso_days=45,
+            cholesky=_factor_cholesky({"revenue_dso": -0.4, "revenue_cost": 0.3})
+        )
+        expected = BASE_INPUTS["current_cash"] + 12 * (
+            BASE_INPUTS["monthly_revenues"] - BASE_INPUTS["monthly_costs"]
+        )
+        assert np.allclose(paths[:, -1] - expected, factors.sum(axis=1))
+
+    def test_dso_volatility_widens_distribution(self):
+        """Le facteur DSO ajoute du risque et apparaît dans l'attribution"""
+        calm = StressTester(random_seed=8).run_full_stress_test(
+            **BASE_INPUTS, n_simulations=50000, correlations={"revenue_cost": 0.0}
+        ).monte_carlo
+        stressed = StressTester(random_seed=8).run_full_stress_test(
+            **BASE_INPUTS, n_simulations=50000, dso_volatility_days=8
+        ).monte_carlo
+
+        assert calm.factor_attribution["dso"]["variance_share"] == 0
+        assert stressed.cash_std > calm.cash_std
+        assert stressed.prob_negative_cash > calm.prob_negative_cash
+        shares = [f["variance_share"] for f in stressed.factor_attribution.values()]
+        assert sum(shares) == pytest.approx(1, abs=0.01)
+        assert stressed.factor_attribution["dso"]["variance_share"] > 0.1
+
+    def test_single_factor_has_no_attribution(self):
+        mc = StressTester().run_full_stress_test(**BASE_INPUTS).monte_carlo
+        assert mc.factor_attribution is None
+
+    def test_invalid_correlation_rejected(self):
+        with pytest.raises(ValueError):
+            StressTester().run_full_stress_test(
+                **BASE_INPUTS,
+                correlations={"revenue_cost": 0.9, "revenue_dso": 0.9, "cost_dso": -0.9}
+            )
+
+
+class TestScenarioGrid:
+    """Tests évaluation de grilles de scénarios"""
+
+    def test_grid_matches_standard_scenarios(self):
+        """Chaque cellule de la grille = le scénario déterministe équivalent"""
+        tester = StressTester()
+        base = {k: BASE_INPUTS[k] for k in ("current_cash", "monthly_revenues", "monthly_costs")}
+        grid = tester.evaluate_scenario_grid(
+            **base,
+            revenue_changes=[-0.25, 0.0],
+            cost_changes=[0.0, 0.15],
+            dso_changes=[0, 45]
+        )
+        assert grid.cash_impact.shape == (2, 2, 2)
+        assert grid.n_scenarios == 8
+
+        storm = next(
+            s for s in tester._run_scenarios(**base) if s.scenario_id == "tempete_parfaite"
+        )
+        assert grid.cash_impact[0, 1, 1] == pytest.approx(storm.impact_on_cash)
+        assert grid.survival_probability[0, 1, 1] == pytest.approx(storm.survival_probability)
+        assert grid.cash_impact[1, 0, 0] == 0
+
+    def test_large_grid_serializes(self):
+        """Des milliers de scénarios, sérialisables pour les heatmaps"""
+        grid = StressTester().evaluate_scenario_grid(
+            250000, 120000, 100000,
+            revenue_changes=np.linspace(-0.5, 0.2, 36).tolist(),
+            cost_changes=np.linspace(-0.2, 0.4, 31).tolist(),
+            dso_changes=list(range(0, 91, 10))
+        )
+        payload = grid.to_dict()
+        assert payload["n_scenarios"] == 36 * 31 * 10
+        assert len(payload["cash_impact"]) == 36
+        assert len(payload["runway_months"][0]) == 31
+        # Runway infini (entreprise profitable) -> 999 pour le JSON
+        assert payload["runway_months"][-1][0][0] == 999
+
+
+class TestReverseStress:
+    """Tests surface de rupture du reverse stress test"""
+
+    def test_matches_linear_model(self):
+        """Modèle linéaire : ruptures mono-facteur et β analytiques"""
+        reverse = StressTester()._run_reverse_stress(
+            current_cash=250000,
+            monthly_revenues=100000,
+            monthly_costs=110000,
+            revenue_volatility=0.15,
+            cost_volatility=0.08,
+            dso_volatility_days=10
+        )
+        assert reverse.breaking_points == {
+            "revenue_drop": "-32%",
+            "cost_increase": "+29%",
+            "dso_increase": "+57 jours"
+        }
+        # β = cash de base / ||gradient × écarts-types||
+        gradient = np.array([600000 * 0.15, 660000 * 0.08, 100000 / 30 * 10 * np.sqrt(6)])
+        beta = 190000 / np.linalg.norm(gradient)
+        assert reverse.minimal_combined_shock["sigma"] == pytest.approx(beta, abs=0.01)
+        assert reverse.scenario_probability == pytest.approx(stats.norm.sf(beta), rel=0.02)
+
+        # Tous les points de la surface sont au seuil de rupture
+        points = reverse.breaking_surface[np.isfinite(reverse.breaking_sigma)]
+        cash = 250000 - points[:, 2] / 30 * 100000 - (110000 * (1 + points[:, 1]) - 100000 * (1 + points[:, 0])) * 6
+        assert np.abs(cash).max() < 1.0
+
+    def test_unbreakable_and_already_broken(self):
+        """Trésorerie massive : pas de rupture ; cash déjà négatif : β = 0"""
+        tester = StressTester()
+        safe = tester._run_reverse_stress(1e9, 100000, 90000)
+        assert safe.scenario_probability == 0
+        assert safe.minimal_combined_shock.keys() == {"revenue", "costs", "dso", "sigma", "description"}
+        assert safe.minimal_combined_shock["sigma"] is None
+        assert safe.to_dict()["breaking_surface"]["n_breaking"] == 0
+
+        broken = tester._run_reverse_stress(-1000, 100000, 100000)
+        assert broken.minimal_combined_shock["sigma"] == 0
+        assert broken.scenario_probability == pytest.approx(0.5)
+
+
+class TestResultCache:
+    """Tests cache LRU + TTL des résultats"""
+
+    def test_identical_inputs_hit_cache(self):
+        """Même entrée -> copie du résultat ; entrée différente -> recalcul"""
+        tester = StressTester(random_seed=7)
+        first = tester.run_full_stress_test(**BASE_INPUTS, n_simulations=2000)
+        expected = deepcopy(first.to_dict())
+        first.key_insights.append("modifié par l'appelant")
+        again = tester.run_full_stress_test(**BASE_INPUTS, n_simulations=2000, n_workers=1)
+        other = tester.run_full_stress_test(**BASE_INPUTS, n_simulations=3000)
+
+        assert again is not first
+        assert again.to_dict() == expected
+        assert other is not first
+        stats = tester.cache_stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+
+        # Une autre graine ne partage pas les résultats
+        fresh = StressTester(random_seed=8)
+        assert fresh.run_full_stress_test(**BASE_INPUTS, n_simulations=2000) is not first
+
+    def test_default_chunk_size_in_key(self):
+        """chunk_size par défaut dépend de n_workers : pas de partage entre eux"""
+        tester = StressTester(random_seed=7)
+        tester.run_full_stress_test(**BASE_INPUTS, n_simulations=4000, n_workers=2)
+        tester.run_full_stress_test(**BASE_INPUTS, n_simulations=4000, n_workers=4)
+        assert tester.cache_stats()["misses"] == 2
+
+        # chunk_size explicite : résultat indépendant de n_workers
+        tester.run_full_stress_test(**BASE_INPUTS, n_simulations=4000, n_workers=2, chunk_size=1000)
+        tester.run_full_stress_test(**BASE_INPUTS, n_simulations=4000, n_workers=4, chunk_size=1000)
+        assert tester.cache_stats()["hits"] == 1
+
+    def test_lru_eviction_and_ttl(self, monkeypatch):
+        """Capacité bornée et expiration"""
+        tester = StressTester()
+        monkeypatch.setattr(tester, "RESULT_CACHE_SIZE", 2)
+        for cash in (100000, 200000, 300000):
+            tester.run_full_stress_test(300, cash, cash, n_simulations=500)
+        assert tester.cache_stats()["size"] == 2
+
+        monkeypatch.setattr(tester, "RESULT_CACHE_TTL_SECONDS", 0)
+        tester.run_full_stress_test(300, 300000, 300000, n_simulations=500)
+        assert tester.cache_stats()["hits"] == 0
@@ -0,0 +1,76 @@
+"""
+Tests unitaires pour whatif_simulator.py
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Ajouter parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.client_scoring import ClientRiskScorer
+from engine.payment_patterns import ClientPaymentAnalyzer
+from engine.whatif_simulator import WhatIfSimulator
+from tests.test_payment_patterns import _make_invoices
+
+
+class TestWhatIfSimulator:
+    """Tests simulation d'une facture hypothétique"""
+
+    @pytest.mark.parametrize("client_index,amount", [(0, 5000.0), (3, 250000.0), (7, 2e6)])
+    def test_matches_full_recomputation(self, client_index, amount):
+        """Score avant/après = analyzer + calculate_risk_score sur les factures complètes"""
+        invoices = _make_invoices(n_clients=20, n_invoices=1500, seed=5)
+        simulator = WhatIfSimulator(invoices)
+        scorer = ClientRiskScorer()
+        client_id, client_name = f"C{client_index}", f"Client {client_index}"
+
+        # Facture simulée ajoutée au client, en attente
+        simulated = pd.DataFrame([{
+            "client_id": client_id, "client_name": client_name, "invoice_id": "SIM",
+            "due_date": pd.Timestamp("2025-06-01"), "payment_date": pd.NaT,
+            "amount": amount, "amount_paid": 0.0, "status": "pending"
+        }])
+        after = pd.concat([invoices, simulated], ignore_index=True)
+
+        def reference(df):
+            pending = df[df["status"] != "paid"]
+            pattern = ClientPaymentAnalyzer(df.copy()).analyze_client(client_id)
+            return scorer.calculate_risk_score(
+                pattern,
+                float(pending.loc[pending["client_name"] == client_name, "amount"].sum()),
+                float(pending["amount"].sum())
+            )
+
+        result = simulator.simulate(client_name, amount, days_overdue=10)
+        before, expected = reference(invoices), reference(after)
+        assert result["client_score_before"] == before.risk_score
+        assert result["client_rating_before"] == before.rating
+        assert result["client_score_after"] == expected.risk_score
+        assert result["client_rating_after"] == expected.rating
+
+    def test_new_client_and_batch(self):
+        """Nouveau client : rating par défaut ; lot = simulations isolées"""
+        invoices = _make_invoices(n_clients=10, n_invoices=400, seed=6)
+        simulator = WhatIfSimulator(invoices)
+        total = simulator.total_pending
+
+        result = simulator.simulate("Prospect", total, days_overdue=45)
+        assert result["client_rating_before"] is None
+        assert (result["client_rating_after"], result["client_score_after"]) == ("D", 75)
+        assert result["risk_status"] == "CRITICAL"
+        assert {w["type"] for w in result["warnings_triggered"]} >= {"significant_delay", "concentration_risk"}
+        assert result["runway_after_weeks"] == pytest.approx(24.0)
+
+        batch = [
+            {"client_name": "Client 1", "amount": 1000.0},
+            {"client_name": "Prospect", "amount": 5e5, "days_overdue": 70},
+            {"client_name": "Client 2", "amount": 3e5, "days_overdue": 5},
+        ]
+        assert simulator.simulate_batch(batch) == [
+            simulator.simulate(i["client_name"], i["amount"], i.get("days_overdue", 0)) for i in batch
+        ]
+        assert simulator.total_pending == total